@@ -0,0 +1,155 @@
+"""
+Crawl benchmark: runs `scraper scrape --crawl` end to end against a synthetic
+site served from localhost (see sitegen.py), and reports throughput and
+whether the crawl found exactly the pages it should have. With --offline the
+site is written to disk and crawled through file:// URLs instead, which takes
+HTTP out of the measurement entirely.
+
+Usage:
+    python benchmarks/bench_crawl.py [--pages 200] [--fanout 5] [--depth 4]
+        [--duplicate-rate 0.1] [--latency 0.005] [--error-rate 0.0] [--json]
+    python benchmarks/bench_crawl.py --rate-limit 50 --jobs 8 [--retries 0]  # adaptive pacing vs. bursts
+    python benchmarks/bench_crawl.py --offline [--pages 2000]
+    python benchmarks/bench_crawl.py --check    # exit 1 if pages were missed or made up
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'src'))
+
+from md_scraper.cli import cli  # noqa: E402
+from sitegen import NAV_STYLES, SiteServer, SyntheticSite  # noqa: E402
+
+def _crawl(start_url, depth, max_pages, output, extra_args=()):
+    """Crawls with the CLI into a JSONL file; returns (seconds, URLs written)."""
+    args = ['scrape', start_url, '--crawl', '--depth', str(depth), '--max-pages', str(max_pages),
+            '--format', 'jsonl', '--output', output, *extra_args]
+    start = time.perf_counter()
+    try:
+        cli.main(args, standalone_mode=False)
+    finally:
+        elapsed = time.perf_counter() - start
+    with open(output) as f:
+        return elapsed, [json.loads(line)['url'] for line in f if line.strip()]
+
+def _crawl_defaults(site, depth, max_pages):
+    depth = depth if depth is not None else max(site.depth_of.values())
+    # Every page plus every alias link, so the budget never truncates the crawl
+    max_pages = max_pages or len(site.paths) + sum(len(a) for a in site.aliases.values())
+    return depth, max_pages
+
+def _summary(site, depth, elapsed, written_pages, pages_written):
+    expected = site.reachable(depth)
+    return {
+        'seconds': round(elapsed, 3),
+        'pages_written': pages_written,
+        'pages_per_second': round(pages_written / elapsed, 1) if elapsed else None,
+        'expected_pages': len(expected),
+        'missing_pages': len(expected - written_pages),
+        'unexpected_pages': len(written_pages - expected)
+    }
+
+def run_crawl(site, server_options=None, depth=None, max_pages=None, extra_args=()):
+    """
+    Serves ``site`` locally and crawls it with the CLI.
+
+    Args:
+        site (SyntheticSite): The site to crawl.
+        server_options (dict): Passed to ``SiteServer`` (latency, error_rate, ...).
+        depth (int): Crawl depth; defaults to the site's full depth.
+        max_pages (int): Page budget; defaults to one large enough for every URL on the site.
+        extra_args (tuple): More `scraper scrape` arguments.
+
+    Returns:
+        dict: Timing, server statistics and correctness counts.
+    """
+    depth, max_pages = _crawl_defaults(site, depth, max_pages)
+    with tempfile.TemporaryDirectory() as tmp, SiteServer(site, **(server_options or {})) as server:
+        elapsed, written = _crawl(server.url, depth, max_pages, os.path.join(tmp, 'crawl.jsonl'), extra_args)
+        stats = server.stats()
+        served = server.served_pages()
+
+    written_pages = {site.resolve(urlparse(url).path or '/') for url in written}
+    return {
+        **_summary(site, depth, elapsed, written_pages, len(written)),
+        'served_pages': len(served),
+        **{f'server_{key}': value for key, value in stats.items()}
+    }
+
+def run_offline_crawl(site, depth=None, max_pages=None, extra_args=()):
+    """
+    Writes ``site`` to disk and crawls the saved pages through file:// URLs.
+
+    Takes the same arguments as ``run_crawl`` (minus the server options) and
+    returns the same counts, without the server statistics.
+    """
+    depth, max_pages = _crawl_defaults(site, depth, max_pages)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'site')
+        home = site.write(root)
+        elapsed, written = _crawl(home, depth, max_pages, os.path.join(tmp, 'crawl.jsonl'), extra_args)
+        # file:///.../site/p/3/index.html -> /p/3/index.html
+        root_path = os.path.realpath(root)
+        paths = ['/' + os.path.relpath(url2pathname(urlparse(url).path), root_path).replace(os.sep, '/') for url in written]
+
+    written_pages = {site.resolve(path) for path in paths}
+    return _summary(site, depth, elapsed, written_pages, len(written))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200, help='Distinct pages on the site (default: 200).')
+    parser.add_argument('--fanout', type=int, default=5, help='Children per page (default: 5).')
+    parser.add_argument('--depth', type=int, default=4, help='Site depth, also used as crawl depth (default: 4).')
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help='Share of links with an alias URL (default: 0.1).')
+    parser.add_argument('--page-size', type=int, default=8192, help='Approximate page size in bytes (default: 8192).')
+    parser.add_argument('--images', type=int, default=2, help='Images per page (default: 2).')
+    parser.add_argument('--nav', choices=NAV_STYLES, default='sidebar', help='Navigation structure (default: sidebar).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the site and error injection (default: 0).')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency per request (default: 0).')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds (default: 0).')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered 500 (default: 0).')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before answering 429 (default: unlimited).')
+    parser.add_argument('--crawl-delay', type=float, help='Crawl-delay served in robots.txt (default: no robots.txt).')
+    parser.add_argument('--max-pages', type=int, help='Crawl page budget (default: enough for the whole site).')
+    parser.add_argument('--jobs', type=int, default=1, help='Pages fetched at once by the crawler (default: 1).')
+    parser.add_argument('--retries', type=int, default=3, help='Crawler retries of 429/5xx responses (default: 3).')
+    parser.add_argument('--offline', action='store_true', help='Crawl the site from disk through file:// URLs instead of over HTTP '
+                        '(the server options are ignored).')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if pages were missed or unexpected ones written.')
+    options = parser.parse_args()
+
+    site = SyntheticSite(pages=options.pages, fanout=options.fanout, depth=options.depth, duplicate_rate=options.duplicate_rate,
+                         page_size=options.page_size, images=options.images, nav=options.nav, seed=options.seed)
+    server_options = {'latency': options.latency, 'jitter': options.jitter, 'error_rate': options.error_rate,
+                      'rate_limit': options.rate_limit, 'crawl_delay': options.crawl_delay, 'seed': options.seed}
+    extra_args = ('--jobs', str(options.jobs), '--retries', str(options.retries))
+    # The CLI logs every page; keep the report readable
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        if options.offline:
+            result = run_offline_crawl(site, depth=options.depth, max_pages=options.max_pages, extra_args=extra_args)
+        else:
+            result = run_crawl(site, server_options, depth=options.depth, max_pages=options.max_pages, extra_args=extra_args)
+
+    if options.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key:<26} {value}")
+
+    # Injected errors and throttling legitimately lose pages
+    lossy = not options.offline and (options.error_rate > 0 or options.rate_limit is not None) or options.max_pages is not None
+    if options.check and (result['unexpected_pages'] or (result['missing_pages'] and not lossy)):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
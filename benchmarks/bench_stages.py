@@ -0,0 +1,177 @@
+"""
+Stage benchmark: times each step of Scraper.scrape() on the local corpus in
+benchmarks/corpus (docs, blog, big table, SVG-heavy, image-heavy and MHT
+pages), with no network access, and compares against a stored baseline.
+
+Stages are timed separately so a regression points at the step that caused it:
+load (file read / MHT decode), parse, metadata, nav_links, links, extract
+(main content), convert (Markdown without sanitizing), sanitize, plus the
+end-to-end scrape. Peak memory per stage is measured with tracemalloc in a
+separate pass, so tracing does not skew the timings.
+
+Usage:
+    python benchmarks/bench_stages.py [--iterations 5] [--json]
+    python benchmarks/bench_stages.py --save-baseline
+    python benchmarks/bench_stages.py --check [--threshold 1.5]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'src'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from md_scraper.scraper import Scraper  # noqa: E402
+
+CORPUS_DIR = os.path.join(HERE, 'corpus')
+BASELINE_PATH = os.path.join(HERE, 'baseline_stages.json')
+
+# Pages link as if served from here, so link extraction sees internal links
+BASE_URL = 'https://example.com/docs/page'
+
+def _parse(html):
+    return BeautifulSoup(html, 'lxml')
+
+def _main_content(scraper, html):
+    return scraper.extract_main_content(_parse(html), as_soup=True)
+
+def _unsanitized_markdown(scraper, html):
+    return scraper.to_markdown(_main_content(scraper, html), sanitize=False)
+
+# name -> (setup, run). setup(scraper, path, html) builds a fresh input outside
+# the timer (most stages consume or mutate their soup); run(scraper, arg) is timed.
+STAGES = {
+    'load': (lambda s, path, html: path, lambda s, path: s.fetch_html(path)),
+    'parse': (lambda s, path, html: html, lambda s, html: _parse(html)),
+    'metadata': (lambda s, path, html: _parse(html), lambda s, soup: s.extract_metadata(soup)),
+    'nav_links': (lambda s, path, html: _parse(html), lambda s, soup: s.extract_nav_links(soup, BASE_URL)),
+    'links': (lambda s, path, html: _parse(html), lambda s, soup: s.extract_links(soup, BASE_URL)),
+    'extract': (lambda s, path, html: _parse(html), lambda s, soup: s.extract_main_content(soup, as_soup=True)),
+    'convert': (lambda s, path, html: _main_content(s, html), lambda s, main: s.to_markdown(main, sanitize=False)),
+    'sanitize': (lambda s, path, html: _unsanitized_markdown(s, html), lambda s, markdown: s.sanitizer.sanitize(markdown)),
+    'scrape': (lambda s, path, html: path, lambda s, path: s.scrape(path)),
+}
+
+def corpus_files(corpus_dir=CORPUS_DIR):
+    return sorted(p for p in glob.glob(os.path.join(corpus_dir, '*')) if p.endswith(('.html', '.mht')))
+
+def bench_page(scraper, path, iterations, stages=None):
+    """
+    Times each stage on one page.
+
+    Returns:
+        dict: Stage name -> {'median_ms', 'min_ms', 'peak_kb'}.
+    """
+    html = scraper.fetch_html(path)
+    results = {}
+    for name in stages or STAGES:
+        setup, run = STAGES[name]
+        samples = []
+        for _ in range(iterations):
+            arg = setup(scraper, path, html)
+            start = time.perf_counter()
+            run(scraper, arg)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # Memory in its own pass: tracemalloc slows allocation-heavy code a lot
+        arg = setup(scraper, path, html)
+        tracemalloc.start()
+        try:
+            run(scraper, arg)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        results[name] = {
+            'median_ms': round(statistics.median(samples), 3),
+            'min_ms': round(min(samples), 3),
+            'peak_kb': round(peak / 1024, 1)
+        }
+    return results
+
+def run_suite(iterations=5, corpus_dir=CORPUS_DIR, stages=None):
+    """
+    Runs the stage benchmark over every page of the corpus.
+
+    Returns:
+        dict: Page file name -> stage results (see ``bench_page``).
+    """
+    with Scraper() as scraper:
+        return {os.path.basename(path): bench_page(scraper, path, iterations, stages)
+                for path in corpus_files(corpus_dir)}
+
+def compare(results, baseline, threshold=1.5, min_ms=1.0):
+    """
+    Compares results against a baseline.
+
+    A stage regresses when its median time or peak memory grows by more than
+    ``threshold`` times. Stages faster than ``min_ms`` in both runs are only
+    checked for memory, since their timings are mostly noise.
+
+    Returns:
+        list: (page, stage, metric, baseline value, current value) per regression.
+    """
+    regressions = []
+    for page, stages in results.items():
+        for stage, current in stages.items():
+            base = baseline.get(page, {}).get(stage)
+            if base is None:
+                continue
+            if max(current['median_ms'], base['median_ms']) >= min_ms and current['median_ms'] > base['median_ms'] * threshold:
+                regressions.append((page, stage, 'median_ms', base['median_ms'], current['median_ms']))
+            if base['peak_kb'] > 0 and current['peak_kb'] > base['peak_kb'] * threshold:
+                regressions.append((page, stage, 'peak_kb', base['peak_kb'], current['peak_kb']))
+    return regressions
+
+def _print_table(results, baseline):
+    print(f"{'page':<18} {'stage':<10} {'median':>10} {'min':>10} {'peak':>10} {'vs base':>8}")
+    for page, stages in results.items():
+        for stage, r in stages.items():
+            base = baseline.get(page, {}).get(stage)
+            ratio = f"{r['median_ms'] / base['median_ms']:.2f}x" if base and base['median_ms'] else ''
+            print(f"{page:<18} {stage:<10} {r['median_ms']:>8.2f}ms {r['min_ms']:>8.2f}ms {r['peak_kb']:>8.0f}KB {ratio:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5, help='Timed runs per stage and page (default: 5).')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directory of .html/.mht pages (default: benchmarks/corpus).')
+    parser.add_argument('--stage', action='append', choices=list(STAGES), help='Only run this stage (repeatable).')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file (default: benchmarks/baseline_stages.json).')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline.')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if any stage regressed against the baseline.')
+    parser.add_argument('--threshold', type=float, default=1.5, help='Slowdown/growth factor counted as a regression (default: 1.5).')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    options = parser.parse_args()
+
+    results = run_suite(options.iterations, options.corpus, options.stage)
+
+    if options.save_baseline:
+        with open(options.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {options.baseline}", file=sys.stderr)
+
+    baseline = {}
+    if not options.save_baseline and os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results, baseline)
+
+    regressions = compare(results, baseline, options.threshold)
+    for page, stage, metric, before, after in regressions:
+        print(f"REGRESSION {page} {stage} {metric}: {before} -> {after}", file=sys.stderr)
+    if options.check and regressions:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
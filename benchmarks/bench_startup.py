@@ -0,0 +1,52 @@
+"""
+Startup benchmark: wall-clock time of fresh interpreters running the CLI and
+importing the web app, i.e. what a Termux user waits for on every command and
+what a Cloud Run worker pays on a cold start.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 20] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+CASES = [
+    ('python (baseline)', ['-c', 'pass']),
+    ('import md_scraper.cli', ['-c', 'import md_scraper.cli']),
+    ('scraper --help', ['-m', 'md_scraper.cli', '--help']),
+    ('scraper hello', ['-m', 'md_scraper.cli', 'hello']),
+    ('import md_scraper.scraper', ['-c', 'import md_scraper.scraper']),
+    ('import md_scraper.web.app', ['-c', 'import md_scraper.web.app']),
+]
+
+def measure(args, runs):
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [SRC, os.environ.get('PYTHONPATH')]))}
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, env=env, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples), 'max_ms': max(samples)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='Interpreter launches per case (default: 20).')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    options = parser.parse_args()
+
+    results = {name: measure(args, options.runs) for name, args in CASES}
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<28} {'median':>9} {'min':>9} {'max':>9}")
+    for name, r in results.items():
+        print(f"{name:<28} {r['median_ms']:>7.1f}ms {r['min_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms")
+
+if __name__ == '__main__':
+    main()
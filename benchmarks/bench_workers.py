@@ -0,0 +1,108 @@
+"""
+Parallelism benchmark: converts the local corpus with threads sharing one
+Scraper and with ConversionPool worker processes, at increasing counts, and
+reports pages per second and the speedup over a single thread.
+
+Pages are read from disk, so fetching is nearly free and the run is bound by
+parsing and conversion. Worker processes should scale close to linearly up to
+the number of CPU cores. Threads only scale on a free-threaded build (3.13t)
+with the GIL off; with the GIL they stay near 1x. The header says which one
+ran. Each pass starts fresh workers; their startup (spawning and importing the
+scraper) is excluded by warming them up before the clock starts.
+
+Usage:
+    python benchmarks/bench_workers.py [--threads 1 2 4 8] [--workers 1 2 4 8] [--pages 200] [--json]
+    python3.13t -X gil=0 benchmarks/bench_workers.py --threads 1 2 4 8 --workers
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'src'))
+
+from md_scraper.scraper import Scraper  # noqa: E402
+from md_scraper.utils import iter_concurrent  # noqa: E402
+from md_scraper.workers import ConversionPool  # noqa: E402
+
+from bench_stages import CORPUS_DIR, corpus_files  # noqa: E402
+
+def _pages(corpus_dir, count):
+    """``count`` (path, depth) items cycling through the corpus."""
+    return [(path, 0) for path in itertools.islice(itertools.cycle(corpus_files(corpus_dir)), count)]
+
+def run_sequential(pages):
+    """Baseline: one Scraper on this thread, as the CLI does without --workers."""
+    with Scraper() as scraper:
+        start = time.perf_counter()
+        for path, _ in pages:
+            scraper.scrape(path)
+        return time.perf_counter() - start
+
+def run_threads(pages, threads):
+    """Scrapes the pages on ``threads`` threads sharing one Scraper, like ``scraper scrape --jobs``."""
+    with Scraper() as scraper:
+        start = time.perf_counter()
+        for _, _, _, error in iter_concurrent(iter(pages), scraper.scrape, threads):
+            if error is not None:
+                raise error
+        return time.perf_counter() - start
+
+def run_pool(pages, workers, jobs=2):
+    """Converts the pages with ``workers`` processes fed by ``jobs + workers`` threads, like the CLI."""
+    with ConversionPool(workers) as pool:
+        # Spawn and import in every worker before timing
+        list(iter_concurrent(iter(pages[:workers * 2]), pool.scrape, workers * 2))
+        start = time.perf_counter()
+        for _, _, _, error in iter_concurrent(iter(pages), pool.scrape, jobs + workers):
+            if error is not None:
+                raise error
+        return time.perf_counter() - start
+
+def gil_enabled():
+    """False on a free-threaded build running without the GIL."""
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_enabled() if is_enabled is not None else True
+
+def run_suite(worker_counts=(), thread_counts=(), pages=200, corpus_dir=CORPUS_DIR):
+    items = _pages(corpus_dir, pages)
+    sequential = run_sequential(items)
+    results = {'sequential': {'seconds': round(sequential, 3), 'pages_per_second': round(pages / sequential, 1),
+                              'speedup': 1.0}}
+    runs = [(f'threads={n}', run_threads, n) for n in thread_counts]
+    runs += [(f'workers={n}', run_pool, n) for n in worker_counts]
+    for name, run, n in runs:
+        elapsed = run(items, n)
+        results[name] = {
+            'seconds': round(elapsed, 3),
+            'pages_per_second': round(pages / elapsed, 1),
+            'speedup': round(sequential / elapsed, 2),
+            # Share of a perfect linear speedup, capped by the cores available
+            'efficiency': round(sequential / elapsed / min(n, os.cpu_count() or 1), 2)
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='*', default=[1, 2, 4, 8], help='Thread counts to try (default: 1 2 4 8; none to skip).')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4, 8], help='Worker counts to try (default: 1 2 4 8; none to skip).')
+    parser.add_argument('--pages', type=int, default=200, help='Pages converted per run, cycling through the corpus (default: 200).')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directory of .html/.mht pages (default: benchmarks/corpus).')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    options = parser.parse_args()
+
+    results = run_suite(options.workers, options.threads, pages=options.pages, corpus_dir=options.corpus)
+    if options.json:
+        print(json.dumps({'python': sys.version, 'gil_enabled': gil_enabled(), 'cpus': os.cpu_count(), 'runs': results}, indent=2))
+        return
+    print(f"Python {sys.version.split()[0]}, GIL {'on' if gil_enabled() else 'off'}, {os.cpu_count()} CPU(s), {options.pages} pages")
+    print(f"{'run':<14} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'efficiency':>10}")
+    for name, row in results.items():
+        efficiency = f"{row['efficiency']:.0%}" if 'efficiency' in row else ''
+        print(f"{name:<14} {row['seconds']:>8.2f} {row['pages_per_second']:>8.1f} {row['speedup']:>7.2f}x {efficiency:>10}")
+
+if __name__ == '__main__':
+    main()
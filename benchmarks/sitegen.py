@@ -0,0 +1,351 @@
+"""
+Synthetic sites for offline crawl benchmarks.
+
+``SyntheticSite`` generates a deterministic site from a handful of knobs (page
+count, fanout, depth, duplicate-URL rate, page size, images per page and nav
+structure). ``SiteServer`` serves it from a local HTTP server that can inject
+latency, errors and rate limiting, and counts what the crawler fetched.
+``SyntheticSite.write`` saves it as static files instead, for crawls with no
+network at all.
+
+    site = SyntheticSite(pages=200, fanout=4, depth=4, duplicate_rate=0.2)
+    with SiteServer(site, latency=0.01, error_rate=0.02) as server:
+        ...crawl server.url...
+        print(server.stats())
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+# Navigation blocks a page can carry
+NAV_STYLES = ('none', 'breadcrumb', 'sidebar', 'mega')
+
+# Pages listed in a 'mega' menu
+MEGA_MENU_SIZE = 50
+
+WORDS = ("crawler page site section document link content render parse queue depth fanout "
+         "latency server request response markdown table image header footer index archive "
+         "release guide reference example install configure option value return error").split()
+
+# 1x1 transparent PNG, served for every image URL
+PIXEL_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082')
+
+class SyntheticSite:
+    """
+    A deterministic tree-shaped site.
+
+    Page 0 is ``/``; the others are ``/p/<n>``. Pages are laid out breadth-first:
+    every page above ``depth`` links to up to ``fanout`` children until there
+    are ``pages`` pages. With a ``duplicate_rate``, that share of child links is
+    followed by a second link to an alias of the same page (``/p/<n>/``,
+    ``/p/<n>/index.html`` or the ``/print/p/<n>`` print view), which serves
+    identical content under a different URL.
+    """
+
+    def __init__(self, pages: int = 100, fanout: int = 5, depth: int = 4, duplicate_rate: float = 0.0,
+                 page_size: int = 4096, images: int = 0, nav: str = 'sidebar', seed: int = 0):
+        """
+        Args:
+            pages (int): Number of distinct pages.
+            fanout (int): Children linked from each page.
+            depth (int): Depth of the deepest pages (the root is depth 0).
+            duplicate_rate (float): Share of child links that also get an alias link, 0 to 1.
+            page_size (int): Approximate size of each page's HTML, in bytes.
+            images (int): <img> tags per page.
+            nav (str): Navigation block on each page, one of ``NAV_STYLES``.
+            seed (int): Seed for the page text and the alias links.
+        """
+        if nav not in NAV_STYLES:
+            raise ValueError(f"Unknown nav style '{nav}'. Choose from: {', '.join(NAV_STYLES)}")
+        if pages < 1 or fanout < 1 or depth < 0:
+            raise ValueError("pages and fanout must be positive and depth non-negative.")
+        self.page_size = page_size
+        self.images = images
+        self.nav = nav
+        self.seed = seed
+
+        self.paths: List[str] = ['/']
+        self.depth_of: Dict[str, int] = {'/': 0}
+        self.parent: Dict[str, Optional[str]] = {'/': None}
+        self.children: Dict[str, List[str]] = {'/': []}
+        queue = deque(['/'])
+        while queue and len(self.paths) < pages:
+            path = queue.popleft()
+            if self.depth_of[path] >= depth:
+                continue
+            for _ in range(fanout):
+                if len(self.paths) >= pages:
+                    break
+                child = f'/p/{len(self.paths)}'
+                self.paths.append(child)
+                self.depth_of[child] = self.depth_of[path] + 1
+                self.parent[child] = path
+                self.children[child] = []
+                self.children[path].append(child)
+                queue.append(child)
+
+        # Alias links are fixed up front so every request for a page renders the same HTML
+        rng = random.Random(seed)
+        self.aliases: Dict[str, List[str]] = {}
+        for path in self.paths:
+            self.aliases[path] = [self._alias(child, rng) for child in self.children[path] if rng.random() < duplicate_rate]
+
+    @staticmethod
+    def _alias(path: str, rng: random.Random) -> str:
+        form = rng.randrange(3)
+        if form == 0:
+            return path + '/'
+        if form == 1:
+            return path + '/index.html'
+        return '/print' + path
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Maps a requested path (canonical or alias, query ignored) to its canonical page, or None."""
+        path = path.split('?', 1)[0].split('#', 1)[0]
+        if path.startswith('/print/'):
+            path = path[len('/print'):]
+        if path.endswith('/index.html'):
+            path = path[:-len('index.html')]
+        if len(path) > 1 and path.endswith('/'):
+            path = path[:-1]
+        return path if path in self.depth_of else None
+
+    def nav_links(self, path: str) -> List[str]:
+        if self.nav == 'breadcrumb':
+            trail = []
+            parent = self.parent[path]
+            while parent is not None:
+                trail.append(parent)
+                parent = self.parent[parent]
+            return trail[::-1]
+        if self.nav == 'sidebar':
+            return ['/'] + self.children['/']
+        if self.nav == 'mega':
+            return self.paths[:MEGA_MENU_SIZE]
+        return []
+
+    def links(self, path: str) -> List[str]:
+        """The canonical pages a page links to (navigation and children)."""
+        seen = []
+        for link in self.nav_links(path) + self.children[path]:
+            if link != path and link not in seen:
+                seen.append(link)
+        return seen
+
+    def reachable(self, max_depth: int) -> Set[str]:
+        """Canonical pages a breadth-first crawl from ``/`` finds within ``max_depth`` link hops."""
+        found = {'/'}
+        frontier = ['/']
+        for _ in range(max_depth):
+            next_frontier = []
+            for path in frontier:
+                for link in self.links(path):
+                    if link not in found:
+                        found.add(link)
+                        next_frontier.append(link)
+            frontier = next_frontier
+        return found
+
+    def render(self, path: str) -> str:
+        """Renders a canonical page's HTML."""
+        index = int(path.rsplit('/', 1)[-1]) if path != '/' else 0
+        rng = random.Random(f'{self.seed}:{path}')
+        title = f'Page {index}'
+
+        nav = ''
+        if self.nav != 'none':
+            items = ''.join(f'<li><a href="{link}">{self._label(link)}</a></li>' for link in self.nav_links(path))
+            nav = f'<nav class="{self.nav}"><ul>{items}</ul></nav>'
+
+        children = ''.join(f'<li><a href="{child}">{self._label(child)}</a></li>' for child in self.children[path])
+        aliases = ''.join(f'<li><a href="{alias}">{self._label(self.resolve(alias))} (alt)</a></li>' for alias in self.aliases[path])
+        images = ''.join(f'<img src="/img/{index}-{k}.png" alt="Figure {k} of page {index}">' for k in range(self.images))
+
+        head = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>'
+                f'<meta name="description" content="Synthetic page {index} at depth {self.depth_of[path]}."></head><body>')
+        tail = f'<h2>Pages</h2><ul>{children}{aliases}</ul></article></main><footer><p>Synthetic site</p></footer></body></html>'
+        article = [f'{nav}<main><article><h1>{title}</h1>{images}']
+        size = len(head) + len(article[0]) + len(tail)
+        while size < self.page_size:
+            words = ' '.join(rng.choice(WORDS) for _ in range(40))
+            paragraph = f'<p>{words.capitalize()}.</p>'
+            article.append(paragraph)
+            size += len(paragraph)
+        return head + ''.join(article) + tail
+
+    def write(self, directory: str) -> str:
+        """
+        Saves the site as static files, laid out like a static-site build or a
+        ``wget --mirror``: each page is ``<path>/index.html`` and each print view
+        ``print/<path>/index.html``. The ``/p/<n>/`` and ``/p/<n>/index.html``
+        aliases name the same file as ``/p/<n>``.
+
+        Returns:
+            str: The path of the home page.
+        """
+        print_views = {self.resolve(alias) for aliases in self.aliases.values() for alias in aliases if alias.startswith('/print/')}
+        for path in self.paths:
+            html = self.render(path)
+            targets = [path] + (['/print' + path] if path in print_views else [])
+            for target in targets:
+                page_dir = os.path.join(directory, *target.strip('/').split('/'))
+                os.makedirs(page_dir, exist_ok=True)
+                with open(os.path.join(page_dir, 'index.html'), 'w', encoding='utf-8') as f:
+                    f.write(html)
+        return os.path.join(directory, 'index.html')
+
+    def _label(self, path: str) -> str:
+        return 'Home' if path == '/' else f'Page {path.rsplit("/", 1)[-1]}'
+
+class SiteServer:
+    """
+    Serves a ``SyntheticSite`` on localhost from a background thread.
+
+    Every request can be delayed by ``latency`` seconds (plus up to ``jitter``),
+    fail with ``error_status`` at ``error_rate``, and be answered 429 with a
+    Retry-After header once the site gets more than ``rate_limit`` requests per
+    second. With ``crawl_delay``, /robots.txt asks for that many seconds between
+    requests. Use as a context manager; ``url`` is the site's root.
+    """
+
+    def __init__(self, site: SyntheticSite, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, rate_limit: Optional[float] = None, crawl_delay: Optional[float] = None, seed: int = 0):
+        """
+        Args:
+            site (SyntheticSite): The site to serve.
+            latency (float): Seconds added to every response.
+            jitter (float): Up to this many extra seconds, drawn uniformly per request.
+            error_rate (float): Share of page requests answered with ``error_status``, 0 to 1.
+            error_status (int): Status code of injected errors.
+            rate_limit (float): Requests per second allowed before answering 429; None for no limit.
+            crawl_delay (float): Crawl-delay served in /robots.txt; None for no robots.txt.
+            seed (int): Seed for jitter and error injection.
+        """
+        self.site = site
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.crawl_delay = crawl_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self._status = Counter()
+        self._hits = Counter()
+        self._requests = 0
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def _admit(self) -> bool:
+        """Token bucket holding up to one second of requests. Called with the lock held."""
+        if self.rate_limit is None:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+        self._refilled = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def respond(self, path: str):
+        """Decides the response to a request. Returns (status, content type, body, extra headers)."""
+        with self._lock:
+            self._requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            admitted = self._admit()
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        if path == '/robots.txt':
+            response = ((200, 'text/plain', f"User-agent: *\nCrawl-delay: {self.crawl_delay}\n".encode(), {})
+                        if self.crawl_delay is not None else (404, 'text/plain', b'Not Found', {}))
+        elif not admitted:
+            response = (429, 'text/plain', b'Too Many Requests', {'Retry-After': '1'})
+        elif path.startswith('/img/'):
+            response = (200, 'image/png', PIXEL_PNG, {})
+        elif (canonical := self.site.resolve(path)) is None:
+            response = (404, 'text/plain', b'Not Found', {})
+        elif failed:
+            response = (self.error_status, 'text/plain', b'Injected error', {})
+        else:
+            with self._lock:
+                self._hits[canonical] += 1
+            response = (200, 'text/html; charset=utf-8', self.site.render(canonical).encode('utf-8'), {})
+
+        with self._lock:
+            self._status[response[0]] += 1
+        return response
+
+    def stats(self) -> dict:
+        """
+        Returns what was served: request and status counts, distinct pages served,
+        and duplicate fetches (pages served more than once, e.g. through aliases).
+        """
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'status': dict(self._status),
+                'pages_served': len(self._hits),
+                'duplicate_fetches': sum(count - 1 for count in self._hits.values()),
+                'throttled': self._status.get(429, 0)
+            }
+
+    def served_pages(self) -> Set[str]:
+        """Canonical paths of the pages served at least once."""
+        with self._lock:
+            return set(self._hits)
+
+def _handler_for(server: SiteServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, content_type, body, headers = server.respond(self.path)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
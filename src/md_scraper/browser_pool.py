@@ -0,0 +1,203 @@
+import queue
+import threading
+import concurrent.futures
+from typing import TYPE_CHECKING, Callable, Optional
+
+from md_scraper.deadline import Deadline, DeadlineExceeded
+
+if TYPE_CHECKING:
+    from md_scraper.scraper import Scraper
+
+# Seconds past a page's deadline the caller waits for the partly loaded page to be taken
+CAPTURE_GRACE = 5.0
+
+class BrowserPool:
+    """
+    A pool of warm Playwright browsers shared across threads.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    browser lives on its own dedicated worker thread. Callers on any thread
+    submit URLs with ``fetch()`` and block until a worker has rendered the
+    page. Workers launch their browser up front (so requests skip the
+    Chromium cold start), relaunch it when it crashes or disconnects, and
+    recycle it after ``max_pages_per_browser`` pages to bound memory growth.
+    """
+
+    def __init__(self, size: int = 2, max_pages_per_browser: int = 200,
+                 scraper_factory: Optional[Callable[[], 'Scraper']] = None, warm: bool = True):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        if scraper_factory is None:
+            from md_scraper.scraper import Scraper
+            scraper_factory = Scraper
+        self._scraper_factory = scraper_factory
+        self._warm = warm
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Counters for the health/status endpoint
+        self.pages = 0
+        self.failures = 0
+        self.restarts = 0
+
+        self._workers = []
+        for i in range(size):
+            state = {'ready': False, 'busy': False, 'pages': 0}
+            thread = threading.Thread(target=self._worker_loop, args=(state,), name=f'browser-pool-{i}', daemon=True)
+            self._workers.append((thread, state))
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def fetch(self, url: str, timeout: Optional[float] = None, deadline: Optional[Deadline] = None) -> str:
+        """
+        Renders a URL on one of the pool's browsers.
+
+        Args:
+            url (str): The URL to render.
+            timeout (float): Seconds to wait for a free browser and the render.
+            deadline (Deadline): Optional deadline of the page. The browser takes
+                the page as loaded so far once it expires (see
+                ``Scraper.fetch_html_dynamic``); a page still waiting for a
+                browser then is dropped.
+
+        Returns:
+            str: The rendered HTML.
+
+        Raises:
+            RuntimeError: If the pool has been closed, or was closed before the
+                page got a browser.
+            concurrent.futures.TimeoutError: If the timeout expires.
+            DeadlineExceeded: If the deadline expired before the page started loading.
+        """
+        future = concurrent.futures.Future()
+        # Checked under the lock, so no page is queued behind the workers' stop signals
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed.")
+            self._tasks.put((url, future, deadline))
+        if deadline is None:
+            return future.result(timeout=timeout)
+        wait = deadline.remaining() + CAPTURE_GRACE
+        try:
+            return future.result(timeout=wait if timeout is None else min(timeout, wait))
+        except DeadlineExceeded:
+            raise
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if deadline.expired:
+                raise deadline.exceeded('render') from None
+            raise
+
+    def _start_scraper(self, state: dict) -> 'Scraper':
+        scraper = self._scraper_factory()
+        try:
+            scraper._ensure_browser()
+        except Exception:
+            scraper.close()
+            state['ready'] = False
+            raise
+        state['ready'] = True
+        state['pages'] = 0
+        return scraper
+
+    def _recycle(self, scraper: Optional['Scraper'], state: dict):
+        if scraper is not None:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+        state['ready'] = False
+        with self._lock:
+            self.restarts += 1
+
+    def _worker_loop(self, state: dict):
+        scraper = None
+        if self._warm:
+            try:
+                scraper = self._start_scraper(state)
+            except Exception:
+                # Retried lazily on the first task
+                scraper = None
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            url, future, deadline = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            state['busy'] = True
+            try:
+                if scraper is None:
+                    scraper = self._start_scraper(state)
+                if deadline is None:
+                    html = scraper.fetch_html_dynamic(url)
+                else:
+                    html = scraper.fetch_html_dynamic(url, deadline=deadline)
+            except BaseException as e:
+                future.set_exception(e)
+                with self._lock:
+                    self.failures += 1
+                # Relaunch only if the browser itself is gone, not for page-level errors
+                browser = scraper._browser if scraper is not None else None
+                if scraper is not None and (browser is None or not browser.is_connected()):
+                    self._recycle(scraper, state)
+                    scraper = None
+            else:
+                future.set_result(html)
+                state['pages'] += 1
+                with self._lock:
+                    self.pages += 1
+                if state['pages'] >= self.max_pages_per_browser:
+                    self._recycle(scraper, state)
+                    scraper = None
+            finally:
+                state['busy'] = False
+
+        if scraper is not None:
+            scraper.close()
+        state['ready'] = False
+
+    def stats(self) -> dict:
+        """Returns pool size and health counters."""
+        alive = sum(1 for thread, _ in self._workers if thread.is_alive())
+        return {
+            'size': self.size,
+            'alive': alive,
+            'ready': sum(1 for _, state in self._workers if state['ready']),
+            'busy': sum(1 for _, state in self._workers if state['busy']),
+            'queued': self._tasks.qsize(),
+            'pages': self.pages,
+            'failures': self.failures,
+            'restarts': self.restarts,
+            'healthy': not self._closed and alive == self.size
+        }
+
+    def close(self, wait: bool = True):
+        """
+        Stops the workers and closes their browsers. Pages being rendered are
+        finished; pages still waiting for a browser fail with RuntimeError.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            while True:
+                try:
+                    _, future, _ = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(RuntimeError("Browser pool is closed."))
+            for _ in self._workers:
+                self._tasks.put(None)
+        if wait:
+            for thread, _ in self._workers:
+                thread.join()
@@ -0,0 +1,92 @@
+import glob
+import os
+from typing import List, Optional, Tuple
+from md_scraper.sinks import FilenameAllocator
+
+# Saved pages the scraper reads from disk
+LOCAL_EXTENSIONS = ('.html', '.htm', '.mht', '.mhtml')
+
+def is_bulk_input(value: str) -> bool:
+    """True for a directory or a glob pattern (as opposed to a URL, a file or a URL list)."""
+    return os.path.isdir(value) or (glob.has_magic(value) and not os.path.exists(value))
+
+def _glob_root(pattern: str) -> str:
+    """The directory part of a glob pattern before its first wildcard."""
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    else:
+        parts.pop()
+    return os.sep.join(parts) or (os.sep if pattern.startswith(os.sep) else '.')
+
+def expand_local_inputs(value: str) -> List[Tuple[str, str]]:
+    """
+    Lists the saved pages in a directory (recursively) or matching a glob pattern.
+
+    Args:
+        value (str): A directory, or a pattern such as ``archive/**/*.mht``
+            (``**`` matches any number of directories).
+
+    Returns:
+        list: ``(path, root)`` pairs in sorted order, where ``root`` is the directory
+        the output structure is mirrored from (the directory itself, or the part of
+        the pattern before its first wildcard).
+    """
+    if os.path.isdir(value):
+        root = value
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(value):
+            dirnames.sort()
+            paths.extend(os.path.join(dirpath, name) for name in filenames
+                         if os.path.splitext(name)[1].lower() in LOCAL_EXTENSIONS)
+    else:
+        root = _glob_root(value)
+        paths = [path for path in glob.glob(value, recursive=True)
+                 if os.path.isfile(path) and os.path.splitext(path)[1].lower() in LOCAL_EXTENSIONS]
+    return [(path, root) for path in sorted(paths)]
+
+def mirror_name(path: str, root: str, names: Optional[FilenameAllocator] = None) -> str:
+    """
+    Output name of a page: its path below ``root``, with a ``.md`` extension and ``/`` separators.
+
+    Pages that would share a name (``page.html`` next to ``page.mht``, or the same
+    path below two roots) get numbered suffixes from ``names``, if given.
+    """
+    stem = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, '/')
+    return names.allocate(stem) if names is not None else stem + '.md'
+
+def is_up_to_date(source: str, target: str) -> bool:
+    """True if ``target`` exists and is at least as new as ``source``."""
+    try:
+        return os.path.getmtime(target) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+class BulkStats:
+    """Counts files and bytes of a bulk conversion, for the throughput summary."""
+
+    def __init__(self, files: int = 0, up_to_date: int = 0):
+        self.files = files
+        self.up_to_date = up_to_date
+        self.converted = 0
+        self.failed = 0
+        self.bytes_read = 0
+
+    def record(self, path: str, failed: bool = False):
+        if failed:
+            self.failed += 1
+            return
+        self.converted += 1
+        try:
+            self.bytes_read += os.path.getsize(path)
+        except OSError:
+            pass
+
+    def summary(self, seconds: float) -> str:
+        rate = 'n/a'
+        if seconds > 0:
+            rate = f"{self.converted / seconds:.1f} files/s, {self.bytes_read / 1024 / 1024 / seconds:.1f} MiB/s"
+        return (f"Bulk: {self.converted} of {self.files} file(s) converted, {self.up_to_date} up to date, "
+                f"{self.failed} failed in {seconds:.1f}s ({rate})")
@@ -1,17 +1,53 @@
 import click
-import requests
 import os
 import re
+import sys
+import json
 import time
-from md_scraper.scraper import Scraper
-from md_scraper.utils import sanitize_filename, get_title_from_result
+from functools import partial
+from md_scraper.bulk import LOCAL_EXTENSIONS, BulkStats, expand_local_inputs, is_bulk_input, is_up_to_date, mirror_name
 from md_scraper.crawler import Crawler
+from md_scraper.dedup import NearDuplicateIndex, OrderedChecks
+from md_scraper.manifest import CrawlManifest
+from md_scraper.sinks import SINK_FORMATS, FilenameAllocator, open_sink
+from md_scraper.remote import DEFAULT_FIELDS, LB_POLICIES, RemoteClient, iter_remote_results
+from md_scraper.ratelimit import RateLimiter
+from md_scraper.utils import iter_concurrent, lazy_getattr, local_path
+from md_scraper.warc import WarcArchive, WarcWriter, is_warc
 
-def process_url_logic(url, server, dynamic, strip, svg_action, image_action, assets_dir, scraper=None):
+# The scraper pulls in requests, bs4, lxml and markdownify, so it is imported on
+# first use; `--help`, `hello` and `--server` runs never load them.
+__getattr__ = lazy_getattr(__name__, {'Scraper': 'md_scraper.scraper', 'ConversionPool': 'md_scraper.workers'})
+_this = sys.modules[__name__]
+
+def check_remote_result(url, result, dedup_index=None, manifest=None):
+    """Flags a remote result as unchanged (per the manifest) or as a near-duplicate."""
+    # Conversion already happened remotely, so only the local writes can be skipped
+    if manifest is not None:
+        content_hash = result.get('content_hash')
+        if content_hash is None and result.get('raw_html') is not None:
+            content_hash = manifest.content_hash(result['raw_html'])
+        if content_hash is not None:
+            result['content_hash'] = content_hash
+            if manifest.lookup(url, content_hash) is not None:
+                result['unchanged'] = True
+                return result
+    if dedup_index is not None:
+        # The server fingerprints the main content before conversion, as local scraping does;
+        # servers from before that only send the Markdown
+        if 'fingerprint' in result:
+            duplicate_of = dedup_index.check_fingerprint(url, result.pop('fingerprint'))
+        else:
+            duplicate_of = dedup_index.check(url, result.get('markdown') or '')
+        if duplicate_of is not None:
+            result['duplicate_of'] = duplicate_of
+    return result
+
+def process_url_logic(url, server, dynamic, strip, svg_action, image_action, assets_dir, scraper=None, dedup_index=None, manifest=None,
+                      remote=None, timings=False, site_root=None, deadline=None, fingerprint=False):
     """Helper to process a single URL (local or remote). Returns result dict."""
     if server:
         # Remote scraping mode
-        api_url = f"{server.rstrip('/')}/api/scrape"
         payload = {
             'url': url,
             'dynamic': dynamic,
@@ -19,39 +55,45 @@ def process_url_logic(url, server, dynamic, strip, svg_action, image_action, ass
             'image_action': image_action,
             'strip_tags': list(strip) if strip else []
         }
-        try:
-            response = requests.post(api_url, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            if hasattr(e, 'response') and e.response is not None:
-                 raise Exception(f"Server error ({e.response.status_code}): {e.response.text}")
-            raise Exception(f"Connection error: {e}")
+        if timings:
+            payload['timings'] = True
+        if fingerprint:
+            payload['fingerprint'] = True
+        if deadline:
+            payload['deadline'] = deadline
+        # Use provided client or create a temporary one
+        if remote:
+            result = remote.scrape(payload)
+        else:
+            with RemoteClient(server) as temp_remote:
+                result = temp_remote.scrape(payload)
+        return check_remote_result(url, result, dedup_index=dedup_index, manifest=manifest)
     else:
         # Local scraping mode
+        scrape_options = {
+            'svg_action': svg_action,
+            'image_action': image_action,
+            'assets_dir': assets_dir,
+            'base_url': url
+        }
+        if strip:
+            scrape_options['strip'] = list(strip)
+        if dedup_index is not None:
+            scrape_options['dedup_index'] = dedup_index
+        if manifest is not None:
+            scrape_options['manifest'] = manifest
+        if timings:
+            scrape_options['timings'] = True
+        if site_root:
+            scrape_options['site_root'] = site_root
+        if deadline:
+            scrape_options['deadline'] = deadline
+
         # Use provided scraper or create a temporary one
         if scraper:
-            scrape_options = {
-                'svg_action': svg_action,
-                'image_action': image_action,
-                'assets_dir': assets_dir,
-                'base_url': url
-            }
-            if strip:
-                scrape_options['strip'] = list(strip)
             return scraper.scrape(url, dynamic=dynamic, **scrape_options)
         else:
-            with Scraper() as temp_scraper:
-                # Pass options to scrape method
-                scrape_options = {
-                    'svg_action': svg_action,
-                    'image_action': image_action,
-                    'assets_dir': assets_dir,
-                    'base_url': url
-                }
-                if strip:
-                    scrape_options['strip'] = list(strip)
-
+            with _this.Scraper() as temp_scraper:
                 return temp_scraper.scrape(url, dynamic=dynamic, **scrape_options)
 
 @click.group()
@@ -66,24 +108,73 @@ def cli():
 @click.option('--svg-action', type=click.Choice(['image', 'preserve', 'strip', 'file']), default='image', help='Action for inline <svg> tags (default: image).')
 @click.option('--image-action', type=click.Choice(['remote', 'base64', 'file']), default='remote', help='Action for <img> tags (default: remote).')
 @click.option('--assets-dir', help='Directory to save images if using "file" action.')
-@click.option('--server', help='Remote scraper server URL (e.g., https://my-scraper.run.app). If set, scraping happens remotely.')
+@click.option('--server', multiple=True, help='Remote scraper server URL (e.g., https://my-scraper.run.app). If set, scraping happens remotely. '
+              'Repeat (or comma-separate) to spread the pages across several servers.')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), help='Pages scraped at once: requests in --server mode (default: 4), fetches '
+              'with --workers (default: 4), or threads for static local pages (default: 1).')
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Parse and convert local pages in this many worker processes; '
+              'pages are fetched --jobs at a time meanwhile (default: off).')
+@click.option('--lb-policy', type=click.Choice(LB_POLICIES), default='round-robin',
+              help='How pages are spread across several servers (default: round-robin).')
+@click.option('--rate', type=click.FloatRange(min=0, min_open=True), help='Maximum requests per second to each host (default: no fixed '
+              'limit; robots.txt Crawl-delay, 429/503 responses and slow responses still slow a host down).')
+@click.option('--retries', type=click.IntRange(min=0), help='Retries of a fetch that failed with 429/5xx or a connection error, '
+              'with exponential backoff (default: 3 once fetches are paced).')
+@click.option('--ignore-robots', is_flag=True, default=False, help='Don\'t read robots.txt for a Crawl-delay.')
+@click.option('--deadline', type=click.FloatRange(min=0, min_open=True), help='Seconds each page may take from fetch or render through '
+              'conversion. Past it, images not downloaded yet keep their remote URLs and the Markdown converted so far is kept '
+              '(default: none).')
 @click.option('--crawl', '-c', is_flag=True, default=False, help='Recursively crawl links found on the page.')
 @click.option('--depth', type=int, default=3, help='Crawling depth (default: 3).')
 @click.option('--max-pages', type=int, default=10, help='Maximum number of pages to crawl per initial URL (default: 10).')
 @click.option('--only-subpaths', is_flag=True, default=False, help='Restrict crawling to subpaths of the initial URL(s).')
-def scrape(urls, output, dynamic, strip, svg_action, image_action, assets_dir, server, crawl, depth, max_pages, only_subpaths):
+@click.option('--site-root', type=click.Path(exists=True, file_okay=False), help='When crawling saved pages, the directory root-relative '
+              'links ("/docs/") resolve against (default: the start page\'s directory).')
+@click.option('--dedup', is_flag=True, default=False, help='Skip pages whose main content is a near-duplicate of a page already scraped.')
+@click.option('--dedup-threshold', type=int, default=3, help='Maximum SimHash bit distance for two pages to count as near-duplicates (default: 3).')
+@click.option('--skip-duplicate-links', is_flag=True, default=False, help='When crawling with --dedup, do not follow links found on near-duplicate pages.')
+@click.option('--dedup-report', type=click.Path(), help='Write the near-duplicate clusters found to this JSON file. Without --dedup, duplicates are reported but not skipped.')
+@click.option('--force', is_flag=True, default=False, help='Convert saved pages from a directory or glob even if their output is up to date.')
+@click.option('--incremental', is_flag=True, default=False, help='Keep a content manifest in the output directory and skip pages unchanged since the last run.')
+@click.option('--format', 'output_format', type=click.Choice(list(SINK_FORMATS)), default='md',
+              help='Output format: one .md file per page (default), JSONL, tar or zip archive, or a single Markdown bundle.')
+@click.option('--batch-size', type=int, default=50, help='Number of pages buffered before the output is flushed (default: 50).')
+@click.option('--profile', 'profile_dir', type=click.Path(file_okay=False), help='Write a CPU profile (cpu.prof, cpu_top.txt) and a slow-page log to this directory.')
+@click.option('--profile-memory', is_flag=True, default=False, help='With --profile, also take tracemalloc snapshots between pages.')
+@click.option('--profile-memory-interval', type=int, default=10, help='Pages between memory snapshots (default: 10).')
+@click.option('--profile-top', type=int, default=30, help='Functions listed in the profile summaries (default: 30).')
+@click.option('--slow-threshold', type=float, default=5.0, help='Seconds from which a page goes into the slow-page log (default: 5).')
+@click.option('--warc', 'warc_path', type=click.Path(dir_okay=False), help='Record the raw HTTP responses (pages and downloaded images) '
+              'to this WARC file (.warc, or .warc.gz to compress each record).')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write a JSON performance report (throughput, bytes, per-host latency, '
+              'status codes, errors, stage times, slowest pages) to this file and print a summary.')
+def scrape(urls, output, dynamic, strip, svg_action, image_action, assets_dir, server, jobs, workers, lb_policy, rate, retries, ignore_robots, deadline,
+           crawl, depth, max_pages, only_subpaths, site_root,
+           dedup, dedup_threshold, skip_duplicate_links, dedup_report, force, incremental, output_format, batch_size,
+           profile_dir, profile_memory, profile_memory_interval, profile_top, slow_threshold, warc_path, report_path):
     """Scrape URL(s) and print/save Markdown.
     
-    URLS can be web links or a path to a text file containing URLs.
+    URLS can be web links, saved pages (.html/.mht), a path to a text file
+    containing URLs, a directory or quoted glob pattern (e.g. 'archive/**/*.mht')
+    of saved pages to convert in bulk, or WARC files (.warc/.warc.gz) whose
+    HTML pages are converted from the archive without touching the network.
     """
+    # One or more servers; an empty list means scraping locally
+    server = [s.strip() for value in server for s in value.split(',') if s.strip()]
     
     initial_target_urls = []
+    # Saved pages from directories/globs -> output name mirroring their place below the root
+    bulk_names = {}
+    mirror_names = FilenameAllocator()
+    warc_inputs = []
     
     for u in urls:
         if os.path.isfile(u):
             # Check extension to decide if it's a target file or a list of URLs
             ext = os.path.splitext(u)[1].lower()
-            if ext in ['.html', '.htm', '.mht', '.mhtml']:
+            if is_warc(u):
+                warc_inputs.append(u)
+            elif ext in LOCAL_EXTENSIONS:
                 initial_target_urls.append(u)
             else:
                 try:
@@ -92,40 +183,205 @@ def scrape(urls, output, dynamic, strip, svg_action, image_action, assets_dir, s
                         initial_target_urls.extend(lines)
                 except Exception as e:
                     click.echo(f"Error reading file {u}: {e}", err=True)
+        elif is_bulk_input(u):
+            pages = expand_local_inputs(u)
+            if not pages:
+                click.echo(f"No saved pages ({', '.join(LOCAL_EXTENSIONS)}) found in {u}", err=True)
+            for path, root in pages:
+                if path not in bulk_names:
+                    bulk_names[path] = mirror_name(path, root, mirror_names)
+                    initial_target_urls.append(path)
         else:
             initial_target_urls.append(u)
+
+    # Pages (and their images) are replayed from the WARC files instead of fetched
+    replay = None
+    if warc_inputs:
+        if server or dynamic:
+            click.echo("Error: WARC files are replayed locally and can't be combined with --server or --dynamic.", err=True)
+            raise click.Abort()
+        try:
+            replay = WarcArchive(warc_inputs)
+        except (OSError, ValueError) as e:
+            click.echo(f"Error reading WARC file: {e}", err=True)
+            raise click.Abort()
+        click.echo(f"Replaying {len(replay.pages)} page(s) from {len(replay)} archived response(s).", err=True)
+        initial_target_urls.extend(url for url in replay.pages if url not in initial_target_urls)
             
     if not initial_target_urls:
         click.echo("No URLs provided.", err=True)
         return
 
+    if workers and (server or dynamic):
+        click.echo("Error: --workers only applies to static pages scraped locally (not --server or --dynamic).", err=True)
+        raise click.Abort()
+
+    if warc_path and (server or dynamic or workers or replay):
+        # Remote, rendered and worker-side image fetches happen out of reach of the recorder
+        click.echo("Error: --warc records local static fetches; it can't be combined with --server, --dynamic, --workers "
+                   "or WARC inputs.", err=True)
+        raise click.Abort()
+
     # Check output directory constraint early
     count = len(initial_target_urls)
     # If crawling is enabled, we will definitely have multiple files, so enforce directory output if output is specified
-    if output and (count > 1 or crawl):
+    if output_format == 'md' and output and (count > 1 or crawl or bulk_names):
          if os.path.exists(output) and os.path.isfile(output):
              click.echo(f"Error: Output '{output}' is a file. When crawling or scraping multiple URLs, please specify a directory.", err=True)
              raise click.Abort()
          if not os.path.exists(output):
              os.makedirs(output)
 
+    manifest = None
+    if incremental:
+        if output_format != 'md' or not output or not os.path.isdir(output):
+            click.echo("Error: --incremental requires --output to be a directory and --format md.", err=True)
+            raise click.Abort()
+        manifest = CrawlManifest.for_directory(output)
+
+    bulk_stats = None
+    if bulk_names:
+        bulk_stats = BulkStats(files=len(bulk_names))
+        # Like make: a page whose .md is newer than the saved page isn't converted again
+        if output_format == 'md' and output and not force:
+            stale = [u for u in initial_target_urls
+                     if u not in bulk_names or not is_up_to_date(u, os.path.join(output, bulk_names[u]))]
+            bulk_stats.up_to_date = len(initial_target_urls) - len(stale)
+            initial_target_urls = stale
+        # Bulk conversion is CPU-bound: use every core unless told otherwise
+        if workers is None and not server and not dynamic and not warc_path and (os.cpu_count() or 1) > 1:
+            workers = os.cpu_count()
+
+    # Every output except a single .md file or stdout goes through a buffered sink
+    single_file = (output_format == 'md' and output and not crawl and not bulk_names and count == 1
+                   and not os.path.isdir(output) and not output.endswith('/'))
+    sink = None
+    if output_format != 'md' or (output and not single_file):
+        if output_format != 'md' and output and not os.path.isdir(output) and os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        try:
+            sink = open_sink(output_format, output, batch_size=batch_size)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort()
+        # Mirrored names are taken up front, so no page named after its title gets one
+        for name in bulk_names.values():
+            sink.names.reserve(name)
+        if manifest is not None:
+            # Outputs of pages not rewritten this run keep their names
+            for entry in manifest.pages.values():
+                if entry.get('output_path'):
+                    sink.names.reserve(entry['output_path'])
+
     # 3. Process Loop
     if crawl:
         iterator = Crawler(initial_target_urls, max_depth=depth, max_pages=max_pages, only_subpaths=only_subpaths)
+        # A local mirror is crawled on disk; its root-relative links start at the start page's directory
+        if site_root is None and not server:
+            start_paths = [path for path in map(local_path, initial_target_urls) if path is not None]
+            if start_paths:
+                site_root = os.path.dirname(os.path.abspath(start_paths[0]))
     else:
         # Simple iterator for non-crawl mode
         iterator = zip(initial_target_urls, [0]*len(initial_target_urls))
 
     processed_count = 0
+    dedup_index = NearDuplicateIndex(threshold=dedup_threshold) if (dedup or dedup_report) else None
+    # --dedup-report alone only reports near-duplicates: they are still converted and saved
+    report_only = dedup_index is not None and not dedup
     
+    # Handle automatic assets directory if using 'file' action
+    current_assets_dir = assets_dir
+    if (svg_action == 'file' or image_action == 'file') and not current_assets_dir:
+        if output:
+            base_path = output if os.path.isdir(output) else os.path.dirname(output)
+            current_assets_dir = os.path.join(base_path or '.', 'assets')
+        else:
+            current_assets_dir = 'assets'
+
+    profiler = None
+    if profile_dir:
+        from md_scraper.profiling import Profiler
+        profiler = Profiler(profile_dir, top=profile_top, memory=profile_memory,
+                            memory_interval=profile_memory_interval, slow_threshold=slow_threshold)
+        profiler.start()
+
+    report = None
+    if report_path:
+        from md_scraper.report import CrawlReport
+        report = CrawlReport()
+    # Pages are scraped with stage timings when something will read them
+    want_timings = profiler is not None or report is not None
+    recorder = WarcWriter(warc_path) if warc_path else None
+    run_start = time.perf_counter()
+
+    # Remote pages are fetched concurrently, as are local pages with worker processes (each thread
+    # fetches a page, then waits for a worker to convert it) and static local pages with --jobs (the
+    # Scraper is shared by the threads). Dynamic local pages stay on this thread's browser.
+    if server:
+        concurrency = jobs or 4
+    elif workers:
+        concurrency = (jobs or 4) + workers
+    else:
+        concurrency = 1 if dynamic else jobs or 1
+    # Local page fetches are paced per host when a rate, retries or concurrency was asked for; a host's
+    # concurrency starts at the crawl's and adapts from there
+    limiter = None
+    if not server and replay is None and (rate is not None or retries is not None or jobs or workers):
+        limiter = RateLimiter(rate=rate, retries=3 if retries is None else retries, robots=not ignore_robots,
+                              max_concurrency=concurrency)
+
     try:
-        # We use a context manager to reuse the Scraper instance across multiple URLs if local
-        from contextlib import nullcontext
-        scraper_cm = Scraper() if not server else nullcontext()
-        
-        with scraper_cm as scraper:
-            for current_url, current_depth in iterator:
+        # We use a context manager to reuse the Scraper instance (or the remote client's session) across URLs
+        if server:
+            fields = DEFAULT_FIELDS + ('content_hash',) if manifest is not None else DEFAULT_FIELDS
+            if want_timings:
+                fields += ('timings',)
+            if dedup_index is not None:
+                fields += ('fingerprint',)
+            client_cm = RemoteClient(server, jobs=jobs or 4, fields=fields, policy=lb_policy)
+        elif workers:
+            client_cm = _this.ConversionPool(workers, replay=replay, limiter=limiter)
+        else:
+            client_cm = _this.Scraper(recorder=recorder, replay=replay, limiter=limiter)
+
+        with client_cm as client:
+            scraper = None if server else client
+            remote = client if server else None
+            # Local pages are checked against the dedup index between extraction and conversion, in the order
+            # they were queued, so duplicates aren't converted and the same page of a cluster stays canonical
+            # from run to run. Remote results arrive in order with their fingerprint, and are checked below.
+            checks = OrderedChecks(dedup_index, report_only=report_only) if dedup_index is not None and not server else None
+            fetch = partial(process_url_logic, server=server, dynamic=dynamic, strip=strip, svg_action=svg_action,
+                            image_action=image_action, assets_dir=current_assets_dir, scraper=scraper, remote=remote,
+                            dedup_index=checks, manifest=None if server else manifest, timings=want_timings,
+                            site_root=None if server else site_root, deadline=deadline,
+                            fingerprint=bool(server) and dedup_index is not None)
+
+            if remote is not None and len(remote.endpoints) > 1:
+                # Servers that are down start out of rotation
+                healthy = remote.check_health()
+                for endpoint in remote.endpoints:
+                    if endpoint not in healthy:
+                        click.echo(f"Warning: server {endpoint.url} failed its health check.", err=True)
+
+            # Each page is timed where it is fetched and converted: under --jobs, --workers or --server
+            # the gap between consecutive results isn't any page's duration
+            fetch_seconds = {}
+
+            def timed_fetch(url):
+                start = time.perf_counter()
+                try:
+                    return fetch(url)
+                finally:
+                    fetch_seconds[url] = time.perf_counter() - start
+
+            run = checks.iter_concurrent if checks is not None else iter_concurrent
+            for current_url, current_depth, result, error in run(iterator, timed_fetch, concurrency):
+                handle_start = time.perf_counter()
                 processed_count += 1
+                page_error = error
+                written_bytes = 0
                 prefix = f"[{processed_count}]" 
                 if crawl:
                     prefix += f" (Depth {current_depth})"
@@ -133,41 +389,50 @@ def scrape(urls, output, dynamic, strip, svg_action, image_action, assets_dir, s
                 click.echo(f"{prefix} Scraping {current_url}...", err=True)
 
                 try:
-                    # Handle automatic assets directory if using 'file' action
-                    current_assets_dir = assets_dir
-                    if (svg_action == 'file' or image_action == 'file') and not current_assets_dir:
-                        if output:
-                            base_path = output if os.path.isdir(output) else os.path.dirname(output)
-                            current_assets_dir = os.path.join(base_path or '.', 'assets')
-                        else:
-                            current_assets_dir = 'assets'
-
-                    result = process_url_logic(current_url, server, dynamic, strip, svg_action, image_action, current_assets_dir, scraper=scraper)
+                    if error is not None:
+                        raise error
+                    if server:
+                        result = check_remote_result(current_url, result, dedup_index=dedup_index, manifest=manifest)
                     markdown = result.get('markdown', '')
+                    duplicate_of = result.get('duplicate_of') if dedup else None
+                    if result.get('timed_out'):
+                        click.echo(f"  -> Deadline exceeded, cut short: {', '.join(result['timed_out'])}", err=True)
                     
                     # Determine Output
-                    if output:
-                        # Save to directory with auto-name
-                        if not crawl and count == 1 and not os.path.isdir(output) and not output.endswith('/'):
-                                # Single file case
-                                file_path = output
-                        else:
-                            # Directory case
-                            title = get_title_from_result(result, current_url)
-                            # Sanitize more aggressively for filenames
-                            filename = f"{sanitize_filename(title)}.md"
-                            file_path = os.path.join(output, filename)
-                        
-                        with open(file_path, 'w') as f:
+                    if result.get('unchanged'):
+                        manifest.mark_unchanged(current_url)
+                        click.echo("  -> Unchanged, skipped", err=True)
+                    elif duplicate_of:
+                        click.echo(f"  -> Skipped: near-duplicate of {duplicate_of}", err=True)
+                        if manifest is not None and result.get('content_hash'):
+                            manifest.record(current_url, result['content_hash'], None,
+                                            result.get('internal_links'), result.get('metadata'))
+                    elif sink is not None:
+                        # A changed page keeps the name it was written under before
+                        previous = manifest.pages.get(current_url) if manifest is not None else None
+                        name = bulk_names.get(current_url) or (previous.get('output_path') if previous else None)
+                        location = sink.write(current_url, result, name=name)
+                        written_bytes = len((markdown or '').encode('utf-8'))
+                        # Buffered pages are only written when their batch is flushed
+                        click.echo(f"  -> {'Queued' if sink.pending else 'Saved'}: {location}",
+                                   err=output_format in ('jsonl', 'bundle') and not output)
+
+                        if manifest is not None and result.get('content_hash'):
+                            manifest.record(current_url, result['content_hash'], os.path.relpath(location, output),
+                                            result.get('internal_links'), result.get('metadata'))
+                    elif output:
+                        # Single file case
+                        with open(output, 'w') as f:
                             f.write(markdown)
-                        click.echo(f"  -> Saved: {file_path}")
+                        written_bytes = len((markdown or '').encode('utf-8'))
+                        click.echo(f"  -> Saved: {output}")
                     else:
                         # Print to stdout
                         click.echo(f"\n--- URL: {current_url} ---\n")
                         click.echo(markdown)
                     
-                    # Feed Crawler
-                    if crawl and isinstance(iterator, Crawler):
+                    # Feed Crawler (optionally not from near-duplicate pages)
+                    if crawl and isinstance(iterator, Crawler) and not (duplicate_of and skip_duplicate_links):
                         # Try to get all internal links first
                         links = result.get('internal_links')
                         
@@ -178,24 +443,88 @@ def scrape(urls, output, dynamic, strip, svg_action, image_action, assets_dir, s
                             raw_html = result.get('raw_html', '')
                             if raw_html:
                                  # Reuse existing scraper if available
-                                 if scraper:
-                                     links = scraper.extract_links(raw_html, current_url)
+                                 if scraper and not workers:
+                                     links = scraper.extract_links(raw_html, current_url, site_root)
                                  else:
-                                     with Scraper() as temp_scraper:
-                                         links = temp_scraper.extract_links(raw_html, current_url)
+                                     with _this.Scraper() as temp_scraper:
+                                         links = temp_scraper.extract_links(raw_html, current_url, site_root)
                             else:
                                  links = result.get('nav_links', [])
 
+                        # A replayed crawl stays inside the archive
+                        if replay is not None:
+                            links = [link for link in links if link in replay]
                         iterator.add_links(links, current_depth)
                                 
                 except Exception as e:
+                    page_error = e
                     click.echo(f"  -> Failed to scrape {current_url}: {e}", err=True)
+                    if manifest is not None:
+                        manifest.mark_failed(current_url)
                     # Don't abort batch on single failure, unless it's a single requested URL (non-crawl)
-                    if not crawl and count == 1:
+                    if not crawl and count == 1 and not bulk_names:
                             raise click.Abort()
+                finally:
+                    # Fetching and converting, plus checking and writing the result here
+                    page_seconds = fetch_seconds.pop(current_url, 0.0) + time.perf_counter() - handle_start
+                    if profiler is not None:
+                        profiler.page(current_url, page_seconds, (result or {}).get('timings'), page_error)
+                    if report is not None:
+                        report.record(current_url, page_seconds, result, page_error, written_bytes)
+                    if bulk_stats is not None and current_url in bulk_names:
+                        bulk_stats.record(current_url, failed=page_error is not None)
+
+            if limiter is not None:
+                for host, stats in limiter.stats().items():
+                    if stats['retries'] or stats['slowdowns']:
+                        click.echo(f"Host {host}: {stats['requests']} requests, {stats['retries']} retried, slowed down "
+                                   f"{stats['slowdowns']} time(s), concurrency {stats['concurrency']}", err=True)
+
+            if remote is not None and len(remote.endpoints) > 1:
+                for stats in remote.stats():
+                    latency = f"{stats['latency']:.2f}s" if stats['latency'] is not None else "n/a"
+                    click.echo(f"Server {stats['url']}: {stats['requests']} requests, {stats['failures']} failed, "
+                               f"avg latency {latency}", err=True)
     except Exception as e:
         click.echo(f"Fatal error: {e}", err=True)
         raise click.Abort()
+    finally:
+        if sink is not None:
+            sink.close()
+            if sink.written_count:
+                click.echo(f"  -> Saved {sink.written_count} page(s): {sink.path or '<stdout>'}", err=True)
+        if recorder is not None:
+            recorder.close()
+            click.echo(f"  -> Saved WARC: {warc_path} ({recorder.responses} response(s))", err=True)
+        if manifest is not None:
+            manifest.save()
+        if profiler is not None:
+            click.echo(profiler.stop(), err=True)
+        if report is not None:
+            report.finish()
+            report.write(report_path)
+            click.echo(report.summary(), err=True)
+            click.echo(f"  -> Saved report: {report_path}", err=True)
+
+    if bulk_stats is not None:
+        click.echo(bulk_stats.summary(time.perf_counter() - run_start), err=True)
+
+    if manifest is not None:
+        changes = manifest.changes
+        click.echo(f"Manifest: {len(changes['new'])} new, {len(changes['changed'])} changed, "
+                   f"{len(changes['unchanged'])} unchanged, {len(changes['failed'])} failed.", err=True)
+
+    if dedup_index is not None:
+        dup_report = dedup_index.report()
+        click.echo(f"Near-duplicates: {dup_report['duplicate_pages']} of {dup_report['pages_checked']} pages in {len(dup_report['clusters'])} cluster(s).", err=True)
+        for cluster in dup_report['clusters']:
+            click.echo(f"  {cluster['canonical']}", err=True)
+            for dup in cluster['duplicates']:
+                click.echo(f"    = {dup}", err=True)
+        if dedup_report:
+            with open(dedup_report, 'w') as f:
+                json.dump(dup_report, f, indent=2)
+            click.echo(f"  -> Saved duplicate report: {dedup_report}", err=True)
 
 @cli.command()
 def hello():
@@ -1,12 +1,23 @@
+import threading
 from typing import Set, List, Dict, Optional
 from urllib.parse import urlparse
 from collections import deque
+from md_scraper.utils import file_url, local_path
 
 class Crawler:
     """
     Manages the crawling logic: queue, visited set, depth tracking, and domain filtering.
+
+    The frontier is locked, so several threads can take URLs and add the links
+    they found at the same time; every URL is handed out once.
+
+    Saved pages (file paths or ``file://`` URLs) can be crawled too: local start
+    pages are turned into ``file://`` URLs, matching the links that
+    ``Scraper.extract_links`` finds on them, and their subpaths are the files
+    under the start page's directory.
     """
     def __init__(self, start_urls: List[str], max_depth: int = 3, max_pages: int = 50, same_domain: bool = True, only_subpaths: bool = False):
+        start_urls = [self._normalize(url) for url in start_urls]
         # Queue stores tuples of (url, depth)
         self.queue = deque([(url, 0) for url in start_urls])
         self.visited: Set[str] = set(start_urls)
@@ -15,10 +26,18 @@ class Crawler:
         self.same_domain = same_domain
         self.only_subpaths = only_subpaths
         self.crawled_count = 0
-        
+        self._lock = threading.Lock()
+
         # Determine allowed domains from start_urls
         self.allowed_domains = {urlparse(url).netloc for url in start_urls}
         self.start_urls = start_urls
+        # A saved page's subpaths are the files next to and below it
+        self._subpath_prefixes = tuple(url.rsplit('/', 1)[0] + '/' if url.startswith('file:') else url for url in start_urls)
+
+    @staticmethod
+    def _normalize(url: str) -> str:
+        path = local_path(url)
+        return file_url(path) if path is not None else url
 
     def __iter__(self):
         return self
@@ -27,12 +46,13 @@ class Crawler:
         """
         Returns the next URL to scrape and its depth.
         """
-        if not self.queue or self.crawled_count >= self.max_pages:
-            raise StopIteration
-        
-        url, depth = self.queue.popleft()
-        self.crawled_count += 1
-        return url, depth
+        with self._lock:
+            if not self.queue or self.crawled_count >= self.max_pages:
+                raise StopIteration
+
+            url, depth = self.queue.popleft()
+            self.crawled_count += 1
+            return url, depth
 
     def add_links(self, links: List[str], current_depth: int):
         """
@@ -43,23 +63,25 @@ class Crawler:
             return
 
         for link in links:
-            if link in self.visited:
-                continue
-            
             # Domain Check
             if self.same_domain:
                 domain = urlparse(link).netloc
                 if domain not in self.allowed_domains:
                     continue
-            
+
             # Subpath Check
             if self.only_subpaths:
                 # Must start with at least one of the start_urls
-                if not any(link.startswith(s_url) for s_url in self.start_urls):
+                if not link.startswith(self._subpath_prefixes):
+                    continue
+
+            # Checked and marked together, so two threads can't both queue a link
+            with self._lock:
+                if link in self.visited:
                     continue
-            
-            self.visited.add(link)
-            self.queue.append((link, current_depth + 1))
+                self.visited.add(link)
+                self.queue.append((link, current_depth + 1))
 
     def has_next(self):
-        return bool(self.queue) and self.crawled_count < self.max_pages
+        with self._lock:
+            return bool(self.queue) and self.crawled_count < self.max_pages
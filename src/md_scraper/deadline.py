@@ -0,0 +1,98 @@
+import copy
+import threading
+import time
+from typing import List, Optional
+
+class DeadlineExceeded(TimeoutError):
+    """A page's deadline expired before it could be fetched or rendered."""
+
+class Deadline:
+    """
+    Time budget of one page, shared by all its stages: fetch or render, image
+    downloads and conversion.
+
+    Stages bound their waits by ``timeout()``. A stage that can do without the
+    rest of its work once the budget is spent (keeping remote image URLs,
+    keeping the Markdown converted so far) calls ``cut_short()`` instead of
+    failing, so the page's result can list what it is missing. Only a page that
+    couldn't be fetched at all fails, with ``DeadlineExceeded``.
+
+    A deadline of None never expires.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds (float): The budget, starting now; None for no deadline.
+        """
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+        # Stages cut short, in order; image downloads report from several threads
+        self.timed_out: List[str] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, value) -> 'Deadline':
+        """A deadline given as seconds (or None), or the Deadline itself."""
+        return value if isinstance(value, cls) else cls(value)
+
+    @classmethod
+    def resumed(cls, handover: tuple) -> 'Deadline':
+        """The deadline handed over by ``handover()``, e.g. in another process."""
+        seconds, expires_at = handover
+        deadline = cls(seconds)
+        if expires_at is not None:
+            deadline.expires = time.monotonic() + (expires_at - time.time())
+        return deadline
+
+    def handover(self) -> tuple:
+        """
+        The budget and its wall-clock expiry, for ``resumed()`` to rebuild the
+        deadline elsewhere. Time until it is resumed (e.g. in a queue) is charged.
+        """
+        remaining = self.remaining()
+        return self.seconds, time.time() + remaining if remaining is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once expired), or None without a deadline."""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def exceeded(self, stage: str) -> DeadlineExceeded:
+        return DeadlineExceeded(f"Page deadline of {self.seconds:g}s exceeded during {stage}")
+
+    def timeout(self, cap: Optional[float] = None, stage: str = 'fetch') -> Optional[float]:
+        """
+        Seconds a wait may take: what is left of the budget, at most ``cap``.
+
+        Raises:
+            DeadlineExceeded: If nothing is left.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        if remaining <= 0:
+            raise self.exceeded(stage)
+        return remaining if cap is None else min(cap, remaining)
+
+    def leaving(self, share: float) -> 'Deadline':
+        """
+        A deadline for an earlier stage that leaves ``share`` of the whole budget
+        to the stages after it. Stages it cuts short are recorded here too.
+        """
+        if self.expires is None:
+            return self
+        early = copy.copy(self)
+        early.expires = self.expires - share * self.seconds
+        return early
+
+    def cut_short(self, stage: str):
+        """Records that a stage left out work because the deadline expired."""
+        with self._lock:
+            if stage not in self.timed_out:
+                self.timed_out.append(stage)
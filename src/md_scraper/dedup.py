@@ -0,0 +1,296 @@
+import hashlib
+import re
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from md_scraper.utils import iter_concurrent
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def simhash(text: str, shingle_size: int = 3, bits: int = 64) -> Optional[int]:
+    """
+    Computes a SimHash fingerprint of a text using word shingles.
+
+    Near-identical texts produce fingerprints that differ in only a few bits,
+    so the Hamming distance between two fingerprints approximates how much
+    their content differs.
+
+    Args:
+        text (str): The text to fingerprint (usually the page's main content).
+        shingle_size (int): Number of consecutive words per feature.
+        bits (int): Fingerprint width in bits (multiple of 8, at most 512).
+
+    Returns:
+        Optional[int]: The fingerprint, or None if the text is too short to
+        fingerprint reliably.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < shingle_size:
+        return None
+
+    # Count shingles first so repeated boilerplate phrases are hashed once
+    shingles: Dict[str, int] = {}
+    for i in range(len(tokens) - shingle_size + 1):
+        shingle = ' '.join(tokens[i:i + shingle_size])
+        shingles[shingle] = shingles.get(shingle, 0) + 1
+
+    digest_size = bits // 8
+    weights = [0] * bits
+    for shingle, weight in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=digest_size).digest(), 'big')
+        for b in range(bits):
+            if h >> b & 1:
+                weights[b] += weight
+            else:
+                weights[b] -= weight
+
+    fingerprint = 0
+    for b, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << b
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """Returns the number of differing bits between two fingerprints."""
+    return bin(a ^ b).count('1')
+
+class NearDuplicateIndex:
+    """
+    Index of SimHash fingerprints that answers near-duplicate lookups.
+
+    Fingerprints are split into ``threshold + 1`` bands. By the pigeonhole
+    principle, two fingerprints within ``threshold`` bits of each other share
+    at least one identical band, so a lookup only compares against the
+    fingerprints bucketed under the query's bands instead of the whole index.
+    """
+
+    def __init__(self, threshold: int = 3, bits: int = 64, shingle_size: int = 3):
+        if threshold < 0 or threshold >= bits:
+            raise ValueError(f"threshold must be between 0 and {bits - 1}")
+        self.threshold = threshold
+        self.bits = bits
+        self.shingle_size = shingle_size
+
+        # Band layout: (shift, mask) pairs covering all bits
+        num_bands = threshold + 1
+        band_width = -(-bits // num_bands)
+        self._bands = []
+        for start in range(0, bits, band_width):
+            width = min(band_width, bits - start)
+            self._bands.append((start, (1 << width) - 1))
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+
+        self._fingerprints: List[int] = []
+        self._urls: List[str] = []
+        # Canonical URL -> near-duplicate URLs seen after it
+        self._clusters: Dict[str, List[str]] = {}
+        self.checked_count = 0
+        # check() may be called from several scraping threads
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._urls)
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """
+        Looks up an indexed page within the distance threshold.
+
+        Args:
+            fingerprint (int): The SimHash fingerprint to look up.
+
+        Returns:
+            Optional[str]: The URL of the closest indexed page, or None.
+        """
+        best_url = None
+        best_distance = self.threshold + 1
+        seen = set()
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for idx in table.get((fingerprint >> shift) & mask, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                distance = hamming_distance(fingerprint, self._fingerprints[idx])
+                if distance < best_distance:
+                    best_distance = distance
+                    best_url = self._urls[idx]
+        return best_url
+
+    def add(self, url: str, fingerprint: int):
+        """Adds a fingerprint to the index under the given URL."""
+        idx = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        self._urls.append(url)
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fingerprint >> shift) & mask, []).append(idx)
+
+    def check(self, url: str, text: str) -> Optional[str]:
+        """
+        Fingerprints a page and either indexes it or records it as a duplicate.
+
+        Args:
+            url (str): The URL of the page.
+            text (str): The page's main content text.
+
+        Returns:
+            Optional[str]: The canonical URL this page duplicates, or None if the
+            page is new (in which case it is added to the index).
+        """
+        return self.check_fingerprint(url, self.fingerprint(text))
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """Fingerprints a text the way ``check`` does (None if it is too short)."""
+        return simhash(text, shingle_size=self.shingle_size, bits=self.bits)
+
+    def check_fingerprint(self, url: str, fingerprint: Optional[int]) -> Optional[str]:
+        """
+        Like ``check``, for a page fingerprinted elsewhere (e.g. in a worker
+        process or on a server) with the same shingle size and width.
+        """
+        with self._lock:
+            self.checked_count += 1
+            if fingerprint is None:
+                return None
+
+            canonical = self.find(fingerprint)
+            if canonical is not None:
+                self._clusters.setdefault(canonical, []).append(url)
+                return canonical
+
+            self.add(url, fingerprint)
+            return None
+
+    def clusters(self) -> Dict[str, List[str]]:
+        """Returns a mapping of canonical URL to the near-duplicates found for it."""
+        return {canonical: list(dups) for canonical, dups in self._clusters.items()}
+
+    def report(self) -> dict:
+        """
+        Builds a summary of the duplicate clusters found so far.
+
+        Returns:
+            dict: A JSON-serializable report with page counts and clusters.
+        """
+        clusters = [
+            {'canonical': canonical, 'duplicates': list(dups)}
+            for canonical, dups in self._clusters.items()
+        ]
+        return {
+            'threshold': self.threshold,
+            'pages_checked': self.checked_count,
+            'unique_pages': len(self._urls),
+            'duplicate_pages': sum(len(c['duplicates']) for c in clusters),
+            'clusters': clusters
+        }
+
+class OrderedChecks:
+    """
+    Checks concurrently scraped pages against a ``NearDuplicateIndex`` in the
+    order they were queued, so the same page of a cluster stays canonical from
+    run to run whichever page is fetched first.
+
+    Pass it to ``Scraper.scrape`` (or ``ConversionPool.scrape``) as the
+    ``dedup_index`` of pages run through ``iter_concurrent`` below. Pages are
+    fetched, parsed and fingerprinted side by side; a page's check then waits
+    until every page queued before it has been checked or has finished without
+    a check (failed, or unchanged). Conversion only starts after the check, so
+    duplicates are never converted.
+    """
+
+    def __init__(self, index: NearDuplicateIndex, report_only: bool = False):
+        """
+        Args:
+            index (NearDuplicateIndex): The index the pages are checked against.
+            report_only (bool): Only record near-duplicates in the index; the
+                checks return None, so duplicates are converted like any page.
+        """
+        self.index = index
+        self.report_only = report_only
+        self._cond = threading.Condition()
+        # Turns handed out per URL, and the first turn not yet finished
+        self._turns: Dict[str, deque] = {}
+        self._queued = 0
+        self._next = 0
+        self._finished = set()
+        self._closed = False
+        # The turn of the page the current thread is scraping
+        self._local = threading.local()
+
+    def iter_concurrent(self, items: Iterable, fn: Callable, jobs: int = 1) -> Iterator[tuple]:
+        """``utils.iter_concurrent``, with each page's check taking its turn in the order of ``items``."""
+        pages = iter_concurrent(_Queue(self, iter(items)), self._taking_turns(fn), jobs)
+        try:
+            for page in pages:
+                yield page
+        finally:
+            # Abandoned early: queued pages are cancelled, so the turns waited for may never come.
+            # (``pages`` is still referenced here, so it winds down its threads only after this.)
+            self.close()
+
+    def _queue(self, url: str):
+        with self._cond:
+            self._turns.setdefault(url, deque()).append(self._queued)
+            self._queued += 1
+
+    def _taking_turns(self, fn):
+        def run(url):
+            with self._cond:
+                turns = self._turns.get(url)
+                turn = turns.popleft() if turns else None
+            self._local.turn = turn
+            try:
+                return fn(url)
+            finally:
+                self._local.turn = None
+                if turn is not None:
+                    self._finish(turn)
+        return run
+
+    def _finish(self, turn: int):
+        with self._cond:
+            if turn < self._next:
+                return
+            self._finished.add(turn)
+            while self._next in self._finished:
+                self._finished.discard(self._next)
+                self._next += 1
+            self._cond.notify_all()
+
+    def check(self, url: str, text: str) -> Optional[str]:
+        """``NearDuplicateIndex.check``, once it is the page's turn."""
+        # Fingerprinted before waiting, so pages aren't hashed one at a time
+        return self.check_fingerprint(url, self.index.fingerprint(text))
+
+    def check_fingerprint(self, url: str, fingerprint: Optional[int]) -> Optional[str]:
+        """``NearDuplicateIndex.check_fingerprint``, once it is the page's turn."""
+        turn = getattr(self._local, 'turn', None)
+        if turn is not None:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._next >= turn)
+        duplicate_of = self.index.check_fingerprint(url, fingerprint)
+        if turn is not None:
+            # Pages queued after this one needn't wait for its conversion
+            self._local.turn = None
+            self._finish(turn)
+        return None if self.report_only else duplicate_of
+
+    def close(self):
+        """Stops waiting for turns: pending checks go ahead in any order."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+class _Queue:
+    """Hands out turns as pages are queued; a Crawler is asked again after running dry, so this is no generator."""
+
+    def __init__(self, checks: OrderedChecks, items: Iterator):
+        self.checks = checks
+        self.items = items
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        url, depth = next(self.items)
+        self.checks._queue(url)
+        return url, depth
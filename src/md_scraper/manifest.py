@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+MANIFEST_FILENAME = '.scraper-manifest.json'
+MANIFEST_VERSION = 1
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class CrawlManifest:
+    """
+    Persistent record of the pages written to an output directory.
+
+    Maps each URL to the hash of its fetched content, the output path and
+    timestamps. On a rerun, pages whose content hash is unchanged (and whose
+    output still exists) can skip conversion and writing entirely; the links
+    stored for them keep the crawl frontier intact.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pages: Dict[str, dict] = {}
+        self.changes: Dict[str, List[str]] = {'new': [], 'changed': [], 'unchanged': [], 'failed': []}
+        self.started = _now()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.pages = data.get('pages', {})
+
+    @classmethod
+    def for_directory(cls, output_dir: str) -> 'CrawlManifest':
+        """Opens (or starts) the manifest stored in an output directory."""
+        return cls(os.path.join(output_dir, MANIFEST_FILENAME))
+
+    @property
+    def base_dir(self) -> str:
+        return os.path.dirname(self.path) or '.'
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """Returns the SHA-256 hex digest of fetched page content."""
+        return hashlib.sha256(content.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+    def lookup(self, url: str, content_hash: str) -> Optional[dict]:
+        """
+        Returns the stored entry for a page if its content is unchanged.
+
+        Args:
+            url (str): The page URL.
+            content_hash (str): Hash of the freshly fetched content.
+
+        Returns:
+            Optional[dict]: The manifest entry, or None if the page is new,
+            changed, or its previous output has gone missing.
+        """
+        entry = self.pages.get(url)
+        if not entry or entry.get('content_hash') != content_hash:
+            return None
+        output_path = entry.get('output_path')
+        if output_path and not os.path.exists(os.path.join(self.base_dir, output_path)):
+            return None
+        return entry
+
+    def record(self, url: str, content_hash: str, output_path: Optional[str] = None,
+               internal_links: Optional[List[str]] = None, metadata: Optional[dict] = None) -> str:
+        """
+        Records a page that was converted and written during this run.
+
+        Args:
+            url (str): The page URL.
+            content_hash (str): Hash of the fetched content.
+            output_path (str): Where the output was written, relative to the manifest.
+            internal_links (List[str]): Links found on the page, reused when it is unchanged.
+            metadata (dict): Page metadata, reused when it is unchanged.
+
+        Returns:
+            str: 'new' or 'changed'.
+        """
+        now = _now()
+        previous = self.pages.get(url)
+        status = 'changed' if previous else 'new'
+        self.pages[url] = {
+            'content_hash': content_hash,
+            'output_path': output_path,
+            'first_seen': previous.get('first_seen', now) if previous else now,
+            'last_changed': now,
+            'last_checked': now,
+            'metadata': metadata or {},
+            'internal_links': list(internal_links or [])
+        }
+        self.changes[status].append(url)
+        return status
+
+    def mark_unchanged(self, url: str):
+        """Records that a page was checked during this run and had not changed."""
+        self.pages[url]['last_checked'] = _now()
+        self.changes['unchanged'].append(url)
+
+    def mark_failed(self, url: str):
+        """Records that a page could not be fetched during this run."""
+        self.changes['failed'].append(url)
+
+    def save(self):
+        """Writes the manifest atomically so an interrupted run never corrupts it."""
+        data = {
+            'version': MANIFEST_VERSION,
+            'last_run': {
+                'started': self.started,
+                'finished': _now(),
+                **{status: list(urls) for status, urls in self.changes.items()}
+            },
+            'pages': self.pages
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,107 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, List, Optional
+
+# Stages of Scraper.scrape(), in the order they run
+STAGES = ('fetch', 'render', 'parse', 'metadata', 'links', 'extract', 'dedup', 'svg', 'images', 'convert', 'sanitize')
+
+# collector(url, timings, error): timings is StageTimings.as_dict(), error the
+# exception if the scrape failed (None otherwise)
+Collector = Callable[[str, dict, Optional[BaseException]], None]
+
+_collectors: List[Collector] = []
+_collectors_lock = threading.Lock()
+
+def add_collector(collector: Collector):
+    """
+    Registers a function called with the stage timings of every scrape in this process.
+
+    Collectors run on the scraping thread right after each page, so they should
+    be quick; exceptions they raise are ignored.
+    """
+    with _collectors_lock:
+        _collectors.append(collector)
+
+def remove_collector(collector: Collector):
+    with _collectors_lock:
+        if collector in _collectors:
+            _collectors.remove(collector)
+
+def has_collectors() -> bool:
+    return bool(_collectors)
+
+def emit(url: str, timings: dict, error: Optional[BaseException] = None):
+    """Passes one scrape's timings to every registered collector."""
+    for collector in list(_collectors):
+        try:
+            collector(url, timings, error)
+        except Exception:
+            pass
+
+class StageTimings:
+    """
+    Wall-clock time, byte counts and item counters per stage of one scrape.
+
+    Safe to update from several threads (images are downloaded in parallel).
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._stages = {}
+        self._info = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block and adds it to stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, seconds=time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float = 0.0, bytes: Optional[int] = None, count: Optional[int] = None):
+        """Adds time, bytes and/or an item count to stage ``name``."""
+        with self._lock:
+            entry = self._stages.setdefault(name, {'seconds': 0.0})
+            entry['seconds'] += seconds
+            if bytes is not None:
+                entry['bytes'] = entry.get('bytes', 0) + bytes
+            if count is not None:
+                entry['count'] = entry.get('count', 0) + count
+
+    def set(self, key: str, value):
+        """Records a fact about the page itself (e.g. its HTTP 'status')."""
+        with self._lock:
+            self._info[key] = value
+
+    def as_dict(self) -> dict:
+        """
+        Returns:
+            dict: ``{'total': seconds, 'stages': {name: {'seconds', ['bytes'], ['count']}}}``
+                with stages in the order they ran, plus any values given to ``set``.
+        """
+        with self._lock:
+            stages = {name: {**entry, 'seconds': round(entry['seconds'], 6)} for name, entry in self._stages.items()}
+            info = dict(self._info)
+        return {'total': round(time.perf_counter() - self._start, 6), **info, 'stages': stages}
+
+class _NullTimings:
+    """Stand-in used when nobody asked for timings: every call is a no-op."""
+
+    enabled = False
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+    def add(self, name: str, seconds: float = 0.0, bytes: Optional[int] = None, count: Optional[int] = None):
+        pass
+
+    def set(self, key: str, value):
+        pass
+
+NULL_TIMINGS = _NullTimings()
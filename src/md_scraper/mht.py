@@ -0,0 +1,157 @@
+import base64
+import mmap
+import quopri
+from email import policy
+from email.parser import BytesHeaderParser
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urljoin
+
+MHT_EXTENSIONS = ('.mht', '.mhtml')
+
+def is_mht(path: str) -> bool:
+    return path.lower().endswith(MHT_EXTENSIONS)
+
+class MhtPart(NamedTuple):
+    """A leaf MIME part of an archive: its headers and the byte range of its (still encoded) body."""
+    content_type: str
+    charset: Optional[str]
+    location: Optional[str]
+    content_id: Optional[str]
+    encoding: str
+    start: int
+    end: int
+
+def _header_end(data, start: int, end: int) -> Tuple[int, int]:
+    """Offsets of the blank line ending the headers at ``start``: (end of headers, start of body)."""
+    if data[start:start + 2] == b'\r\n':
+        return start, start + 2
+    if data[start:start + 1] == b'\n':
+        return start, start + 1
+    candidates = [(pos, pos + len(sep)) for sep in (b'\r\n\r\n', b'\n\n')
+                  for pos in (data.find(sep, start, end),) if pos != -1]
+    return min(candidates) if candidates else (end, end)
+
+def _line_end(data, pos: int, end: int) -> int:
+    """Offset just after the line containing ``pos``."""
+    newline = data.find(b'\n', pos, end)
+    return end if newline == -1 else newline + 1
+
+def _strip_line_break(data, pos: int) -> int:
+    """The line break before a boundary belongs to the boundary (RFC 2046)."""
+    if data[pos - 2:pos] == b'\r\n':
+        return pos - 2
+    if data[pos - 1:pos] == b'\n':
+        return pos - 1
+    return pos
+
+class MhtArchive:
+    """
+    Index of the parts of a saved MHT/MHTML page.
+
+    The file is scanned once through ``mmap``: only the headers of each part and
+    the byte range of its body are kept. Bodies are read back from disk and
+    decoded when asked for, so a large archive is never held in memory as a
+    whole, and the page's images can be served from it (by their original URL
+    or a ``cid:`` reference) instead of being downloaded again.
+
+    Reading parts is thread-safe; each read opens the file on its own.
+    """
+
+    # Images that aren't embedded are still downloaded
+    offline = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parts: List[MhtPart] = []
+        self._by_location: Dict[str, MhtPart] = {}
+        self._by_cid: Dict[str, MhtPart] = {}
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    self._index(data, 0, size)
+        for part in self.parts:
+            if part.location:
+                self._by_location.setdefault(part.location, part)
+            if part.content_id:
+                self._by_cid.setdefault(part.content_id, part)
+
+        self._page = (next((p for p in self.parts if p.content_type == 'text/html'), None)
+                      or next((p for p in self.parts if p.content_type == 'text/plain'), None))
+        # Relative references in the page resolve against the URL it was saved from
+        self.location = self._page.location if self._page is not None else None
+
+    def _index(self, data, start: int, end: int):
+        header_end, body = _header_end(data, start, end)
+        headers = BytesHeaderParser(policy=policy.default).parsebytes(bytes(data[start:header_end]))
+        content_type = headers.get_content_type()
+        boundary = headers.get_param('boundary') if headers.get_content_maintype() == 'multipart' else None
+        if not boundary:
+            content_id = headers.get('Content-ID')
+            self.parts.append(MhtPart(
+                content_type=content_type,
+                charset=headers.get_param('charset') or None,
+                location=str(headers['Content-Location']).strip() if headers['Content-Location'] else None,
+                content_id=str(content_id).strip().strip('<>') if content_id else None,
+                encoding=str(headers.get('Content-Transfer-Encoding', '')).strip().lower(),
+                start=body,
+                end=end))
+            return
+
+        delimiter = b'--' + str(boundary).encode('ascii', 'replace')
+        part_start = None
+        pos = data.find(delimiter, body, end)
+        while pos != -1:
+            # Only delimiters at the start of a line count
+            if pos == body or data[pos - 1:pos] == b'\n':
+                if part_start is not None:
+                    self._index(data, part_start, _strip_line_break(data, pos))
+                if data[pos + len(delimiter):pos + len(delimiter) + 2] == b'--':
+                    return
+                part_start = _line_end(data, pos, end)
+            pos = data.find(delimiter, pos + len(delimiter), end)
+        # No closing delimiter: the last part runs to the end
+        if part_start is not None and part_start < end:
+            self._index(data, part_start, end)
+
+    def read(self, part: MhtPart) -> bytes:
+        """The decoded body of a part."""
+        with open(self.path, 'rb') as f:
+            f.seek(part.start)
+            raw = f.read(part.end - part.start)
+        if part.encoding == 'base64':
+            return base64.b64decode(raw)
+        if part.encoding == 'quoted-printable':
+            return quopri.decodestring(raw)
+        return raw
+
+    def html(self) -> str:
+        """
+        The saved page: the first text/html part (or text/plain, if there is none).
+
+        Raises:
+            ValueError: If the archive has no such part.
+        """
+        if self._page is None:
+            raise ValueError(f"Could not find text/html content in MHT file: {self.path}")
+        content = self.read(self._page)
+        try:
+            return content.decode(self._page.charset or 'utf-8', errors='replace')
+        except LookupError:
+            return content.decode('utf-8', errors='replace')
+
+    def find(self, src: str) -> Optional[MhtPart]:
+        """The part a reference in the page points to: a ``cid:`` URL, or a URL relative to the page."""
+        if src.startswith('cid:'):
+            return self._by_cid.get(unquote(src[4:]))
+        part = self._by_location.get(src)
+        if part is None and self.location:
+            part = self._by_location.get(urljoin(self.location, src))
+        return part
+
+    def get(self, src: str) -> Optional[Tuple[str, bytes]]:
+        """``(content_type, content)`` of an embedded resource, or None if it isn't in the archive."""
+        part = self.find(src)
+        if part is None:
+            return None
+        return part.content_type, self.read(part)
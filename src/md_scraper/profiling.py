@@ -0,0 +1,154 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from typing import List, Optional
+
+class Profiler:
+    """
+    Profiles a CLI run into a directory that standard tools can read.
+
+    Writes:
+        cpu.prof: cProfile data (``python -m pstats``, snakeviz, gprof2dot).
+        cpu_top.txt: The ``top`` functions by cumulative and by own time.
+        slow_pages.jsonl: One line per page that took ``slow_threshold`` seconds
+            or more, with its stage timings when known.
+        memory/snapshot_NNNNN.tracemalloc: With ``memory``, a tracemalloc snapshot
+            every ``memory_interval`` pages (``tracemalloc.Snapshot.load``).
+        memory_top.txt: With ``memory``, the allocation sites that grew most
+            between the first and the last snapshot.
+
+    cProfile only sees the thread that started it, so with ``--server --jobs``
+    the request threads are missing from the CPU profile (the page log still
+    covers every page).
+    """
+
+    def __init__(self, directory: str, top: int = 30, memory: bool = False, memory_interval: int = 10,
+                 slow_threshold: float = 5.0):
+        """
+        Args:
+            directory (str): Output directory, created if needed.
+            top (int): Number of functions in the text summaries.
+            memory (bool): Whether to trace allocations (slows the run down noticeably).
+            memory_interval (int): Pages between tracemalloc snapshots.
+            slow_threshold (float): Seconds from which a page is logged as slow.
+        """
+        self.directory = directory
+        self.top = top
+        self.memory = memory
+        self.memory_interval = max(memory_interval, 1)
+        self.slow_threshold = slow_threshold
+        self.pages = 0
+        self.slow_pages = 0
+        self._profile = cProfile.Profile()
+        self._snapshots: List[str] = []
+        self._slow_log = None
+        self._start = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._slow_log = open(os.path.join(self.directory, 'slow_pages.jsonl'), 'w')
+        if self.memory:
+            os.makedirs(os.path.join(self.directory, 'memory'), exist_ok=True)
+            tracemalloc.start()
+            self._snapshot()
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.directory, 'memory', f'snapshot_{self.pages:05d}.tracemalloc')
+
+    def _snapshot(self):
+        path = self._snapshot_path()
+        tracemalloc.take_snapshot().dump(path)
+        self._snapshots.append(path)
+
+    def page(self, url: str, seconds: float, timings: Optional[dict] = None, error: Optional[BaseException] = None):
+        """
+        Records one finished page: logs it if slow and takes a memory snapshot when due.
+
+        Args:
+            url (str): The page's URL.
+            seconds (float): Wall-clock time the page took.
+            timings (dict): The result's stage timings, if it has them.
+            error (Exception): The error, if the page failed.
+        """
+        self.pages += 1
+        if seconds >= self.slow_threshold:
+            self.slow_pages += 1
+            entry = {'url': url, 'seconds': round(seconds, 3)}
+            if timings:
+                entry['stages'] = {name: stage['seconds'] for name, stage in timings.get('stages', {}).items()}
+            if error is not None:
+                entry['error'] = str(error)
+            self._slow_log.write(json.dumps(entry) + '\n')
+            self._slow_log.flush()
+        if self.memory and self.pages % self.memory_interval == 0:
+            # Snapshots are taken outside the CPU profile so they don't show up in it
+            self._profile.disable()
+            try:
+                self._snapshot()
+            finally:
+                self._profile.enable()
+
+    def stop(self) -> str:
+        """
+        Stops profiling and writes the profile files.
+
+        Returns:
+            str: A short summary for the terminal.
+        """
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start
+        self._slow_log.close()
+
+        self._profile.dump_stats(os.path.join(self.directory, 'cpu.prof'))
+        with open(os.path.join(self.directory, 'cpu_top.txt'), 'w') as f:
+            for sort in ('cumulative', 'tottime'):
+                f.write(f"=== Top {self.top} by {sort} ===\n")
+                pstats.Stats(self._profile, stream=f).strip_dirs().sort_stats(sort).print_stats(self.top)
+
+        lines = [f"Profile: {self.pages} page(s) in {elapsed:.1f}s, {self.slow_pages} slower than "
+                 f"{self.slow_threshold:g}s -> {self.directory}"]
+        if self.memory:
+            # Final snapshot, unless one was just taken after the last page
+            if self._snapshots[-1] != self._snapshot_path():
+                self._snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            growth = self._write_memory_top()
+            lines.append(f"Memory: peak {peak / 1024 / 1024:.1f} MiB traced, {growth / 1024 / 1024:+.1f} MiB "
+                         f"between first and last snapshot")
+
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).strip_dirs().sort_stats('cumulative').print_stats(min(self.top, 10))
+        # Keep the table, not the pstats preamble
+        table = stream.getvalue()
+        lines.append(table[table.find('   ncalls'):].rstrip() if '   ncalls' in table else table.rstrip())
+        return '\n'.join(lines)
+
+    def _write_memory_top(self) -> int:
+        """Writes the largest allocation increases between the first and last snapshots; returns the net growth."""
+        # Module imports (the scraper is imported on the first page) aren't growth
+        filters = [tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                   tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+                   tracemalloc.Filter(False, tracemalloc.__file__)]
+        first = tracemalloc.Snapshot.load(self._snapshots[0]).filter_traces(filters)
+        last = tracemalloc.Snapshot.load(self._snapshots[-1]).filter_traces(filters)
+        diff = last.compare_to(first, 'lineno')
+        with open(os.path.join(self.directory, 'memory_top.txt'), 'w') as f:
+            f.write(f"=== Top {self.top} allocation sites by growth ({os.path.basename(self._snapshots[0])} -> "
+                    f"{os.path.basename(self._snapshots[-1])}) ===\n")
+            for stat in diff[:self.top]:
+                f.write(f"{stat}\n")
+        return sum(stat.size_diff for stat in diff)
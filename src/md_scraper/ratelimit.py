@@ -0,0 +1,382 @@
+import contextlib
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from md_scraper.deadline import Deadline, DeadlineExceeded
+
+# Responses worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Responses that mean the host wants fewer requests: the whole host is paused
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# requests is imported where it is used, so the CLI can import this module on startup
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), or None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def robots_delay(text: str, user_agent: str = '*') -> Optional[float]:
+    """
+    Seconds between requests that a robots.txt asks of a user agent, from its
+    ``Crawl-delay`` or ``Request-rate`` (``urllib.robotparser`` only reads whole
+    seconds), taken from the agent's group or else the ``*`` group.
+    """
+    agent = user_agent.split('/')[0].lower()
+    groups = []
+    in_agents = False
+    for line in text.splitlines():
+        name, _, value = line.split('#', 1)[0].partition(':')
+        name, value = name.strip().lower(), value.strip()
+        if name == 'user-agent':
+            if not in_agents:
+                groups.append(([], {}))
+            groups[-1][0].append(value.lower())
+            in_agents = True
+        elif name and groups:
+            in_agents = False
+            groups[-1][1].setdefault(name, value)
+
+    def delay(rules):
+        delays = []
+        with contextlib.suppress(ValueError):
+            delays.append(float(rules.get('crawl-delay', '')))
+        # Request-rate: <requests>/<period>, the period in seconds or with an s/m/h unit
+        count, _, period = rules.get('request-rate', '').partition('/')
+        unit = {'s': 1, 'm': 60, 'h': 3600}.get(period.strip()[-1:].lower(), 1)
+        with contextlib.suppress(ValueError, ZeroDivisionError):
+            delays.append(float(period.strip().rstrip('smhSMH')) * unit / float(count))
+        delays = [d for d in delays if d > 0]
+        return max(delays) if delays else None
+
+    for match in (lambda name: name != '*' and name in agent, lambda name: name == '*'):
+        for agents, rules in groups:
+            if any(match(name) for name in agents):
+                return delay(rules)
+    return None
+
+class HostState:
+    """Token bucket, adaptive concurrency limit and counters of one host."""
+
+    def __init__(self, rate: Optional[float], burst: int, concurrency: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.limit = float(concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        # Moving average of response times, and the best it has been
+        self.latency = None
+        self.best_latency = None
+        self.last_decrease = 0.0
+        # None until robots.txt was looked at, 'pending' while it is being fetched
+        self.robots = None
+        self.crawl_delay = None
+        self.requests = 0
+        self.retries = 0
+        self.slowdowns = 0
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def wait_time(self, now: float) -> Optional[float]:
+        """Seconds until a request may start: 0 for now, None until another one finishes."""
+        if self.in_flight >= max(1, int(self.limit)):
+            return None
+        self._refill(now)
+        wait = self.paused_until - now
+        if self.rate is not None and self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return max(0.0, wait)
+
+    def stats(self) -> dict:
+        return {
+            'rate': self.rate,
+            'crawl_delay': self.crawl_delay,
+            'concurrency': int(self.limit),
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'retries': self.retries,
+            'slowdowns': self.slowdowns,
+            'latency': self.latency
+        }
+
+class RateLimiter:
+    """
+    Paces requests per host, retries throttled and failed ones, and adapts each
+    host's concurrency to how well it copes.
+
+    Each host gets a token bucket refilled at ``rate`` requests per second (or
+    one per robots.txt ``Crawl-delay``/``Request-rate``, if that is slower) and a
+    concurrency limit that grows by one per round of successful requests and is
+    halved when the host answers 429/5xx, fails to connect, or slows down to
+    ``latency_factor`` times its best moving-average latency. A 429 or 503
+    pauses the whole host for its ``Retry-After`` (or the backoff delay), so the
+    other threads wait too instead of piling on.
+
+    Failed attempts (429, 5xx, connection errors and timeouts) are retried up to
+    ``retries`` times with exponential backoff and full jitter. A ``Retry-After``
+    longer than ``max_backoff`` isn't waited for: the last response is returned.
+
+    One limiter can be shared by any number of threads and scrapers.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 1, max_concurrency: int = 8, min_concurrency: int = 1,
+                 retries: int = 3, backoff: float = 1.0, max_backoff: float = 60.0, robots: bool = True,
+                 user_agent: str = '*', latency_factor: float = 3.0, robots_timeout: float = 10.0):
+        """
+        Args:
+            rate (float): Requests per second per host; None for no fixed limit.
+            burst (int): Requests a host may get at once after being idle.
+            max_concurrency (int): Upper bound of a host's requests in flight.
+            min_concurrency (int): Lower bound the limit shrinks to.
+            retries (int): Retries of a failed request (0 to disable).
+            backoff (float): Base delay of the exponential backoff, in seconds.
+            max_backoff (float): Cap of a backoff delay or honored Retry-After, in seconds.
+            robots (bool): Whether to read each host's robots.txt for its crawl delay.
+            user_agent (str): User agent looked up in robots.txt, and sent when
+                reading it unless it is '*'.
+            latency_factor (float): Latency, as a multiple of the host's best, that
+                counts as overload.
+            robots_timeout (float): Timeout of a robots.txt request, in seconds.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.robots = robots
+        self.user_agent = user_agent
+        self.latency_factor = latency_factor
+        self.robots_timeout = robots_timeout
+        self._hosts: Dict[str, HostState] = {}
+        self._cond = threading.Condition()
+
+    def __getstate__(self):
+        # Pickled (e.g. for worker processes) as its settings; each copy paces on its own
+        state = self.__dict__.copy()
+        del state['_cond']
+        state['_hosts'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _state(self, host: str) -> HostState:
+        """Called with the lock held."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.rate, self.burst, self.max_concurrency)
+        return state
+
+    def _read_robots(self, url: str, session=None) -> Optional[float]:
+        """
+        Seconds between requests asked for by the host's robots.txt, or None.
+
+        It is read through the scraper's session (if any), so it gets the same
+        headers, auth and proxies as the pages.
+        """
+        import requests
+        parts = urlparse(url)
+        http = session if session is not None else requests
+        headers = {'User-Agent': self.user_agent} if self.user_agent != '*' else None
+        try:
+            response = http.get(f"{parts.scheme}://{parts.netloc}/robots.txt", timeout=self.robots_timeout, headers=headers)
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return robots_delay(response.text, self.user_agent)
+
+    def acquire(self, url: str, deadline: Optional[Deadline] = None, session=None) -> str:
+        """
+        Waits until the URL's host may get another request and takes a slot.
+
+        Args:
+            url (str): The URL to be requested.
+            deadline (Deadline): Optional deadline of the page; the wait stops there.
+            session (requests.Session): Optional session of the requester, used to
+                read the host's robots.txt.
+
+        Returns:
+            str: The host, to pass to ``release``.
+
+        Raises:
+            DeadlineExceeded: If the deadline expired while waiting.
+        """
+        host = self.host_of(url)
+        with self._cond:
+            state = self._state(host)
+            while True:
+                if self.robots and state.robots is None and urlparse(url).scheme in ('http', 'https'):
+                    # The first request to a host reads its robots.txt; the others wait for it
+                    state.robots = 'pending'
+                    self._cond.release()
+                    try:
+                        delay = self._read_robots(url, session)
+                    except Exception:
+                        # An unreadable robots.txt sets no delay
+                        delay = None
+                    finally:
+                        self._cond.acquire()
+                    state.robots = 'done'
+                    if delay is not None:
+                        state.crawl_delay = delay
+                        state.rate = min(state.rate, 1 / delay) if state.rate is not None else 1 / delay
+                        state.burst = 1
+                        state.tokens = min(state.tokens, 1.0)
+                    self._cond.notify_all()
+                    continue
+                wait = None if state.robots == 'pending' else state.wait_time(time.monotonic())
+                if wait == 0:
+                    break
+                if deadline is not None and deadline.expires is not None:
+                    wait = deadline.timeout(wait, f"the wait for {host}")
+                self._cond.wait(wait)
+            if state.rate is not None:
+                state.tokens -= 1
+            state.in_flight += 1
+        return host
+
+    def release(self, host: str, latency: Optional[float] = None, failed: bool = False, pause: Optional[float] = None):
+        """
+        Frees a slot taken by ``acquire`` and adapts the host's limit.
+
+        Args:
+            host (str): The host ``acquire`` returned.
+            latency (float): Seconds the request took.
+            failed (bool): Whether the host failed or throttled the request.
+            pause (float): Seconds no request may be sent to the host.
+        """
+        with self._cond:
+            state = self._state(host)
+            now = time.monotonic()
+            state.in_flight -= 1
+            state.requests += 1
+            overloaded = failed
+            if latency is not None and not failed:
+                state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+                state.best_latency = min(state.best_latency or state.latency, state.latency)
+                overloaded = state.latency > self.latency_factor * state.best_latency and state.requests > 3
+            if overloaded:
+                # At most once per round trip, so one burst of errors doesn't collapse the limit
+                if now - state.last_decrease > (state.latency or 1.0):
+                    state.limit = max(self.min_concurrency, state.limit / 2)
+                    state.last_decrease = now
+                    state.slowdowns += 1
+            else:
+                state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+            if pause:
+                state.paused_until = max(state.paused_until, now + pause)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, url: str, deadline: Optional[Deadline] = None, session=None):
+        """Holds a slot of the URL's host for the duration of the block (no retries)."""
+        host = self.acquire(url, deadline, session)
+        start = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.release(host, time.monotonic() - start, failed)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter: up to ``backoff * 2 ** attempt``, capped."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, url: str, send: Callable, deadline: Optional[Deadline] = None, session=None):
+        """
+        Sends a request through the limiter, retrying failed attempts.
+
+        Args:
+            url (str): The URL requested (its host is paced).
+            send (Callable): Sends the request and returns a ``requests`` response.
+            deadline (Deadline): Optional deadline of the page: no retry is
+                started that would have to wait past it.
+            session (requests.Session): Optional session of the requester, used to
+                read the host's robots.txt.
+
+        Returns:
+            The last response, which may still be an error.
+
+        Raises:
+            requests.exceptions.ConnectionError, requests.exceptions.Timeout: If
+                the last attempt failed to connect or timed out.
+            DeadlineExceeded: If the deadline expired while waiting for a slot.
+        """
+        import requests
+        attempt = 0
+        while True:
+            host = self.acquire(url, deadline, session)
+            start = time.monotonic()
+            response = error = None
+            try:
+                response = send()
+            except DeadlineExceeded:
+                # The page ran out of time, not the host: its limit isn't adapted
+                self.release(host)
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if isinstance(e, requests.exceptions.Timeout) and deadline is not None and deadline.expired:
+                    # Timed out on what was left of the page's deadline, likewise
+                    self.release(host)
+                    raise
+                error = e
+            except BaseException:
+                self.release(host, time.monotonic() - start, failed=True)
+                raise
+            status = getattr(response, 'status_code', None)
+            status = status if isinstance(status, int) else None
+            retryable = error is not None or status in RETRY_STATUSES
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if retryable and response is not None else None
+
+            delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+            remaining = deadline.remaining() if deadline is not None else None
+            give_up = (not retryable or attempt >= self.retries or delay > self.max_backoff
+                       or (remaining is not None and delay >= remaining))
+            throttled = status in THROTTLE_STATUSES
+            self.release(host, time.monotonic() - start, failed=retryable,
+                         pause=min(delay, self.max_backoff) if throttled else None)
+            if give_up:
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                # Free the connection of a streamed response that won't be read
+                response.close()
+            attempt += 1
+            with self._cond:
+                self._state(host).retries += 1
+            # A throttled host is already paused; other failures only delay this request
+            if not throttled:
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-host counters and current limits."""
+        with self._cond:
+            return {host: state.stats() for host, state in self._hosts.items()}
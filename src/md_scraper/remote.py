@@ -0,0 +1,300 @@
+import json
+import random
+import threading
+import time
+from contextlib import closing
+from typing import Iterable, List, Optional, Union
+
+# Result fields the CLI writes; the server leaves out the rest (notably raw_html)
+DEFAULT_FIELDS = ('url', 'markdown', 'metadata', 'internal_links')
+
+# Load-balancing policies across several servers
+LB_POLICIES = ('round-robin', 'least-outstanding', 'latency')
+
+# requests/urllib3 are imported where they are used, so the CLI can import this
+# module (for its constants) without paying for them on startup
+
+class RemoteError(Exception):
+    """A page could not be scraped remotely."""
+
+class ServerUnavailable(RemoteError):
+    """The server itself failed (unreachable, overloaded or erroring), so another one may succeed."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def accept_encoding() -> str:
+    """Returns the response encodings this client can decode: gzip and deflate, plus zstd/br if installed."""
+    import urllib3
+    return urllib3.util.make_headers(accept_encoding=True)['accept-encoding']
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def iter_remote_results(server, payload, session=None):
+    """Posts a scrape request to a remote server and yields page results as they arrive.
+
+    The server streams newline-delimited JSON, so each result is parsed as soon as
+    its line is received instead of after the whole (possibly huge) response body.
+    Servers without streaming support answer with plain JSON, which is handled too.
+
+    Raises:
+        ServerUnavailable: If the server is unreachable or answers 429/5xx.
+        RemoteError: If the server reports that the page failed.
+    """
+    import requests
+    api_url = f"{server.rstrip('/')}/api/scrape"
+    http = session if session is not None else requests
+    try:
+        with http.post(api_url, json=payload, headers={'Accept': 'application/x-ndjson'}, stream=True) as response:
+            if response.status_code >= 400:
+                # Read the body now; it is gone once the streamed response is closed
+                message = f"Server error ({response.status_code}): {response.text}"
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise ServerUnavailable(message, _retry_after(response))
+                raise RemoteError(message)
+            if response.headers.get('Content-Type', '').startswith('application/x-ndjson'):
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    if 'error' in result:
+                        raise RemoteError(f"Server error: {result['error']}")
+                    yield result
+            else:
+                data = response.json()
+                yield from data['results'] if 'results' in data else [data]
+    except requests.exceptions.RequestException as e:
+        raise ServerUnavailable(f"Connection error: {e}")
+
+class Endpoint:
+    """One remote server and its load-balancing state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.latency = None  # Moving average of response times, in seconds
+        self.requests = 0
+        self.failures = 0
+        # While down, the endpoint gets no requests until this (monotonic) time
+        self.down_until = 0.0
+        self.down = False
+
+    def stats(self) -> dict:
+        return {
+            'url': self.url,
+            'requests': self.requests,
+            'failures': self.failures,
+            'outstanding': self.outstanding,
+            'latency': self.latency,
+            'healthy': not self.down
+        }
+
+class RemoteClient:
+    """
+    Client for offloading scrapes to one or more remote md-scraper servers.
+
+    All requests share one session, so TLS connections are kept alive across
+    pages, and its connection pool is sized for ``jobs`` concurrent requests.
+    Responses are requested compressed, and only the result ``fields`` the
+    caller needs are asked for.
+
+    With several servers, each request goes to one picked by ``policy``:
+    'round-robin', 'least-outstanding' (fewest requests in flight) or
+    'latency' (random, weighted towards faster servers). A server that is
+    unreachable or answers 429/5xx is taken out of rotation for ``cooldown``
+    seconds (or its Retry-After) and the request fails over to another one.
+    Once the cooldown ends, a health check decides whether it rejoins.
+    """
+
+    # Weight of the newest sample in the latency moving average
+    LATENCY_ALPHA = 0.3
+
+    def __init__(self, servers: Union[str, Iterable[str]], jobs: int = 1, fields: Optional[Iterable[str]] = DEFAULT_FIELDS,
+                 policy: str = 'round-robin', cooldown: float = 30.0, health_timeout: float = 5.0):
+        """
+        Args:
+            servers (str | Iterable[str]): Base URL(s) of the server(s).
+            jobs (int): Number of requests that may be in flight at once.
+            fields (Iterable[str]): Result fields to request; None for all of them.
+            policy (str): Load-balancing policy, one of ``LB_POLICIES``.
+            cooldown (float): Seconds a failed server is kept out of rotation.
+            health_timeout (float): Timeout of a health check, in seconds.
+        """
+        if isinstance(servers, str):
+            servers = [servers]
+        self.endpoints = [Endpoint(url) for url in servers]
+        if not self.endpoints:
+            raise ValueError("At least one server is required.")
+        if policy not in LB_POLICIES:
+            raise ValueError(f"Unknown load-balancing policy '{policy}'. Choose from: {', '.join(LB_POLICIES)}")
+        self.server = self.endpoints[0].url
+        self.fields = list(fields) if fields is not None else None
+        self.policy = policy
+        self.cooldown = cooldown
+        self.health_timeout = health_timeout
+        self._lock = threading.Lock()
+        self._next = 0
+        self._random = random.Random()
+
+        import requests
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=max(jobs, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = accept_encoding()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _probe(self, endpoint: Endpoint) -> bool:
+        import requests
+        try:
+            response = self.session.get(f"{endpoint.url}/api/health", timeout=self.health_timeout)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def _mark_down(self, endpoint: Endpoint, retry_after: Optional[float] = None):
+        endpoint.down = True
+        endpoint.down_until = time.monotonic() + (retry_after if retry_after is not None else self.cooldown)
+
+    def check_health(self) -> List[Endpoint]:
+        """
+        Health-checks every server, taking failing ones out of rotation.
+
+        Returns:
+            list: The endpoints that answered.
+        """
+        healthy = []
+        for endpoint in self.endpoints:
+            ok = self._probe(endpoint)
+            with self._lock:
+                if ok:
+                    endpoint.down = False
+                    endpoint.down_until = 0.0
+                    healthy.append(endpoint)
+                else:
+                    self._mark_down(endpoint)
+        return healthy
+
+    def _choose(self, candidates: List[Endpoint]) -> Endpoint:
+        """Picks one of the available endpoints by policy. Called with the lock held."""
+        if self.policy == 'least-outstanding':
+            # Ties go round-robin so idle servers share the load
+            start = self._next % len(self.endpoints)
+            self._next += 1
+            ordered = sorted(candidates, key=lambda e: (e.outstanding, (self.endpoints.index(e) - start) % len(self.endpoints)))
+            return ordered[0]
+        if self.policy == 'latency':
+            measured = [e.latency for e in candidates if e.latency is not None]
+            # Unmeasured servers are weighted like the fastest one, so they get tried
+            default = min(measured) if measured else 1.0
+            weights = [1.0 / max(e.latency if e.latency is not None else default, 1e-3) for e in candidates]
+            return self._random.choices(candidates, weights=weights)[0]
+        # Round-robin over the endpoints that are currently available
+        for _ in range(len(self.endpoints)):
+            endpoint = self.endpoints[self._next % len(self.endpoints)]
+            self._next += 1
+            if endpoint in candidates:
+                return endpoint
+        return candidates[0]
+
+    def _acquire(self, tried: set) -> Optional[Endpoint]:
+        """Reserves an endpoint for one request, health-checking servers whose cooldown has ended."""
+        while True:
+            now = time.monotonic()
+            recovering = None
+            with self._lock:
+                candidates = [e for e in self.endpoints if e not in tried and e.down_until <= now]
+                if not candidates:
+                    return None
+                recovering = next((e for e in candidates if e.down), None)
+                if recovering is None:
+                    endpoint = self._choose(candidates)
+                    endpoint.outstanding += 1
+                    endpoint.requests += 1
+                    return endpoint
+                # Keep other threads from probing it at the same time
+                recovering.down_until = now + self.cooldown
+
+            ok = self._probe(recovering)
+            with self._lock:
+                if ok:
+                    recovering.down = False
+                    recovering.down_until = 0.0
+                else:
+                    self._mark_down(recovering)
+                    # Not offered again for this request, even with no cooldown
+                    tried.add(recovering)
+
+    def _release(self, endpoint: Endpoint, elapsed: Optional[float] = None, error: Optional[ServerUnavailable] = None):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is not None:
+                endpoint.failures += 1
+                # A lone server stays in rotation; there is nothing to fail over to
+                if len(self.endpoints) > 1:
+                    self._mark_down(endpoint, error.retry_after)
+            elif elapsed is not None:
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += self.LATENCY_ALPHA * (elapsed - endpoint.latency)
+
+    def scrape(self, payload: dict) -> dict:
+        """
+        Scrapes one page remotely, failing over to other servers if one is down.
+        Safe to call from several threads at once.
+
+        Args:
+            payload (dict): The /api/scrape request body.
+
+        Returns:
+            dict: The page's result.
+
+        Raises:
+            ServerUnavailable: If no server could be reached.
+            RemoteError: If the server reported that the page failed.
+        """
+        if self.fields is not None:
+            payload = {**payload, 'fields': self.fields}
+
+        tried = set()
+        last_error = None
+        while True:
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                raise last_error or ServerUnavailable("All servers are unavailable.")
+            tried.add(endpoint)
+            start = time.monotonic()
+            try:
+                with closing(iter_remote_results(endpoint.url, payload, session=self.session)) as results:
+                    result = next(results, None)
+            except ServerUnavailable as e:
+                self._release(endpoint, error=e)
+                last_error = e
+                continue
+            except Exception:
+                # The server answered; the page itself failed
+                self._release(endpoint, elapsed=time.monotonic() - start)
+                raise
+            self._release(endpoint, elapsed=time.monotonic() - start)
+            if result is None:
+                raise RemoteError("Server error: empty response")
+            return result
+
+    def stats(self) -> List[dict]:
+        """Returns request, failure and latency counters per server."""
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
@@ -0,0 +1,186 @@
+import json
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# Upper bounds of the per-host latency histogram, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# requests' HTTPError message, also what a remote server reports for a failed page
+_HTTP_ERROR_RE = re.compile(r'\b([1-5]\d\d) (?:Client|Server) Error')
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0 < pct <= 100), or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+def _error_status(error: BaseException) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if isinstance(status, int):
+        return status
+    match = _HTTP_ERROR_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+class CrawlReport:
+    """
+    Collects per-page outcomes of a CLI run into an end-of-crawl performance report.
+
+    Latency is the page's fetch (or render) time when the result carries stage
+    timings, otherwise the wall-clock time the page took.
+    """
+
+    def __init__(self, slowest: int = 10):
+        """
+        Args:
+            slowest (int): Number of slowest pages listed.
+        """
+        self.slowest = slowest
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._elapsed = None
+        self.pages = 0
+        self.failed = 0
+        self.bytes_fetched = 0
+        self.bytes_written = 0
+        self.status_codes = Counter()
+        self.errors = Counter()
+        self.stage_seconds: Dict[str, float] = {}
+        self._latencies: Dict[str, List[float]] = {}
+        self._host_pages = Counter()
+        self._host_failures = Counter()
+        self._pages: List[dict] = []
+
+    def record(self, url: str, seconds: float, result: Optional[dict] = None, error: Optional[BaseException] = None,
+               written_bytes: int = 0):
+        """
+        Records one finished page.
+
+        Args:
+            url (str): The page's URL.
+            seconds (float): Wall-clock time the page itself took, even when pages overlap.
+            result (dict): The scrape result, if any (its 'timings' are used when present).
+            error (Exception): The error, if the page failed.
+            written_bytes (int): Bytes of output written for the page.
+        """
+        host = urlparse(url).netloc or 'local'
+        timings = (result or {}).get('timings') or {}
+        stages = timings.get('stages', {})
+
+        self.pages += 1
+        self._host_pages[host] += 1
+        self.bytes_written += written_bytes
+        for name, stage in stages.items():
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + stage['seconds']
+            if name in ('fetch', 'render'):
+                self.bytes_fetched += stage.get('bytes', 0)
+
+        status = timings.get('status')
+        if error is not None:
+            self.failed += 1
+            self._host_failures[host] += 1
+            self.errors[type(error).__name__] += 1
+            status = _error_status(error)
+        if status is not None:
+            self.status_codes[str(status)] += 1
+
+        fetch = stages.get('fetch') or stages.get('render')
+        latency = fetch['seconds'] if fetch else seconds
+        self._latencies.setdefault(host, []).append(latency)
+
+        entry = {'url': url, 'seconds': round(seconds, 3)}
+        if status is not None:
+            entry['status'] = status
+        if error is not None:
+            entry['error'] = str(error)
+        self._pages.append(entry)
+
+    def finish(self):
+        """Stops the clock; later calls to ``as_dict`` report the same duration."""
+        self._elapsed = time.perf_counter() - self._start
+
+    def _host_stats(self, host: str) -> dict:
+        latencies = self._latencies[host]
+        histogram = {}
+        for bound in LATENCY_BUCKETS:
+            histogram[f'{bound:g}'] = sum(1 for value in latencies if value <= bound)
+        histogram['+Inf'] = len(latencies)
+        return {
+            'pages': self._host_pages[host],
+            'failed': self._host_failures[host],
+            'latency': {
+                'mean': round(sum(latencies) / len(latencies), 4),
+                'p50': round(percentile(latencies, 50), 4),
+                'p90': round(percentile(latencies, 90), 4),
+                'p99': round(percentile(latencies, 99), 4),
+                'max': round(max(latencies), 4)
+            },
+            # Cumulative, like a Prometheus histogram: pages at or under each bound
+            'histogram': histogram
+        }
+
+    def as_dict(self) -> dict:
+        elapsed = self._elapsed if self._elapsed is not None else time.perf_counter() - self._start
+        stage_total = sum(self.stage_seconds.values())
+        return {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(elapsed, 3),
+            'pages': self.pages,
+            'succeeded': self.pages - self.failed,
+            'failed': self.failed,
+            'pages_per_second': round(self.pages / elapsed, 2) if elapsed > 0 else None,
+            'bytes': {'fetched': self.bytes_fetched, 'written': self.bytes_written},
+            'status_codes': dict(sorted(self.status_codes.items())),
+            'errors': dict(self.errors.most_common()),
+            'stages': {
+                name: {'seconds': round(seconds, 4), 'share': round(seconds / stage_total, 4) if stage_total else 0.0}
+                for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1])
+            },
+            'hosts': {host: self._host_stats(host) for host in sorted(self._latencies)},
+            'slowest': sorted(self._pages, key=lambda page: -page['seconds'])[:self.slowest]
+        }
+
+    def write(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write('\n')
+
+    def summary(self) -> str:
+        """Returns a human-readable version of the report."""
+        data = self.as_dict()
+        rate = f"{data['pages_per_second']:.2f} pages/s" if data['pages_per_second'] is not None else 'n/a'
+        lines = [
+            f"Crawl report: {data['pages']} page(s) in {data['duration_seconds']:.1f}s ({rate}), "
+            f"{data['failed']} failed",
+            f"  Bytes: {_size(data['bytes']['fetched'])} fetched, {_size(data['bytes']['written'])} written"
+        ]
+        if data['status_codes']:
+            lines.append('  Status: ' + ', '.join(f'{code}: {n}' for code, n in data['status_codes'].items()))
+        if data['errors']:
+            lines.append('  Errors: ' + ', '.join(f'{name}: {n}' for name, n in data['errors'].items()))
+        if data['stages']:
+            lines.append('  Stages: ' + ', '.join(f"{name} {stage['seconds']:.2f}s ({stage['share']:.0%})"
+                                                  for name, stage in data['stages'].items()))
+        for host, stats in data['hosts'].items():
+            latency = stats['latency']
+            lines.append(f"  {host}: {stats['pages']} page(s), {stats['failed']} failed, latency p50 {latency['p50']:.3f}s "
+                         f"p90 {latency['p90']:.3f}s p99 {latency['p99']:.3f}s max {latency['max']:.3f}s")
+        if data['slowest']:
+            lines.append('  Slowest:')
+            for page in data['slowest']:
+                note = f" ({page['error']})" if 'error' in page else ''
+                lines.append(f"    {page['seconds']:8.3f}s  {page['url']}{note}")
+        return '\n'.join(lines)
+
+def _size(n: int) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} GiB'
@@ -1,24 +1,99 @@
 import requests
 import json
+import mimetypes
 import os
 import base64
-import email
 import re
 import concurrent.futures
-from typing import Union
-from email import policy
+import threading
+from typing import Optional, Union
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup, Tag, PageElement
-from markdownify import markdownify as md
+from markdownify import MarkdownConverter, markdownify as md
 from md_scraper.sanitizer import MarkdownSanitizer
+from md_scraper.manifest import CrawlManifest
+from md_scraper.mht import MhtArchive, is_mht
+from md_scraper.bulk import LOCAL_EXTENSIONS
+from md_scraper.deadline import Deadline
+from md_scraper.dedup import simhash
+from md_scraper.utils import file_url, local_path
+from md_scraper import metrics
+from md_scraper.metrics import NULL_TIMINGS, StageTimings
 
 NAV_SIDEBAR_RE = re.compile(r'sidebar|menu|nav|toc', re.I)
 
-# Try to import playwright, but don't crash if missing
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    sync_playwright = None
+# Seconds a static fetch or an image download may wait on the server (connecting, or between bytes)
+FETCH_TIMEOUT = 30
+IMAGE_TIMEOUT = 10
+# Share of a page's deadline kept for conversion: image downloads stop that much earlier
+CONVERT_RESERVE = 0.1
+# Bytes read at a time from a body streamed under a deadline
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Playwright is optional and slow to import, so it is loaded on the first dynamic fetch.
+# None means it isn't installed.
+_NOT_LOADED = object()
+sync_playwright = _NOT_LOADED
+
+def _load_playwright():
+    global sync_playwright
+    if sync_playwright is _NOT_LOADED:
+        try:
+            from playwright.sync_api import sync_playwright as loaded
+        except ImportError:
+            loaded = None
+        sync_playwright = loaded
+    return sync_playwright
+
+def _playwright_timeout_error():
+    try:
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    except ImportError:
+        return TimeoutError
+    return PlaywrightTimeoutError
+
+def _read_body(response, deadline: Deadline, stage: str):
+    """
+    Reads a response streamed under a deadline, checking it between chunks.
+
+    The requests timeout only bounds each wait for bytes, so a server trickling
+    its body could otherwise keep a page past its deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline expired before the body was read.
+    """
+    chunks = []
+    for chunk in response.iter_content(BODY_CHUNK_SIZE):
+        if deadline.expired:
+            response.close()
+            raise deadline.exceeded(stage)
+        chunks.append(chunk)
+    # Kept where .content, .text and the WARC recorder read it
+    response._content = b''.join(chunks)
+
+class _DeadlineConverter(MarkdownConverter):
+    """
+    Converts until the page's deadline expires, then leaves out the rest of the
+    document. Conversion always goes on until some text has been converted, so
+    a page whose budget ran out before conversion started isn't left empty.
+    """
+
+    def __init__(self, deadline: Deadline, **options):
+        super().__init__(**options)
+        self.deadline = deadline
+        self.converted = False
+
+    def process_element(self, node, parent_tags=None):
+        if self.converted and self.deadline.expired:
+            self.deadline.cut_short('convert')
+            return ''
+        return super().process_element(node, parent_tags=parent_tags)
+
+    def process_text(self, el, parent_tags=None):
+        text = super().process_text(el, parent_tags=parent_tags)
+        if text.strip():
+            self.converted = True
+        return text
 
 class Scraper:
     """
@@ -26,12 +101,62 @@ class Scraper:
     
     It handles fetching HTML, extracting metadata, identifying main content 
     using heuristics, and converting the resulting DOM to GitHub Flavored Markdown.
+
+    One instance can be shared by several threads: parsing and conversion keep
+    no state on the instance, and the per-fetch state (the last HTTP status, the
+    private Playwright browser) is kept per thread. Playwright's sync API is bound
+    to the thread that started it, so each thread that fetches dynamically gets
+    its own browser, and ``close()`` only closes the calling thread's browser;
+    use a ``BrowserPool`` to share browsers between threads instead.
     """
 
-    def __init__(self):
-        self._playwright = None
-        self._browser = None
+    def __init__(self, browser_pool=None, session=None, recorder=None, replay=None, limiter=None):
+        """
+        Args:
+            browser_pool (BrowserPool): Optional shared pool of warm browsers. If set,
+                dynamic fetches are rendered there instead of on a private browser.
+            session (requests.Session): Optional session for static fetches, so
+                connections are kept alive and reused across pages.
+            recorder (WarcWriter): If set, every HTTP response of a static fetch or
+                an image download is recorded to this WARC file.
+            replay (WarcArchive): If set, pages and images are read from this WARC
+                archive instead of the network; pages missing from it fail with
+                ``NotArchivedError``.
+            limiter (RateLimiter): If set, page fetches and renders are paced
+                per host, and failed or throttled fetches are retried with backoff.
+                Image downloads bypass it: they go to asset hosts, fetched many at
+                once, and fall back to the remote URL if they fail.
+        """
+        self.browser_pool = browser_pool
+        self.session = session
+        self.recorder = recorder
+        self.replay = replay
+        self.limiter = limiter
         self.sanitizer = MarkdownSanitizer()
+        # Per-thread: the private browser and the status of the last static fetch
+        self._local = threading.local()
+
+    # The private browser is per thread, since Playwright objects can't cross threads
+    @property
+    def _playwright(self):
+        return getattr(self._local, 'playwright', None)
+
+    @_playwright.setter
+    def _playwright(self, value):
+        self._local.playwright = value
+
+    @property
+    def _browser(self):
+        return getattr(self._local, 'browser', None)
+
+    @_browser.setter
+    def _browser(self, value):
+        self._local.browser = value
+
+    @property
+    def fetch_status(self):
+        """HTTP status of the calling thread's last static fetch (None for local files)."""
+        return getattr(self._local, 'status', None)
 
     def __enter__(self):
         return self
@@ -40,7 +165,7 @@ class Scraper:
         self.close()
 
     def close(self):
-        """Closes the browser and Playwright instance if they are active."""
+        """Closes the calling thread's browser and Playwright instance if they are active."""
         if self._browser:
             self._browser.close()
             self._browser = None
@@ -50,11 +175,12 @@ class Scraper:
 
     def _ensure_browser(self):
         """Lazily initializes Playwright and the Browser instance."""
-        if sync_playwright is None:
+        playwright_factory = _load_playwright()
+        if playwright_factory is None:
             raise ImportError("Playwright is not installed. Please install it with 'pip install playwright' and 'playwright install'.")
 
         if not self._playwright:
-            self._playwright = sync_playwright().start()
+            self._playwright = playwright_factory().start()
 
         if not self._browser:
             # Check for CHROMIUM_PATH environment variable (useful for Termux/custom setups)
@@ -70,29 +196,74 @@ class Scraper:
 
         return self._browser
 
-    def fetch_html(self, url: str) -> str:
+    def fetch_html(self, url: str, deadline: Optional[Deadline] = None) -> str:
         """
         Fetches the raw HTML content from a given URL or local file.
         
         Args:
-            url (str): The URL of the webpage or path to a local file.
+            url (str): The URL of the webpage, or the path or ``file://`` URL of a
+                local file (a directory's ``file://`` URL reads its index.html).
+            deadline (Deadline): Optional deadline of the page. Requests wait on
+                the server for at most ``FETCH_TIMEOUT`` seconds either way, and
+                under a deadline the body is streamed so a slow one can't overrun it.
             
         Returns:
             str: The raw HTML content.
             
         Raises:
             requests.exceptions.HTTPError: If the request returned an unsuccessful status code.
+            requests.exceptions.Timeout: If the server didn't answer in ``FETCH_TIMEOUT`` seconds.
+            DeadlineExceeded: If the deadline expired first.
             FileNotFoundError: If the local file does not exist.
+            NotArchivedError: If replaying a WARC archive that doesn't have the page.
         """
+        self._local.status = None
         # 1. Check if it's a local file
-        if os.path.exists(url) and os.path.isfile(url):
-            return self._read_local_file(url)
-
-        # 2. Existing requests logic
-        response = requests.get(url)
+        path = local_path(url)
+        if path is not None:
+            return self._read_local_file(path)
+
+        # 2. Replayed from a WARC archive
+        if self.replay is not None:
+            status, html = self.replay.fetch(url)
+            self._local.status = status
+            if status >= 400:
+                raise requests.exceptions.HTTPError(f"{status} Error for url: {url} (replayed from WARC)")
+            return html
+
+        # 3. Existing requests logic
+        deadline = deadline or Deadline()
+        http = self.session or requests
+        kwargs = {'stream': True} if deadline.expires is not None else {}
+        try:
+            # The timeout is taken per attempt, so retries get what is left of the deadline
+            response = self._send(url, lambda: http.get(url, timeout=deadline.timeout(FETCH_TIMEOUT), **kwargs), deadline)
+            if kwargs:
+                _read_body(response, deadline, 'fetch')
+        except requests.exceptions.Timeout as e:
+            if deadline.expired:
+                raise deadline.exceeded('fetch') from e
+            raise
+        self._local.status = response.status_code
+        if self.recorder is not None:
+            self.recorder.record(response)
         response.raise_for_status()
         return response.text
 
+    def _send(self, url: str, send, deadline: Optional[Deadline] = None):
+        """Sends a request through the rate limiter, if there is one."""
+        if self.limiter is None:
+            return send()
+        return self.limiter.request(url, send, deadline, session=self.session)
+
+    def _open_archive(self, url: str) -> Optional[MhtArchive]:
+        """Indexes a saved MHT page, or returns None for any other URL or file."""
+        path = local_path(url)
+        if path is None or not is_mht(path):
+            return None
+        self._local.status = None
+        return MhtArchive(path)
+
     def _read_local_file(self, file_path: str) -> str:
         """
         Reads local HTML or MHT files.
@@ -103,63 +274,58 @@ class Scraper:
         Returns:
             str: The extracted HTML content.
         """
-        lower_path = file_path.lower()
-        
-        if lower_path.endswith('.mht') or lower_path.endswith('.mhtml'):
-            with open(file_path, 'rb') as f:
-                msg = email.message_from_binary_file(f, policy=policy.default)
-                
-            # Find the HTML part
-            body = ""
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    if content_type == "text/html":
-                        body = part.get_content()
-                        # Prefer the first text/html part
-                        break
-            else:
-                # If not multipart, check content type or assume it's the body
-                if msg.get_content_type() == "text/html":
-                    body = msg.get_content()
-            
-            if not body:
-                # Fallback: try to just decode the payload if specific part finding failed
-                try:
-                    body = msg.get_body(preferencelist=('html', 'plain')).get_content()
-                except Exception:
-                    pass
+        if is_mht(file_path):
+            return MhtArchive(file_path).html()
 
-            if not body:
-                raise ValueError(f"Could not find text/html content in MHT file: {file_path}")
-            
-            return body
+        # Assume HTML/text
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
 
-        else:
-            # Assume HTML/text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-
-    def fetch_html_dynamic(self, url: str) -> str:
+    def fetch_html_dynamic(self, url: str, deadline: Optional[Deadline] = None) -> str:
         """
         Fetches the rendered HTML content from a given URL using Playwright.
         
         Args:
             url (str): The URL of the webpage to fetch.
+            deadline (Deadline): Optional deadline of the page. If the network
+                hasn't gone idle by then, the page is taken as loaded so far
+                (and the deadline records 'render' as cut short).
             
         Returns:
             str: The rendered HTML content of the page.
             
         Raises:
             ImportError: If Playwright is not installed.
+            DeadlineExceeded: If the deadline expired before the page started loading.
             Exception: If browser launch or page navigation fails.
         """
+        deadline = deadline or Deadline()
+        if self.limiter is None:
+            return self._render(url, deadline)
+        with self.limiter.slot(url, deadline, session=self.session):
+            return self._render(url, deadline)
+
+    def _render(self, url: str, deadline: Deadline) -> str:
+        if self.browser_pool is not None:
+            if deadline.expires is None:
+                return self.browser_pool.fetch(url)
+            return self.browser_pool.fetch(url, deadline=deadline)
+
         browser = self._ensure_browser()
         page = browser.new_page()
         try:
             # Set a reasonable viewport size
             page.set_viewport_size({"width": 1280, "height": 800})
-            page.goto(url, wait_until="networkidle")
+            if deadline.expires is None:
+                page.goto(url, wait_until="networkidle")
+            else:
+                try:
+                    page.goto(url, wait_until="networkidle", timeout=deadline.timeout(stage='render') * 1000)
+                except _playwright_timeout_error() as e:
+                    # Still loading: keep what has rendered, unless navigation never got anywhere
+                    if page.url in ('', 'about:blank'):
+                        raise deadline.exceeded('render') from e
+                    deadline.cut_short('render')
 
             # Bake computed styles into SVGs so they render correctly in Markdown
             page.evaluate("""() => {
@@ -318,14 +484,30 @@ class Scraper:
                     'file': Download to local file and use relative link.
                 assets_dir (str): Directory to save images if 'file' action is used.
                 base_url (str): Base URL to resolve relative image paths.
+                assets (MhtArchive or WarcArchive): Archive the HTML came from;
+                    images found in it are used instead of downloaded. Relative paths
+                    of a saved MHT page resolve against the URL it was saved from, and
+                    images missing from a WARC archive are not downloaded.
+                stage_timings (StageTimings): Records the time spent per step.
+                deadline (Deadline): Deadline of the page. Image downloads stop
+                    ``CONVERT_RESERVE`` of it early, and the images not downloaded
+                    by then keep their remote URLs. Once it expires, the rest of
+                    the document is left out of the Markdown (past its first text). The deadline records
+                    'images' or 'convert' as cut short.
             
         Returns:
             str: The resulting Markdown string.
         """
+        timings = options.pop('stage_timings', None) or NULL_TIMINGS
+        deadline = options.pop('deadline', None) or Deadline()
+        downloads = deadline.leaving(CONVERT_RESERVE)
         svg_action = options.pop('svg_action', 'image')
         image_action = options.pop('image_action', 'remote')
         assets_dir = options.pop('assets_dir', None)
         base_url = options.pop('base_url', None)
+        assets = options.pop('assets', None)
+        if assets is not None and assets.location:
+            base_url = assets.location
         
         if isinstance(html, (BeautifulSoup, Tag, PageElement)):
             soup = html
@@ -335,53 +517,54 @@ class Scraper:
         # 1. Handle SVGs
         placeholders = {}
         preserved_svg_nodes = []
-        if svg_action == 'strip':
-            for svg in soup.find_all('svg'):
-                svg.decompose()
-        elif svg_action in ['image', 'file']:
-            if svg_action == 'file' and assets_dir:
-                os.makedirs(assets_dir, exist_ok=True)
-            for i, svg in enumerate(soup.find_all('svg')):
-                # Fallback fixes for visibility
-                if svg.get('fill') == 'currentColor' or not svg.has_attr('fill'):
-                    svg['fill'] = '#000000'
+        with timings.stage('svg'):
+            if svg_action == 'strip':
+                for svg in soup.find_all('svg'):
+                    svg.decompose()
+            elif svg_action in ['image', 'file']:
+                if svg_action == 'file' and assets_dir:
+                    os.makedirs(assets_dir, exist_ok=True)
+                for i, svg in enumerate(soup.find_all('svg')):
+                    # Fallback fixes for visibility
+                    if svg.get('fill') == 'currentColor' or not svg.has_attr('fill'):
+                        svg['fill'] = '#000000'
                 
-                # Dimensions
-                if not svg.get('width') or not svg.get('height'):
-                    viewbox = svg.get('viewbox') or svg.get('viewBox')
-                    if viewbox:
-                        try:
-                            _, _, w, h = map(float, viewbox.replace(',', ' ').split())
-                            if not svg.get('width'): svg['width'] = str(int(w))
-                            if not svg.get('height'): svg['height'] = str(int(h))
-                        except: pass
-                    if not svg.get('width'): svg['width'] = "16"
-                    if not svg.get('height'): svg['height'] = "16"
-
-                svg_str = str(svg)
+                    # Dimensions
+                    if not svg.get('width') or not svg.get('height'):
+                        viewbox = svg.get('viewbox') or svg.get('viewBox')
+                        if viewbox:
+                            try:
+                                _, _, w, h = map(float, viewbox.replace(',', ' ').split())
+                                if not svg.get('width'): svg['width'] = str(int(w))
+                                if not svg.get('height'): svg['height'] = str(int(h))
+                            except: pass
+                        if not svg.get('width'): svg['width'] = "16"
+                        if not svg.get('height'): svg['height'] = "16"
+
+                    svg_str = str(svg)
                 
-                if svg_action == 'file' and assets_dir:
-                    filename = f"svg_icon_{i}.svg"
-                    filepath = os.path.join(assets_dir, filename)
-                    with open(filepath, 'w') as f:
-                        f.write(svg_str)
-                    # Use relative path for Markdown
-                    img_tag = soup.new_tag('img', src=os.path.join(os.path.basename(assets_dir), filename), alt="svg icon")
-                else:
-                    # Default: base64 image
-                    encoded = base64.b64encode(svg_str.encode('utf-8')).decode('utf-8')
-                    img_tag = soup.new_tag('img', src=f"data:image/svg+xml;base64,{encoded}", alt="svg image")
+                    if svg_action == 'file' and assets_dir:
+                        filename = f"svg_icon_{i}.svg"
+                        filepath = os.path.join(assets_dir, filename)
+                        with open(filepath, 'w') as f:
+                            f.write(svg_str)
+                        # Use relative path for Markdown
+                        img_tag = soup.new_tag('img', src=os.path.join(os.path.basename(assets_dir), filename), alt="svg icon")
+                    else:
+                        # Default: base64 image
+                        encoded = base64.b64encode(svg_str.encode('utf-8')).decode('utf-8')
+                        img_tag = soup.new_tag('img', src=f"data:image/svg+xml;base64,{encoded}", alt="svg image")
                 
-                svg.replace_with(img_tag)
-        elif svg_action == 'preserve':
-            for i, svg in enumerate(soup.find_all('svg')):
-                placeholder = f"MDScraperSVG{i}"
-                # Optimization: store the Tag object, avoiding immediate stringification
-                placeholders[placeholder] = svg
-                from bs4 import NavigableString
-                p_node = NavigableString(placeholder)
-                svg.replace_with(p_node)
-                preserved_svg_nodes.append((p_node, svg))
+                    svg.replace_with(img_tag)
+            elif svg_action == 'preserve':
+                for i, svg in enumerate(soup.find_all('svg')):
+                    placeholder = f"MDScraperSVG{i}"
+                    # Optimization: store the Tag object, avoiding immediate stringification
+                    placeholders[placeholder] = svg
+                    from bs4 import NavigableString
+                    p_node = NavigableString(placeholder)
+                    svg.replace_with(p_node)
+                    preserved_svg_nodes.append((p_node, svg))
 
         # 2. Handle standard Images
         original_srcs = {}
@@ -411,30 +594,51 @@ class Scraper:
             def process_image(item):
                 i, img, src = item
                 try:
-                    resp = requests.get(src, timeout=10)
-                    if resp.status_code == 200:
-                        if image_action == 'base64':
-                            content_type = resp.headers.get('Content-Type', 'image/png')
-                            encoded = base64.b64encode(resp.content).decode('utf-8')
-                            return (i, f"data:{content_type};base64,{encoded}")
-                        elif image_action == 'file' and assets_dir:
-                            ext = src.split('.')[-1].split('?')[0] or 'png'
-                            filename = f"image_{i}.{ext}"
-                            filepath = os.path.join(assets_dir, filename)
-                            with open(filepath, 'wb') as f:
-                                f.write(resp.content)
-                            return (i, os.path.join(os.path.basename(assets_dir), filename))
+                    if downloads.expired:
+                        downloads.cut_short('images')
+                        return (i, None)
+                    # Embedded in the saved page: no download
+                    embedded = assets.get(src) if assets is not None else None
+                    if embedded is not None:
+                        content_type, content = embedded
+                        ext = (mimetypes.guess_extension(content_type) or '.png')[1:]
+                    elif assets is not None and assets.offline:
+                        return (i, None)
+                    else:
+                        kwargs = {'stream': True} if downloads.expires is not None else {}
+                        resp = requests.get(src, timeout=downloads.timeout(IMAGE_TIMEOUT, 'images'), **kwargs)
+                        if kwargs:
+                            _read_body(resp, downloads, 'images')
+                        if self.recorder is not None:
+                            self.recorder.record(resp)
+                        if resp.status_code != 200:
+                            return (i, None)
+                        content_type = resp.headers.get('Content-Type', 'image/png')
+                        content = resp.content
+                        ext = src.split('.')[-1].split('?')[0] or 'png'
+                    timings.add('images', bytes=len(content))
+                    if image_action == 'base64':
+                        encoded = base64.b64encode(content).decode('utf-8')
+                        return (i, f"data:{content_type};base64,{encoded}")
+                    elif image_action == 'file' and assets_dir:
+                        filename = f"image_{i}.{ext}"
+                        filepath = os.path.join(assets_dir, filename)
+                        with open(filepath, 'wb') as f:
+                            f.write(content)
+                        return (i, os.path.join(os.path.basename(assets_dir), filename))
                 except Exception as e:
                     # Fallback to remote URL on failure
-                    pass
+                    if downloads.expired:
+                        downloads.cut_short('images')
                 return (i, None)
 
             if candidates:
                 for item in candidates:
                     img_map[item[0]] = item[1]
 
-                with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                    results = executor.map(process_image, candidates)
+                with timings.stage('images'), concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+                    results = list(executor.map(process_image, candidates))
+                timings.add('images', count=len(candidates))
 
                 for idx, new_src in results:
                     if new_src:
@@ -450,7 +654,11 @@ class Scraper:
         # Merge with user options
         config = {**defaults, **options}
         # markdownify works best with strings to avoid redundant or broken re-parsing
-        markdown = md(str(soup), **config)
+        with timings.stage('convert'):
+            if deadline.expires is None:
+                markdown = md(str(soup), **config)
+            else:
+                markdown = _DeadlineConverter(deadline, **config).convert(str(soup))
 
         # Restore preserved SVGs
         if svg_action == 'preserve' and placeholders:
@@ -468,11 +676,14 @@ class Scraper:
 
         # Apply post-processing sanitization
         if options.get('sanitize', True):
-            markdown = self.sanitizer.sanitize(markdown)
+            with timings.stage('sanitize'):
+                markdown = self.sanitizer.sanitize(markdown)
+        if timings.enabled:
+            timings.add('convert', bytes=len(markdown.encode('utf-8')))
 
         return markdown
 
-    def extract_nav_links(self, html: Union[str, BeautifulSoup], base_url: str) -> list:
+    def extract_nav_links(self, html: Union[str, BeautifulSoup], base_url: str, site_root: Optional[str] = None) -> list:
         """
         Extracts navigation links from the HTML to facilitate smart crawling.
         Prioritizes <nav>, <aside>, and sidebar-like elements.
@@ -480,6 +691,7 @@ class Scraper:
         Args:
             html (Union[str, BeautifulSoup]): The raw HTML content or BeautifulSoup object.
             base_url (str): The base URL to resolve relative links.
+            site_root (str): For saved pages, the directory root-relative links resolve against.
             
         Returns:
             list: A list of absolute URLs found in the navigation sections.
@@ -499,21 +711,27 @@ class Scraper:
         search_scope = nav_elements if nav_elements else [soup.body] if soup.body else [soup]
 
         base_domain = urlparse(base_url).netloc
+        resolve_local = self._local_link_resolver(base_url, site_root)
         seen = set()
         
         for element in search_scope:
             if not element: continue
             for a in element.find_all('a', href=True):
                 href = a['href']
-                full_url = urljoin(base_url, href)
-                parsed = urlparse(full_url)
-                
-                # Strict Filter: Must be same domain
-                if parsed.netloc != base_domain:
-                    continue
-                
-                # Filter: Remove anchors/fragments and queries to avoid dupes
-                clean_url = full_url.split('#')[0].split('?')[0]
+                if resolve_local is not None:
+                    clean_url = resolve_local(href)
+                    if clean_url is None:
+                        continue
+                else:
+                    full_url = urljoin(base_url, href)
+                    parsed = urlparse(full_url)
+
+                    # Strict Filter: Must be same domain
+                    if parsed.netloc != base_domain:
+                        continue
+
+                    # Filter: Remove anchors/fragments and queries to avoid dupes
+                    clean_url = full_url.split('#')[0].split('?')[0]
                 
                 # Avoid self-ref
                 if clean_url == base_url.split('#')[0].split('?')[0]:
@@ -527,13 +745,49 @@ class Scraper:
                 
         return links
 
-    def extract_links(self, html: Union[str, BeautifulSoup], base_url: str) -> list:
+    @staticmethod
+    def _local_link_resolver(base_url: str, site_root: Optional[str]):
+        """
+        For a saved page, returns a function mapping an href to the ``file://`` URL of
+        the saved page it points to, or to None (not a saved page on disk, or the page
+        itself). Returns None for web pages.
+        """
+        path = local_path(base_url)
+        if path is None:
+            return None
+        base = file_url(path)
+        root = file_url(site_root) + '/' if site_root else None
+
+        def resolve(href):
+            if href.startswith(('javascript:', 'mailto:', 'tel:')):
+                return None
+            if root is not None and href.startswith('/') and not href.startswith('//'):
+                full_url = urljoin(root, href.lstrip('/'))
+            else:
+                full_url = urljoin(base, href)
+            if not full_url.startswith('file:'):
+                return None
+            target = local_path(full_url.split('#')[0].split('?')[0])
+            if not os.path.isfile(target) or os.path.splitext(target)[1].lower() not in LOCAL_EXTENSIONS:
+                return None
+            url = file_url(target)
+            return None if url == base else url
+        return resolve
+
+    def extract_links(self, html: Union[str, BeautifulSoup], base_url: str, site_root: Optional[str] = None) -> list:
         """
         Extracts all unique internal links from the HTML.
+
+        For a saved page (a file path or ``file://`` URL), links are resolved on
+        disk instead: only links to other saved pages that exist are kept, as
+        ``file://`` URLs, with directory links pointing at their index.html.
         
         Args:
             html (Union[str, BeautifulSoup]): The raw HTML content or BeautifulSoup object.
             base_url (str): The base URL to resolve relative links.
+            site_root (str): For saved pages, the directory root-relative links
+                (``/docs/``) resolve against. Without it they resolve against the
+                filesystem root.
             
         Returns:
             list: A list of absolute URLs found on the page.
@@ -545,6 +799,7 @@ class Scraper:
 
         links = []
         base_domain = urlparse(base_url).netloc
+        resolve_local = self._local_link_resolver(base_url, site_root)
         seen = set()
 
         for a in soup.find_all('a', href=True):
@@ -553,18 +808,23 @@ class Scraper:
             if not href or href.startswith(('javascript:', 'mailto:', 'tel:')):
                 continue
 
-            full_url = urljoin(base_url, href)
-            parsed = urlparse(full_url)
-            
-            # Strict Filter: Must be same domain
-            if parsed.netloc != base_domain:
-                continue
-            
-            # Filter: Remove anchors/fragments and queries to avoid dupes
-            # Keep query params? Usually crawling wants unique pages. 
-            # For KB/Docs, queries might be search params (skip) or versioning (maybe keep).
-            # For safety/simplicity, let's strip them for now unless they seem vital.
-            clean_url = full_url.split('#')[0].split('?')[0]
+            if resolve_local is not None:
+                clean_url = resolve_local(href)
+                if clean_url is None:
+                    continue
+            else:
+                full_url = urljoin(base_url, href)
+                parsed = urlparse(full_url)
+
+                # Strict Filter: Must be same domain
+                if parsed.netloc != base_domain:
+                    continue
+
+                # Filter: Remove anchors/fragments and queries to avoid dupes
+                # Keep query params? Usually crawling wants unique pages.
+                # For KB/Docs, queries might be search params (skip) or versioning (maybe keep).
+                # For safety/simplicity, let's strip them for now unless they seem vital.
+                clean_url = full_url.split('#')[0].split('?')[0]
             
             # Avoid self-ref
             if clean_url == base_url.split('#')[0].split('?')[0]:
@@ -587,35 +847,167 @@ class Scraper:
             url (str): The URL of the webpage to scrape.
             dynamic (bool): Whether to use Playwright for dynamic rendering.
             **options: Additional options for Markdown conversion.
+                dedup_index (NearDuplicateIndex): If set, the main content is
+                    fingerprinted and near-duplicates of already indexed pages
+                    skip Markdown conversion (an ``OrderedChecks`` works too).
+                fingerprint (bool): If True, the result gets a 'fingerprint' field:
+                    the SimHash of the main content before conversion (see
+                    ``dedup.simhash``), for a ``dedup_index`` checked elsewhere.
+                convert (bool): If False, the page stops short of conversion:
+                    'markdown' is None and 'main_html' holds the main content.
+                main_html (str): The 'main_html' of an earlier call with
+                    ``convert=False``. Only conversion runs, and the result has
+                    just 'url' and 'markdown'.
+                manifest (CrawlManifest): If set, the fetched content is hashed and
+                    pages unchanged since the manifest was written are not parsed.
+                timings (bool): If True, the result gets a 'timings' field with the
+                    time, bytes and item counts of each stage (see ``metrics.StageTimings``).
+                html (str): The page's HTML, if it was already fetched; the fetch is
+                    skipped and ``url`` is only used to resolve links.
+                site_root (str): For saved pages, the directory root-relative links
+                    resolve against (see ``extract_links``).
+                deadline (float or Deadline): Seconds the whole page may take, from
+                    fetch or render through conversion. Past it, the page is
+                    returned as far as it got (see ``to_markdown``).
             
         Returns:
             dict: A dictionary containing 'url', 'metadata', 'markdown', 'raw_html', and 'nav_links'.
+                Near-duplicate pages have 'markdown' set to None and 'duplicate_of'
+                set to the canonical URL. With a manifest, 'content_hash' is added and
+                unchanged pages have 'unchanged' set to True and 'markdown' set to None.
+                If the deadline cut stages short, 'timed_out' lists them ('render',
+                'images', 'convert').
+
+        Raises:
+            DeadlineExceeded: If the deadline expired before the page was fetched.
         """
-        if dynamic:
-            html = self.fetch_html_dynamic(url)
+        include_timings = options.pop('timings', False)
+        deadline = Deadline.of(options.pop('deadline', None))
+        # Stages are only timed when someone will look at the numbers
+        if not include_timings and not metrics.has_collectors():
+            result = self._scrape(url, dynamic, NULL_TIMINGS, deadline, **options)
         else:
-            html = self.fetch_html(url)
+            timings = StageTimings()
+            try:
+                result = self._scrape(url, dynamic, timings, deadline, **options)
+            except Exception as e:
+                metrics.emit(url, timings.as_dict(), e)
+                raise
+            recorded = timings.as_dict()
+            metrics.emit(url, recorded)
+            if include_timings:
+                result['timings'] = recorded
+        if deadline.timed_out:
+            result['timed_out'] = list(deadline.timed_out)
+        return result
+
+    def _scrape(self, url: str, dynamic: bool, timings, deadline: Deadline, **options) -> dict:
+        dedup_index = options.pop('dedup_index', None)
+        manifest = options.pop('manifest', None)
+        html = options.pop('html', None)
+        site_root = options.pop('site_root', None)
+        fingerprint = options.pop('fingerprint', False)
+        convert = options.pop('convert', True)
+        main_html = options.pop('main_html', None)
+
+        # Extracted by an earlier call: only the conversion is left
+        if main_html is not None:
+            archive = self._open_archive(url)
+            if archive is not None:
+                options.setdefault('assets', archive)
+            elif self.replay is not None:
+                options.setdefault('assets', self.replay)
+            with timings.stage('parse'):
+                main_soup = BeautifulSoup(main_html, 'lxml')
+            return {'url': url, 'markdown': self._convert_main(main_soup, timings, deadline, options)}
+
+        # Already fetched by the caller (e.g. a ConversionPool): no fetch stage
+        if html is None:
+            if dynamic:
+                with timings.stage('render'):
+                    html = self.fetch_html_dynamic(url, deadline=deadline)
+            else:
+                with timings.stage('fetch'):
+                    archive = self._open_archive(url)
+                    html = archive.html() if archive is not None else self.fetch_html(url, deadline=deadline)
+                # Images embedded in a saved MHT page are read from it, not downloaded
+                if archive is not None:
+                    options.setdefault('assets', archive)
+            if timings.enabled:
+                timings.add('render' if dynamic else 'fetch', bytes=len(html.encode('utf-8')))
+                if self.fetch_status is not None and not dynamic:
+                    timings.set('status', self.fetch_status)
+        # Replaying: the page's images come from the WARC archive too
+        if self.replay is not None:
+            options.setdefault('assets', self.replay)
+
+        # Unchanged since the last run: reuse stored metadata/links, skip parsing
+        content_hash = None
+        if manifest is not None:
+            content_hash = CrawlManifest.content_hash(html)
+            entry = manifest.lookup(url, content_hash)
+            if entry is not None:
+                return {
+                    'url': url,
+                    'metadata': entry.get('metadata', {}),
+                    'markdown': None,
+                    'raw_html': html,
+                    'nav_links': [],
+                    'internal_links': entry.get('internal_links', []),
+                    'content_hash': content_hash,
+                    'unchanged': True
+                }
             
         # Parse once to avoid redundant parsing
-        soup = BeautifulSoup(html, 'lxml')
+        with timings.stage('parse'):
+            soup = BeautifulSoup(html, 'lxml')
 
         # Read-only operations first
-        metadata = self.extract_metadata(soup)
-        nav_links = self.extract_nav_links(soup, url)
-        internal_links = self.extract_links(soup, url)
+        with timings.stage('metadata'):
+            metadata = self.extract_metadata(soup)
+        with timings.stage('links'):
+            nav_links = self.extract_nav_links(soup, url, site_root)
+            internal_links = self.extract_links(soup, url, site_root)
+        timings.add('links', count=len(internal_links))
         
         # Destructive operation last (modifies soup)
         # Pass as_soup=True to avoid stringification and re-parsing in to_markdown
-        main_soup = self.extract_main_content(soup, as_soup=True)
+        with timings.stage('extract'):
+            main_soup = self.extract_main_content(soup, as_soup=True)
 
-        # Convert to markdown
-        markdown = self.to_markdown(main_soup, **options)
-        
-        return {
+        result = {
             'url': url,
             'metadata': metadata,
-            'markdown': markdown,
+            'markdown': None,
             'raw_html': html,
             'nav_links': nav_links,
             'internal_links': internal_links
         }
+        if content_hash is not None:
+            result['content_hash'] = content_hash
+
+        # Skip conversion entirely for near-duplicates of pages already seen
+        if dedup_index is not None or fingerprint:
+            with timings.stage('dedup'):
+                text = main_soup.get_text(' ')
+                if fingerprint:
+                    result['fingerprint'] = simhash(text)
+                duplicate_of = dedup_index.check(url, text) if dedup_index is not None else None
+            if duplicate_of is not None:
+                result['duplicate_of'] = duplicate_of
+                return result
+
+        if not convert:
+            result['main_html'] = str(main_soup)
+            return result
+
+        # Convert to markdown
+        result['markdown'] = self._convert_main(main_soup, timings, deadline, options)
+        return result
+
+    def _convert_main(self, main_soup, timings, deadline: Deadline, options: dict) -> str:
+        if timings.enabled:
+            options['stage_timings'] = timings
+        if deadline.expires is not None:
+            options['deadline'] = deadline
+        return self.to_markdown(main_soup, **options)
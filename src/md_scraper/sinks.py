@@ -0,0 +1,263 @@
+import abc
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from md_scraper.utils import get_title_from_result
+
+class FilenameAllocator:
+    """
+    Hands out collision-free filenames.
+
+    Pages with the same title get numbered suffixes (``Title.md``,
+    ``Title_2.md``, ...) instead of silently overwriting each other.
+    """
+
+    def __init__(self, reserved: Iterable[str] = ()):
+        self._used = set(reserved)
+
+    def reserve(self, name: str):
+        """Marks a name as taken without allocating it."""
+        self._used.add(name)
+
+    def allocate(self, stem: str, ext: str = '.md') -> str:
+        """Returns ``stem + ext`` or the first free numbered variant of it."""
+        name = f"{stem}{ext}"
+        n = 2
+        while name in self._used:
+            name = f"{stem}_{n}{ext}"
+            n += 1
+        self._used.add(name)
+        return name
+
+class OutputSink(abc.ABC):
+    """
+    Base class for output sinks that persist scrape results.
+
+    Writes are buffered and flushed in batches of ``batch_size`` pages (or once
+    ``max_buffer_bytes`` of Markdown is pending), so large crawls issue few,
+    large writes instead of one open/write/close per page.
+    """
+
+    def __init__(self, path: Optional[str], batch_size: int = 50, max_buffer_bytes: int = 8 * 1024 * 1024):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_buffer_bytes = max_buffer_bytes
+        self.names = FilenameAllocator()
+        self.written_count = 0
+        self.bytes_written = 0
+        self._buffer: List[Tuple[str, dict, str]] = []
+        self._buffer_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, url: str, result: dict, name: Optional[str] = None) -> str:
+        """
+        Queues a result for output.
+
+        Args:
+            url (str): The URL the result was scraped from.
+            result (dict): The scrape result ('markdown', 'metadata', ...).
+            name (str): Optional explicit name; otherwise derived from the title.
+
+        Returns:
+            str: Where the result will be stored (file path or archive member).
+                It is written there once ``pending`` is 0.
+        """
+        if name is None:
+            name = self.names.allocate(get_title_from_result(result, url))
+        else:
+            self.names.reserve(name)
+
+        self._buffer.append((url, result, name))
+        self._buffer_bytes += len(result.get('markdown') or '')
+        if len(self._buffer) >= self.batch_size or self._buffer_bytes >= self.max_buffer_bytes:
+            self.flush()
+        return self._location(name)
+
+    @property
+    def pending(self) -> int:
+        """Results queued but not written yet."""
+        return len(self._buffer)
+
+    def flush(self):
+        """Writes all buffered results."""
+        if not self._buffer:
+            return
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._write_batch(batch)
+        self.written_count += len(batch)
+
+    def close(self):
+        """Flushes pending results and releases the underlying file."""
+        self.flush()
+
+    def _location(self, name: str) -> str:
+        return f"{self.path}:{name}"
+
+    @abc.abstractmethod
+    def _write_batch(self, batch: List[Tuple[str, dict, str]]):
+        """Writes a batch of ``(url, result, name)`` entries."""
+
+class MarkdownDirectorySink(OutputSink):
+    """Writes each page to its own ``.md`` file in a directory."""
+
+    extension = None
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        os.makedirs(path, exist_ok=True)
+
+    def _location(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_batch(self, batch):
+        for _, result, name in batch:
+            data = (result.get('markdown') or '').encode('utf-8')
+            path = os.path.join(self.path, name)
+            # Names may contain directories (e.g. a mirrored directory tree)
+            if os.path.dirname(name):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.bytes_written += len(data)
+
+class JsonlSink(OutputSink):
+    """Streams one JSON object (url, metadata, markdown) per line."""
+
+    extension = '.jsonl'
+
+    def __init__(self, path: Optional[str], **kwargs):
+        super().__init__(path, **kwargs)
+        # No path means stdout, which makes the sink usable in shell pipelines
+        self._file = open(path, 'w', encoding='utf-8') if path else sys.stdout
+
+    def _location(self, name: str) -> str:
+        return self.path or '<stdout>'
+
+    def _write_batch(self, batch):
+        lines = [
+            json.dumps({'url': url, 'metadata': result.get('metadata', {}), 'markdown': result.get('markdown') or ''},
+                       ensure_ascii=False)
+            for url, result, _ in batch
+        ]
+        data = '\n'.join(lines) + '\n'
+        self._file.write(data)
+        self._file.flush()
+        self.bytes_written += len(data.encode('utf-8'))
+
+    def close(self):
+        super().close()
+        if self._file is not sys.stdout:
+            self._file.close()
+
+class TarSink(OutputSink):
+    """Appends ``.md`` members to a tar archive (gzip-compressed for ``.tar.gz``/``.tgz``)."""
+
+    extension = '.tar.gz'
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        # Archive modules are imported here to keep CLI startup fast
+        import tarfile
+        mode = 'w:gz' if path.endswith(('.gz', '.tgz')) else 'w'
+        self._tar = tarfile.open(path, mode)
+
+    def _write_batch(self, batch):
+        import tarfile
+        now = time.time()
+        for _, result, name in batch:
+            data = (result.get('markdown') or '').encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = now
+            self._tar.addfile(info, io.BytesIO(data))
+            self.bytes_written += len(data)
+
+    def close(self):
+        super().close()
+        self._tar.close()
+
+class ZipSink(OutputSink):
+    """Appends deflated ``.md`` members to a ZIP archive."""
+
+    extension = '.zip'
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        import zipfile
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+
+    def _write_batch(self, batch):
+        for _, result, name in batch:
+            data = (result.get('markdown') or '').encode('utf-8')
+            self._zip.writestr(name, data)
+            self.bytes_written += len(data)
+
+    def close(self):
+        super().close()
+        self._zip.close()
+
+class BundleSink(OutputSink):
+    """Concatenates all pages into one Markdown file with a separator per page."""
+
+    extension = '.md'
+
+    def __init__(self, path: Optional[str], **kwargs):
+        super().__init__(path, **kwargs)
+        self._file = open(path, 'w', encoding='utf-8') if path else sys.stdout
+
+    def _location(self, name: str) -> str:
+        return self.path or '<stdout>'
+
+    def _write_batch(self, batch):
+        parts = []
+        for url, result, _ in batch:
+            separator = '\n\n---\n\n' if self.written_count or parts else ''
+            parts.append(f"{separator}<!-- source: {url} -->\n\n{(result.get('markdown') or '').strip()}\n")
+        data = ''.join(parts)
+        self._file.write(data)
+        self._file.flush()
+        self.bytes_written += len(data.encode('utf-8'))
+
+    def close(self):
+        super().close()
+        if self._file is not sys.stdout:
+            self._file.close()
+
+SINK_FORMATS: Dict[str, type] = {
+    'md': MarkdownDirectorySink,
+    'jsonl': JsonlSink,
+    'tar': TarSink,
+    'zip': ZipSink,
+    'bundle': BundleSink
+}
+
+def open_sink(fmt: str, output: Optional[str], **kwargs) -> OutputSink:
+    """
+    Creates the output sink for a format.
+
+    Args:
+        fmt (str): One of the keys of ``SINK_FORMATS``.
+        output (str): Target directory ('md') or file. For file formats an
+            existing directory gets a ``scraped<ext>`` file inside it; 'jsonl'
+            and 'bundle' write to stdout when no output is given.
+        **kwargs: Passed to the sink (e.g. ``batch_size``).
+
+    Returns:
+        OutputSink: The opened sink.
+    """
+    sink_class = SINK_FORMATS[fmt]
+    if sink_class is not MarkdownDirectorySink and output and os.path.isdir(output):
+        output = os.path.join(output, f"scraped{sink_class.extension}")
+    if not output and sink_class in (MarkdownDirectorySink, TarSink, ZipSink):
+        raise ValueError(f"The '{fmt}' format requires an output path.")
+    return sink_class(output, **kwargs)
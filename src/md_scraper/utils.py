@@ -1,9 +1,57 @@
+import os
 import re
+import sys
 import time
+import pathlib
+import importlib
+import concurrent.futures
+from collections import deque
+from typing import Optional
 from urllib.parse import urlparse
 
 _FILENAME_SANITIZE_RE = re.compile(r'(?u)[^-\w.]')
 
+def lazy_getattr(module_name, attributes):
+    """
+    Builds a module ``__getattr__`` that imports the given names on first access.
+
+    Lets a module expose e.g. ``Scraper`` without importing bs4/lxml/markdownify
+    until it is really used. The value is cached on the module afterwards. Code
+    inside the module must reach these names through the module object, since
+    ``__getattr__`` isn't consulted for plain global lookups (this also keeps
+    them patchable in tests).
+
+    Args:
+        module_name (str): ``__name__`` of the module the hook is for.
+        attributes (dict): Maps each lazy name to the module it is imported from.
+    """
+    def __getattr__(name):
+        source = attributes.get(name)
+        if source is None:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(source), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+    return __getattr__
+
+def file_url(path: str) -> str:
+    """Returns the absolute ``file://`` URL of a local path."""
+    return pathlib.Path(path).resolve().as_uri()
+
+def local_path(url: str) -> Optional[str]:
+    """
+    Maps a ``file://`` URL or an existing file path to the file to read.
+
+    A ``file://`` URL of a directory maps to its ``index.html``, as a web server
+    would serve it. Anything else (an http(s) URL, a missing path) gives None.
+    """
+    if url.startswith('file:'):
+        # urllib.request is slow to import and only needed here
+        from urllib.request import url2pathname
+        path = url2pathname(urlparse(url).path)
+        return os.path.join(path, 'index.html') if os.path.isdir(path) else path
+    return url if os.path.isfile(url) else None
+
 def sanitize_filename(name):
     """Sanitize a string to be safe for filenames."""
     s = str(name).strip().replace(' ', '_')
@@ -30,3 +78,44 @@ def get_title_from_result(result, url):
         title = f'scraped_{int(time.time())}'
         
     return sanitize_filename(title)
+
+def iter_concurrent(items, fn, jobs=1):
+    """
+    Runs ``fn(url)`` for each ``(url, depth)`` of an iterator, ``jobs`` at a time.
+
+    Results are yielded in submission order. The iterator is consulted again
+    after every yield, so a Crawler can be fed the links of each result before
+    it hands out more URLs. With one job, ``fn`` runs in the calling thread.
+
+    Yields:
+        tuple: ``(url, depth, result, error)``; exactly one of result/error is set.
+    """
+    if jobs <= 1:
+        for url, depth in items:
+            try:
+                yield url, depth, fn(url), None
+            except Exception as e:
+                yield url, depth, None, e
+        return
+
+    pending = deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        try:
+            while True:
+                while len(pending) < jobs:
+                    try:
+                        url, depth = next(items)
+                    except StopIteration:
+                        break
+                    pending.append((url, depth, executor.submit(fn, url)))
+                if not pending:
+                    return
+                url, depth, future = pending.popleft()
+                try:
+                    yield url, depth, future.result(), None
+                except Exception as e:
+                    yield url, depth, None, e
+        finally:
+            # Stopped early (e.g. aborted): don't start the queued pages
+            for _, _, future in pending:
+                future.cancel()
@@ -0,0 +1,409 @@
+import base64
+import hashlib
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+WARC_EXTENSIONS = ('.warc', '.warc.gz')
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+# Hop-by-hop and encoding headers don't describe the decoded body that is stored
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+def is_warc(path: str) -> bool:
+    return path.lower().endswith(WARC_EXTENSIONS)
+
+class NotArchivedError(LookupError):
+    """Raised when a replayed URL has no response in the archive."""
+
+class _RecordReader:
+    """
+    Reads a WARC file front to back, decompressing its gzip members on the fly.
+
+    ``tell()`` returns a position that ``at()`` can reopen: the file offset of the
+    gzip member and the offset in its decompressed data (for a plain file, 0 and
+    the file offset). WARC writers compress each record on its own, so a record's
+    member offset is enough to read it again without decompressing the rest.
+    """
+
+    CHUNK = 256 * 1024
+
+    def __init__(self, f, gzipped: bool):
+        self._f = f
+        self._gzipped = gzipped
+        self._member = f.tell() if gzipped else 0
+        # Decompressed (or plain) offset of _buf[0] within the member
+        self._base = 0 if gzipped else f.tell()
+        self._buf = b''
+        self._pos = 0
+        # Compressed input read but not decompressed yet, and the file offset it starts at
+        self._raw = b''
+        self._raw_start = f.tell()
+        self._decompressor = zlib.decompressobj(31) if gzipped else None
+
+    @classmethod
+    def at(cls, f, gzipped: bool, position: Tuple[int, int]) -> '_RecordReader':
+        member, offset = position
+        f.seek(member if gzipped else offset)
+        reader = cls(f, gzipped)
+        reader.skip(offset if gzipped else 0)
+        return reader
+
+    def _next_member(self) -> bool:
+        if not self._raw:
+            self._raw = self._f.read(self.CHUNK)
+            if not self._raw:
+                return False
+        self._member = self._raw_start
+        self._base, self._buf, self._pos = 0, b'', 0
+        self._decompressor = zlib.decompressobj(31)
+        return True
+
+    def _fill(self) -> bool:
+        """Adds data to the buffer; False at the end of the file."""
+        if self._pos:
+            self._base += self._pos
+            self._buf, self._pos = self._buf[self._pos:], 0
+        if not self._gzipped:
+            chunk = self._f.read(self.CHUNK)
+            self._buf += chunk
+            return bool(chunk)
+        while True:
+            if self._decompressor.eof:
+                # The next member only starts once this one is used up, so positions stay in one member
+                if self._buf or not self._next_member():
+                    return False
+            if not self._raw:
+                self._raw = self._f.read(self.CHUNK)
+                if not self._raw:
+                    return False
+            fed = self._raw
+            data = self._decompressor.decompress(fed, self.CHUNK)
+            rest = self._decompressor.unused_data if self._decompressor.eof else self._decompressor.unconsumed_tail
+            self._raw_start += len(fed) - len(rest)
+            self._raw = rest
+            if data:
+                self._buf += data
+                return True
+
+    def tell(self) -> Tuple[int, int]:
+        if self._gzipped and self._pos == len(self._buf) and self._decompressor.eof:
+            self._next_member()
+        return self._member, self._base + self._pos
+
+    def readline(self, limit: int = -1) -> bytes:
+        while True:
+            end = self._buf.find(b'\n', self._pos)
+            if end != -1 and (limit < 0 or end - self._pos < limit):
+                end += 1
+                break
+            if 0 <= limit <= len(self._buf) - self._pos or not self._fill():
+                end = len(self._buf) if limit < 0 else min(len(self._buf), self._pos + limit)
+                break
+        line, self._pos = self._buf[self._pos:end], end
+        return line
+
+    def read(self, size: int) -> bytes:
+        while len(self._buf) - self._pos < size and self._fill():
+            pass
+        data = self._buf[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def skip(self, size: int):
+        while size > 0:
+            if self._pos == len(self._buf) and not self._fill():
+                return
+            step = min(size, len(self._buf) - self._pos)
+            self._pos += step
+            size -= step
+
+    def next_record(self) -> Optional[Tuple[Tuple[int, int], Dict[str, str]]]:
+        """Position and (lower-cased) headers of the next record, or None at the end."""
+        while True:
+            position = self.tell()
+            line = self.readline()
+            if not line:
+                return None
+            if line.strip():
+                break
+        if not line.startswith(b'WARC/'):
+            raise ValueError(f"Not a WARC record at offset {position}: {line[:40]!r}")
+        return position, _read_headers(self)
+
+def _read_headers(reader) -> Dict[str, str]:
+    headers = {}
+    name = None
+    while True:
+        line = reader.readline()
+        if not line.strip():
+            return headers
+        text = line.decode('utf-8', 'replace')
+        if text[0] in ' \t' and name is not None:
+            # Folded continuation line
+            headers[name] += ' ' + text.strip()
+            continue
+        name, _, value = text.partition(':')
+        name = name.strip().lower()
+        headers[name] = value.strip()
+
+class _LineReader:
+    """readline() over bytes in memory, for parsing an HTTP head with _read_headers."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self.pos = 0
+
+    def readline(self) -> bytes:
+        end = self._data.find(b'\n', self.pos)
+        end = len(self._data) if end == -1 else end + 1
+        line, self.pos = self._data[self.pos:end], end
+        return line
+
+def _parse_http(block: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """Status, lower-cased headers and decoded body of an archived HTTP response."""
+    reader = _LineReader(block)
+    status_line = reader.readline().decode('latin-1').split(None, 2)
+    status = int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+    headers = _read_headers(reader)
+    body = block[reader.pos:]
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        body = _dechunk(body)
+    encoding = headers.get('content-encoding', '').lower()
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        try:
+            body = zlib.decompress(body, 47 if encoding != 'deflate' else zlib.MAX_WBITS)
+        except zlib.error:
+            if encoding != 'deflate':
+                raise
+            # Raw deflate without the zlib header, as some servers send it
+            body = zlib.decompress(body, -zlib.MAX_WBITS)
+    return status, headers, body
+
+def _dechunk(body: bytes) -> bytes:
+    reader = _LineReader(body)
+    parts = []
+    while True:
+        size_line = reader.readline()
+        if not size_line:
+            break
+        size = int(size_line.split(b';')[0].strip() or b'0', 16)
+        if size == 0:
+            break
+        parts.append(body[reader.pos:reader.pos + size])
+        reader.pos += size
+        reader.readline()
+    return b''.join(parts)
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(';')[0].strip().lower()
+
+def _charset(content_type: str) -> Optional[str]:
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
+
+class ArchivedResponse(NamedTuple):
+    """Where an archived response is, and what its HTTP head said."""
+    file: int
+    position: Tuple[int, int]
+    status: int
+    content_type: str
+    location: Optional[str]
+
+class WarcArchive:
+    """
+    Index of the HTTP responses in one or more WARC files (``.warc`` or ``.warc.gz``).
+
+    The files are streamed through once, record by record: only each response's
+    URL, status, content type and position are kept, never the bodies. Bodies
+    are read back (seeking straight to the record's gzip member) when a page or
+    image is asked for, so a huge crawl can be converted again without holding
+    it in memory and without touching the network. When a URL was captured more
+    than once, the last capture wins.
+
+    Reading is thread-safe, and the index can be pickled (e.g. to worker
+    processes); each read opens the file on its own.
+    """
+
+    # Images not in the archive are left alone instead of being downloaded
+    offline = True
+    # Relative URLs resolve against each page's own URL
+    location = None
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths: List[str] = [paths] if isinstance(paths, str) else list(paths)
+        self.responses: Dict[str, ArchivedResponse] = {}
+        # HTML pages in the order they were first captured
+        self.pages: List[str] = []
+        seen = set()
+        for index, path in enumerate(self.paths):
+            for url, response in self._scan(index, path):
+                self.responses[url] = response
+                if url not in seen and 200 <= response.status < 300 and response.content_type in HTML_TYPES:
+                    seen.add(url)
+                    self.pages.append(url)
+
+    @staticmethod
+    def _scan(index: int, path: str) -> Iterator[Tuple[str, ArchivedResponse]]:
+        with open(path, 'rb') as f:
+            reader = _RecordReader(f, path.lower().endswith('.gz'))
+            while True:
+                record = reader.next_record()
+                if record is None:
+                    return
+                position, headers = record
+                length = int(headers.get('content-length', 0))
+                url = headers.get('warc-target-uri', '').strip('<>')
+                if (headers.get('warc-type') != 'response' or not url
+                        or not headers.get('content-type', '').startswith('application/http')):
+                    reader.skip(length)
+                    continue
+                # Only the HTTP head is read; the body is skipped
+                start = reader.tell()[1]
+                status_line = reader.readline(length).decode('latin-1').split(None, 2)
+                http_headers = _read_headers(reader)
+                reader.skip(length - (reader.tell()[1] - start))
+                status = int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+                yield url, ArchivedResponse(index, position, status, _media_type(http_headers.get('content-type', '')),
+                                            http_headers.get('location'))
+
+    def __contains__(self, url: str) -> bool:
+        return url.split('#')[0] in self.responses
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def _read(self, response: ArchivedResponse) -> Tuple[int, Dict[str, str], bytes]:
+        path = self.paths[response.file]
+        with open(path, 'rb') as f:
+            reader = _RecordReader.at(f, path.lower().endswith('.gz'), response.position)
+            _, headers = reader.next_record()
+            return _parse_http(reader.read(int(headers.get('content-length', 0))))
+
+    def lookup(self, url: str, max_redirects: int = 10) -> Tuple[str, ArchivedResponse]:
+        """
+        The archived response for a URL, following archived redirects.
+
+        Returns:
+            tuple: The final URL and its ``ArchivedResponse``.
+
+        Raises:
+            NotArchivedError: If the URL (or a redirect target) isn't archived.
+        """
+        from urllib.parse import urljoin
+        url = url.split('#')[0]
+        for _ in range(max_redirects + 1):
+            response = self.responses.get(url)
+            if response is None:
+                raise NotArchivedError(f"Not in the WARC archive: {url}")
+            if not (300 <= response.status < 400 and response.location):
+                return url, response
+            url = urljoin(url, response.location).split('#')[0]
+        raise NotArchivedError(f"Too many redirects in the WARC archive: {url}")
+
+    def fetch(self, url: str) -> Tuple[int, str]:
+        """
+        Status and decoded text of an archived page.
+
+        Raises:
+            NotArchivedError: If the page isn't archived.
+        """
+        _, response = self.lookup(url)
+        status, headers, body = self._read(response)
+        charset = _charset(headers.get('content-type', '')) or 'utf-8'
+        try:
+            return status, body.decode(charset, errors='replace')
+        except LookupError:
+            return status, body.decode('utf-8', errors='replace')
+
+    def iter_pages(self) -> Iterator[Tuple[str, str]]:
+        """Yields ``(url, html)`` for every archived HTML page, one at a time."""
+        for url in self.pages:
+            yield url, self.fetch(url)[1]
+
+    def get(self, src: str) -> Optional[Tuple[str, bytes]]:
+        """``(content_type, content)`` of an archived resource (e.g. an image), or None."""
+        try:
+            _, response = self.lookup(src)
+        except NotArchivedError:
+            return None
+        if not 200 <= response.status < 300:
+            return None
+        _, headers, body = self._read(response)
+        return _media_type(headers.get('content-type', '')) or 'application/octet-stream', body
+
+def _warc_date() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _digest(data: bytes) -> str:
+    return 'sha1:' + base64.b32encode(hashlib.sha1(data).digest()).decode('ascii')
+
+class WarcWriter:
+    """
+    Records HTTP responses to a WARC/1.1 file, one ``response`` record each.
+
+    Files ending in ``.gz`` get one gzip member per record, the layout WARC
+    tools (and ``WarcArchive``) rely on to seek to a single record. Bodies are
+    stored decoded, as ``requests`` returns them, so ``Content-Encoding`` and
+    ``Transfer-Encoding`` are dropped and ``Content-Length`` is set to match.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, path: str, software: str = 'md-scraper'):
+        self.path = path
+        self.responses = 0
+        self._gzipped = path.lower().endswith('.gz')
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        info = f"software: {software}\r\nformat: WARC File Format 1.1\r\n".encode('utf-8')
+        self._write_record({'WARC-Type': 'warcinfo', 'WARC-Filename': path.replace('\\', '/').rsplit('/', 1)[-1],
+                            'Content-Type': 'application/warc-fields'}, info)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _write_record(self, fields: Dict[str, str], block: bytes):
+        import uuid
+        headers = {'WARC-Type': fields.pop('WARC-Type'), 'WARC-Record-ID': f"<urn:uuid:{uuid.uuid4()}>",
+                   'WARC-Date': _warc_date(), **fields, 'Content-Length': str(len(block))}
+        head = 'WARC/1.1\r\n' + ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n'
+        record = head.encode('utf-8') + block + b'\r\n\r\n'
+        if self._gzipped:
+            # wbits=31: a gzip member per record
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            record = compressor.compress(record) + compressor.flush()
+        with self._lock:
+            self._file.write(record)
+
+    def write_response(self, url: str, status: int, reason: str, headers: Iterable[Tuple[str, str]], body: bytes,
+                       http_version: str = 'HTTP/1.1'):
+        """Writes one response record."""
+        lines = [f"{http_version} {status} {reason}".rstrip()]
+        lines += [f"{name}: {value}" for name, value in headers if name.lower() not in _DROPPED_HEADERS]
+        lines.append(f"Content-Length: {len(body)}")
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8', 'replace')
+        block = head + body
+        self._write_record({'WARC-Type': 'response', 'WARC-Target-URI': url,
+                            'Content-Type': 'application/http;msgtype=response',
+                            'WARC-Payload-Digest': _digest(body), 'WARC-Block-Digest': _digest(block)}, block)
+        with self._lock:
+            self.responses += 1
+
+    def record(self, response):
+        """Writes a ``requests`` response, and the redirects that led to it."""
+        for hop in (*response.history, response):
+            version = getattr(getattr(hop, 'raw', None), 'version', 11)
+            self.write_response(hop.url, hop.status_code, hop.reason or '', hop.headers.items(), hop.content,
+                                'HTTP/1.0' if version == 10 else 'HTTP/1.1')
@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted because the wait queue is full or timed out."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class _Waiter:
+    __slots__ = ('event', 'granted')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+class Ticket:
+    """An admitted request's slot. Release it exactly once (further calls are no-ops)."""
+
+    def __init__(self, controller: 'AdmissionController', kind: str):
+        self._controller = controller
+        self.kind = kind
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self.kind)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+class AdmissionController:
+    """
+    Concurrency limits with a bounded, per-client fair wait queue.
+
+    Each request kind (e.g. 'static', 'dynamic', 'crawl') has its own limit on
+    in-flight requests. Requests over the limit wait in a queue shared by all
+    kinds; once ``max_queue`` requests are waiting, new ones are rejected
+    immediately so the service sheds load instead of piling up work.
+    Freed slots go to waiting clients round-robin, so one client submitting
+    many requests cannot starve the others.
+
+    Waiting requests hold a server thread, so ``max_total`` bounds the
+    requests in flight and queued across all kinds. Set below the server's
+    thread count, it keeps threads free for health checks and status.
+    """
+
+    def __init__(self, limits: Dict[str, int], max_queue: int = 16, queue_timeout: float = 30.0, retry_after: int = 5,
+                 max_total: Optional[int] = None):
+        self.limits = dict(limits)
+        self.max_queue = max_queue
+        self.max_total = max_total
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._in_flight = {kind: 0 for kind in self.limits}
+        # kind -> client -> waiters, in round-robin order of clients
+        self._waiting: Dict[str, 'OrderedDict[str, deque]'] = {kind: OrderedDict() for kind in self.limits}
+        self._queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self, kind: str, client: str = 'anonymous') -> Ticket:
+        """
+        Admits a request, waiting in the fair queue if its kind is at capacity.
+
+        Args:
+            kind (str): The request kind; must be one of ``limits``.
+            client (str): Identifies the client for fair queuing.
+
+        Returns:
+            Ticket: The slot, to be released when the request finishes.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out.
+        """
+        with self._lock:
+            if self.max_total is not None and sum(self._in_flight.values()) + self._queued >= self.max_total:
+                self.rejected += 1
+                raise AdmissionRejected("Server is at capacity; retry later.", self.retry_after)
+            if self._in_flight[kind] < self.limits[kind] and not self._waiting[kind]:
+                self._in_flight[kind] += 1
+                self.admitted += 1
+                return Ticket(self, kind)
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected("Server is at capacity; retry later.", self.retry_after)
+            waiter = _Waiter()
+            self._waiting[kind].setdefault(client, deque()).append(waiter)
+            self._queued += 1
+
+        waiter.event.wait(self.queue_timeout)
+
+        with self._lock:
+            # A slot may have been handed over between the timeout and taking the lock
+            if not waiter.granted:
+                queue = self._waiting[kind].get(client)
+                if queue is not None:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._waiting[kind][client]
+                self._queued -= 1
+                self.rejected += 1
+                raise AdmissionRejected("Timed out waiting for capacity; retry later.", self.retry_after)
+            self.admitted += 1
+        return Ticket(self, kind)
+
+    def _release(self, kind: str):
+        with self._lock:
+            clients = self._waiting[kind]
+            if not clients:
+                self._in_flight[kind] -= 1
+                return
+            # Hand the slot straight to the next client in round-robin order
+            client, queue = next(iter(clients.items()))
+            waiter = queue.popleft()
+            if queue:
+                clients.move_to_end(client)
+            else:
+                del clients[client]
+            self._queued -= 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def stats(self) -> dict:
+        """Returns in-flight and queued counts per kind."""
+        with self._lock:
+            return {
+                'kinds': {
+                    kind: {
+                        'limit': self.limits[kind],
+                        'in_flight': self._in_flight[kind],
+                        'queued': sum(len(q) for q in self._waiting[kind].values()),
+                        'waiting_clients': len(self._waiting[kind])
+                    }
+                    for kind in self.limits
+                },
+                'queued': self._queued,
+                'max_queue': self.max_queue,
+                'max_total': self.max_total,
+                'admitted': self.admitted,
+                'rejected': self.rejected
+            }
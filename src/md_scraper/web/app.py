@@ -1,12 +1,327 @@
 import os
-import io
-import zipfile
-from flask import Flask, request, jsonify, render_template, send_file
-from md_scraper.scraper import Scraper
-from md_scraper.utils import get_title_from_result, sanitize_filename
+import atexit
+import json
+import tempfile
+import threading
+import contextlib
+import sys
+import concurrent.futures
+from urllib.parse import urlparse
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from md_scraper.crawler import Crawler
+from md_scraper.browser_pool import BrowserPool
+from md_scraper.manifest import CrawlManifest
+from md_scraper.web.jobs import JobStore, JobManager, JobQueueFull, QUEUED, RUNNING, COMPLETED, FAILED
+from md_scraper.web.zipstream import iter_zip
+from md_scraper.web.admission import AdmissionController, AdmissionRejected
+from md_scraper.web.compression import compress_response
+from md_scraper.web.prometheus import CONTENT_TYPE as METRICS_CONTENT_TYPE, Counter, Gauge, ScrapeMetrics
+from md_scraper.metrics import add_collector
+from md_scraper.utils import lazy_getattr
+
+# The scraper (requests, bs4, lxml, markdownify) is imported on first use, so
+# workers boot and answer health checks without loading it
+__getattr__ = lazy_getattr(__name__, {'Scraper': 'md_scraper.scraper'})
+_this = sys.modules[__name__]
 
 app = Flask(__name__)
+app.config.update(
+    JOB_DB_PATH=os.environ.get('SCRAPER_JOB_DB', os.path.join(tempfile.gettempdir(), 'md_scraper_jobs.sqlite3')),
+    JOB_WORKERS=int(os.environ.get('SCRAPER_JOB_WORKERS', 2)),
+    JOB_MAX_JOBS=int(os.environ.get('SCRAPER_JOB_MAX_JOBS', 100)),
+    JOB_TTL=float(os.environ.get('SCRAPER_JOB_TTL', 6 * 3600)),
+    JOB_MAX_PENDING=int(os.environ.get('SCRAPER_JOB_MAX_PENDING', 20)),
+    BROWSER_POOL_SIZE=int(os.environ.get('SCRAPER_BROWSER_POOL_SIZE', 2)),
+    BROWSER_POOL_MAX_PAGES=int(os.environ.get('SCRAPER_BROWSER_POOL_MAX_PAGES', 200)),
+    # Server threads per worker (gunicorn --threads) and how many of them
+    # admission control leaves free for health checks, status and metrics
+    THREADS=int(os.environ.get('SCRAPER_THREADS', 8)),
+    RESERVED_THREADS=int(os.environ.get('SCRAPER_RESERVED_THREADS', 2)),
+    MAX_STATIC=int(os.environ.get('SCRAPER_MAX_STATIC', 8)),
+    MAX_DYNAMIC=int(os.environ.get('SCRAPER_MAX_DYNAMIC', 2)),
+    MAX_CRAWLS=int(os.environ.get('SCRAPER_MAX_CRAWLS', 2)),
+    MAX_QUEUE=int(os.environ.get('SCRAPER_MAX_QUEUE', 16)),
+    QUEUE_TIMEOUT=float(os.environ.get('SCRAPER_QUEUE_TIMEOUT', 30)),
+    RETRY_AFTER=int(os.environ.get('SCRAPER_RETRY_AFTER', 5)),
+    # Proxies in front of the service that append to X-Forwarded-For (Cloud Run's load balancer is one)
+    TRUSTED_PROXIES=int(os.environ.get('SCRAPER_TRUSTED_PROXIES', 1)),
+    BATCH_MAX_URLS=int(os.environ.get('SCRAPER_BATCH_MAX_URLS', 500)),
+    BATCH_PARALLELISM=int(os.environ.get('SCRAPER_BATCH_PARALLELISM', 4)),
+    BATCH_MAX_PARALLELISM=int(os.environ.get('SCRAPER_BATCH_MAX_PARALLELISM', 16)),
+    METRICS_ENABLED=os.environ.get('SCRAPER_METRICS', '1') != '0',
+    # Seconds a page may take (fetch/render, images, conversion); 0 for none
+    PAGE_DEADLINE=float(os.environ.get('SCRAPER_PAGE_DEADLINE', 60)),
+    MAX_PAGE_DEADLINE=float(os.environ.get('SCRAPER_MAX_PAGE_DEADLINE', 300))
+)
+
+# Admission control: separate concurrency limits per request kind, one bounded fair queue.
+# Admitted and waiting requests each hold a thread, so together they stay below the thread count.
+admission = AdmissionController(
+    {'static': app.config['MAX_STATIC'], 'dynamic': app.config['MAX_DYNAMIC'], 'crawl': app.config['MAX_CRAWLS']},
+    max_queue=app.config['MAX_QUEUE'],
+    queue_timeout=app.config['QUEUE_TIMEOUT'],
+    retry_after=app.config['RETRY_AFTER'],
+    max_total=max(1, app.config['THREADS'] - app.config['RESERVED_THREADS'])
+)
+
+# Stage timings of every page scraped by this process, served on /metrics
+scrape_metrics = ScrapeMetrics()
+if app.config['METRICS_ENABLED']:
+    add_collector(scrape_metrics.collect)
+
+def _request_kind(crawl: bool, dynamic: bool) -> str:
+    return 'crawl' if crawl else 'dynamic' if dynamic else 'static'
+
+def _client_id() -> str:
+    """
+    Identifies the client for fair queuing: the X-Forwarded-For hop appended by
+    the outermost trusted proxy. Earlier hops come from the client itself.
+    """
+    trusted = app.config['TRUSTED_PROXIES']
+    hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',')]
+    if trusted > 0 and len(hops) >= trusted and hops[-trusted]:
+        return hops[-trusted]
+    return request.remote_addr or 'anonymous'
+
+def _busy_response(e):
+    """503 for a request refused by admission control or the job queue."""
+    response = jsonify({'error': str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.after_request
+def compress(response):
+    """Compresses JSON, NDJSON, SSE and HTML responses with gzip or zstd when the client accepts it."""
+    return compress_response(response, request.headers.get('Accept-Encoding', ''))
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the process-wide pool of warm browsers, starting it on first use."""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool(size=app.config['BROWSER_POOL_SIZE'],
+                                        max_pages_per_browser=app.config['BROWSER_POOL_MAX_PAGES'])
+            atexit.register(_browser_pool.close, wait=False)
+        return _browser_pool
+
+# Launch the browsers at boot rather than on the first dynamic request
+if os.environ.get('SCRAPER_BROWSER_POOL_EAGER') == '1':
+    get_browser_pool()
+
+def _new_scraper(dynamic: bool = False, session=None):
+    """Creates a request's Scraper; dynamic requests render on the shared browser pool."""
+    kwargs = {}
+    if dynamic:
+        kwargs['browser_pool'] = get_browser_pool()
+    if session is not None:
+        kwargs['session'] = session
+    return _this.Scraper(**kwargs)
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    pool = _browser_pool
+    return jsonify({
+        'status': 'ok',
+        'browser_pool': pool.stats() if pool is not None else None
+    })
+
+@app.route('/api/status', methods=['GET'])
+def status():
+    pool = _browser_pool
+    return jsonify({
+        'admission': admission.stats(),
+        'browser_pool': pool.stats() if pool is not None else None
+    })
+
+def _admission_metrics() -> list:
+    stats = admission.stats()
+    limit = Gauge('md_scraper_admission_limit', 'Concurrent requests allowed, by kind.', ['kind'])
+    in_flight = Gauge('md_scraper_admission_in_flight', 'Requests being served, by kind.', ['kind'])
+    queued = Gauge('md_scraper_admission_queued', 'Requests waiting for a slot, by kind.', ['kind'])
+    for kind, entry in stats['kinds'].items():
+        limit.set((kind,), entry['limit'])
+        in_flight.set((kind,), entry['in_flight'])
+        queued.set((kind,), entry['queued'])
+    admitted = Counter('md_scraper_admission_admitted_total', 'Requests admitted.')
+    admitted.inc(amount=stats['admitted'])
+    rejected = Counter('md_scraper_admission_rejected_total', 'Requests rejected with 503.')
+    rejected.inc(amount=stats['rejected'])
+    return [limit, in_flight, queued, admitted, rejected]
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timing histograms and admission state in the Prometheus text format."""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(scrape_metrics.render(_admission_metrics()), content_type=METRICS_CONTENT_TYPE)
+
+def _page_deadline(value):
+    """
+    The deadline of each page in seconds: the one asked for, or the server's
+    default, capped by the server's maximum. None for no deadline.
+
+    Raises:
+        ValueError: If the deadline asked for isn't a positive number.
+    """
+    if value in (None, ''):
+        seconds = app.config['PAGE_DEADLINE']
+    else:
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            seconds = None
+        if isinstance(value, bool) or seconds is None or not seconds > 0:
+            raise ValueError(f"Deadline must be a positive number of seconds, got {value!r}")
+    limit = app.config['MAX_PAGE_DEADLINE']
+    if limit > 0:
+        seconds = min(seconds, limit) if seconds > 0 else limit
+    return seconds if seconds > 0 else None
+
+def _check_url(url):
+    """
+    Raises:
+        ValueError: Unless ``url`` is an http(s) URL; the service mustn't read its own files.
+    """
+    parsed = urlparse(url) if isinstance(url, str) else None
+    if parsed is None or parsed.scheme.lower() not in ('http', 'https') or not parsed.netloc:
+        raise ValueError(f"Only http and https URLs can be scraped, got {url!r}")
+
+def _scrape_params(data: dict) -> dict:
+    """Reads the scrape/crawl options shared by the JSON API endpoints."""
+    if 'url' in data:
+        _check_url(data['url'])
+    return {
+        'url': data.get('url'),
+        'dynamic': data.get('dynamic', False),
+        'svg_action': data.get('svg_action', 'image'),
+        'image_action': data.get('image_action', 'remote'),
+        'strip_tags': data.get('strip_tags', []),
+        'crawl': data.get('crawl', False),
+        'depth': int(data.get('depth', 3)),
+        'max_pages': int(data.get('max_pages', 10)),
+        'only_subpaths': data.get('only_subpaths', False),
+        'timings': bool(data.get('timings', False)),
+        'fingerprint': bool(data.get('fingerprint', False)),
+        'deadline': _page_deadline(data.get('deadline'))
+    }
+
+def _request_fields(data: dict):
+    """Reads the optional 'fields' selection (a list or a comma-separated string)."""
+    fields = data.get('fields')
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',')]
+    return {f for f in fields if f} if fields else None
+
+def _select_fields(res: dict, fields) -> dict:
+    """
+    Keeps only the requested fields of a result.
+
+    'content_hash' can be requested even though scraping doesn't produce it; it
+    is computed from the raw HTML, so incremental clients needn't download it.
+    """
+    if fields is None or 'error' in res:
+        return res
+    selected = {key: value for key, value in res.items() if key in fields}
+    if 'content_hash' in fields and 'content_hash' not in res and res.get('raw_html') is not None:
+        selected['content_hash'] = CrawlManifest.content_hash(res['raw_html'])
+    return selected
+
+def _iter_scrape(scraper, params: dict):
+    """
+    Yields the result of each page scraped (or crawled) for a request.
+
+    A crawled page that fails is yielded as ``{'url': ..., 'error': ...}`` and
+    the crawl goes on; a single page's failure is raised.
+    """
+    url = params['url']
+    crawl = params['crawl']
+    if crawl:
+         iterator = Crawler([url], max_depth=params['depth'], max_pages=params['max_pages'], only_subpaths=params['only_subpaths'])
+    else:
+         iterator = zip([url], [0])
+
+    # Only asked for when wanted, so scrapers without timing support keep working
+    extra = {'timings': True} if params.get('timings') else {}
+    if params.get('fingerprint'):
+        extra['fingerprint'] = True
+    if params.get('deadline'):
+        extra['deadline'] = params['deadline']
+    for current_url, current_depth in iterator:
+        try:
+            res = scraper.scrape(current_url, dynamic=params['dynamic'], svg_action=params['svg_action'],
+                                 image_action=params['image_action'], strip=params['strip_tags'], **extra)
+        except Exception as e:
+            if not crawl:
+                raise
+            # One bad page (or one past its deadline) doesn't end the crawl
+            yield {'url': current_url, 'error': str(e)}
+            continue
+        yield res
+
+        if crawl and isinstance(iterator, Crawler):
+            # Try to get all internal links first
+            links = res.get('internal_links') or []
+
+            iterator.add_links(links, current_depth)
+
+# Streaming response formats for /api/scrape
+STREAM_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+def _stream_format(data: dict):
+    """Picks the streaming format from the 'stream' field or the Accept header."""
+    fmt = data.get('stream')
+    if fmt in STREAM_MIMETYPES:
+        return fmt
+    best = request.accept_mimetypes.best_match(['application/json', *STREAM_MIMETYPES.values()])
+    for name, mimetype in STREAM_MIMETYPES.items():
+        if best == mimetype:
+            return name
+    return None
+
+def _encode_event(fmt: str, payload: dict, event: str = 'result') -> str:
+    data = json.dumps(payload)
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+def _stream_scrape(params: dict, fmt: str, result_id=None, fields=None):
+    """Yields each page's result as soon as it has been scraped."""
+    store = get_job_store() if result_id else None
+    count = scraped = 0
+    error = None  # Of the last page that failed
+    try:
+        with _new_scraper(params['dynamic']) as scraper:
+            for res in _iter_scrape(scraper, params):
+                count += 1
+                failed = 'error' in res
+                if failed:
+                    error = res['error']
+                else:
+                    scraped += 1
+                if store:
+                    store.add_result(result_id, res, failed=failed)
+                yield _encode_event(fmt, _select_fields(res, fields), event='error' if failed else 'result')
+    except Exception as e:
+        if store:
+            store.update_job(result_id, status=FAILED, error=str(e))
+        # Headers are already sent, so errors are reported in-band
+        yield _encode_event(fmt, {'error': str(e)}, event='error')
+        return
+    if store:
+        if error is not None and not scraped:
+            store.update_job(result_id, status=FAILED, error=error)
+        else:
+            store.update_job(result_id, status=COMPLETED)
+    if fmt == 'sse':
+        done = {'count': count, 'result_id': result_id} if result_id else {'count': count}
+        yield _encode_event(fmt, done, event='done')
 
 @app.route('/api/scrape', methods=['POST'])
 def api_scrape():
@@ -14,79 +329,261 @@ def api_scrape():
     if not data or 'url' not in data:
         return jsonify({'error': 'URL is required'}), 400
 
-    url = data.get('url')
-    dynamic = data.get('dynamic', False)
-    svg_action = data.get('svg_action', 'image')
-    image_action = data.get('image_action', 'remote')
-    strip_tags = data.get('strip_tags', [])
-    crawl = data.get('crawl', False)
-    depth = int(data.get('depth', 3))
-    max_pages = int(data.get('max_pages', 10))
-    only_subpaths = data.get('only_subpaths', False)
+    try:
+        params = _scrape_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Optionally keep the results server-side for a later ZIP download
+    store = data.get('store', False)
+    fields = _request_fields(data)
 
-    results = []
-    
     try:
-        with Scraper() as scraper:
-            if crawl:
-                 iterator = Crawler([url], max_depth=depth, max_pages=max_pages, only_subpaths=only_subpaths)
-            else:
-                 iterator = zip([url], [0])
-                 
-            for current_url, current_depth in iterator:
-                res = scraper.scrape(current_url, dynamic=dynamic, svg_action=svg_action, image_action=image_action, strip=strip_tags)
-                results.append(res)
-                
-                if crawl and isinstance(iterator, Crawler):
-                    # Try to get all internal links first
-                    links = res.get('internal_links') or []
-                    
-                    iterator.add_links(links, current_depth)
+        ticket = admission.acquire(_request_kind(params['crawl'], params['dynamic']), _client_id())
+    except AdmissionRejected as e:
+        return _busy_response(e)
+
+    fmt = _stream_format(data)
+    if fmt:
+        headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        result_id = None
+        if store:
+            result_id = get_job_store().create_job(params, status=RUNNING)
+            headers['X-Result-Id'] = result_id
+        response = Response(stream_with_context(_stream_scrape(params, fmt, result_id, fields)),
+                            mimetype=STREAM_MIMETYPES[fmt], headers=headers)
+        # The slot is held until the stream has been fully sent (or the client went away)
+        response.call_on_close(ticket.release)
+        return response
+
+    try:
+        with ticket, _new_scraper(params['dynamic']) as scraper:
+            results = list(_iter_scrape(scraper, params))
+
+        extra = {}
+        if store:
+            extra['result_id'] = _store_results(params, results)
+        results = [_select_fields(res, fields) for res in results]
         
         # Return a list of results when crawling to support multiple pages.
         # For a single URL request (crawl=False), return a single dict for backward compatibility.
-        if crawl:
-             return jsonify({'results': results})
+        if params['crawl']:
+             return jsonify({'results': results, **extra})
         else:
-             return jsonify(results[0])
+             return jsonify({**results[0], **extra})
              
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@contextlib.contextmanager
+def _batch_scraper(dynamic: bool, parallelism: int):
+    """Yields a Scraper whose session keeps a connection pool sized for ``parallelism`` threads."""
+    import requests
+    with requests.Session() as session:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=parallelism, pool_maxsize=parallelism)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        with _new_scraper(dynamic, session=session) as scraper:
+            yield scraper
+
+def _iter_batch(scraper, urls: list, options: dict, parallelism: int):
+    """
+    Scrapes unrelated URLs concurrently.
+
+    The scraper is shared by the worker threads: static fetches go through its
+    session and dynamic ones through the thread-safe browser pool.
+
+    Yields:
+        tuple: ``(index, url, result, error)`` for each URL, in completion order.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='batch')
+    try:
+        futures = {executor.submit(scraper.scrape, url, **options): (i, url) for i, url in enumerate(urls)}
+        for future in concurrent.futures.as_completed(futures):
+            i, url = futures[future]
+            try:
+                yield i, url, future.result(), None
+            except Exception as e:
+                yield i, url, None, e
+    finally:
+        # If the client went away, drop the pages not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _stream_batch(urls: list, options: dict, parallelism: int, fmt: str, fields=None):
+    """Yields each URL's result (or failure) as soon as it is done."""
+    failed = []
+    with _batch_scraper(options['dynamic'], parallelism) as scraper:
+        for i, url, res, error in _iter_batch(scraper, urls, options, parallelism):
+            if error is not None:
+                failed.append(url)
+                yield _encode_event(fmt, {'index': i, 'url': url, 'failed': True, 'error': str(error)})
+            else:
+                yield _encode_event(fmt, {**_select_fields(res, fields), 'index': i, 'failed': False})
+    if fmt == 'sse':
+        yield _encode_event(fmt, {'count': len(urls), 'failed': failed}, event='done')
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    data = request.json
+    urls = data.get('urls') if data else None
+    if not urls or not isinstance(urls, list):
+        return jsonify({'error': 'A list of URLs is required'}), 400
+    if len(urls) > app.config['BATCH_MAX_URLS']:
+        return jsonify({'error': f"At most {app.config['BATCH_MAX_URLS']} URLs per batch"}), 400
+
+    try:
+        for url in urls:
+            _check_url(url)
+        params = _scrape_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    options = {
+        'dynamic': params['dynamic'],
+        'svg_action': params['svg_action'],
+        'image_action': params['image_action'],
+        'strip': params['strip_tags']
+    }
+    if params['timings']:
+        options['timings'] = True
+    if params['fingerprint']:
+        options['fingerprint'] = True
+    if params['deadline']:
+        options['deadline'] = params['deadline']
+    parallelism = int(data.get('parallelism', app.config['BATCH_PARALLELISM']))
+    parallelism = min(max(parallelism, 1), app.config['BATCH_MAX_PARALLELISM'], len(urls))
+
+    # A batch fans out like a crawl, so it takes a crawl slot
+    try:
+        ticket = admission.acquire('crawl', _client_id())
+    except AdmissionRejected as e:
+        return _busy_response(e)
+
+    fmt = _stream_format(data) or 'ndjson'
+    response = Response(stream_with_context(_stream_batch(urls, options, parallelism, fmt, _request_fields(data))),
+                        mimetype=STREAM_MIMETYPES[fmt],
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(ticket.release)
+    return response
+
+def _run_job(params: dict):
+    """Job runner: scrapes a job's pages in a background worker."""
+    with _new_scraper(params['dynamic']) as scraper:
+        yield from _iter_scrape(scraper, params)
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Returns the process-wide job manager, creating it on first use."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            store = JobStore(app.config['JOB_DB_PATH'], max_jobs=app.config['JOB_MAX_JOBS'], ttl=app.config['JOB_TTL'])
+            _job_manager = JobManager(store, _run_job, max_workers=app.config['JOB_WORKERS'],
+                                      max_pending=app.config['JOB_MAX_PENDING'], retry_after=app.config['RETRY_AFTER'])
+        return _job_manager
+
+def get_job_store() -> JobStore:
+    """Returns the on-disk store holding job and scrape results."""
+    return get_job_manager().store
+
+def _store_results(params: dict, results: list) -> str:
+    """Stores already scraped results as a completed job and returns its id."""
+    store = get_job_store()
+    result_id = store.create_job(params, status=RUNNING)
+    for res in results:
+        store.add_result(result_id, res)
+    store.update_job(result_id, status=COMPLETED)
+    return result_id
+
+def _zip_response(results) -> Response:
+    """Streams a ZIP of Markdown results as it is generated."""
+    return Response(
+        stream_with_context(iter_zip(results)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=scraped_content.zip'}
+    )
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    data = request.json
+    if not data or 'url' not in data:
+        return jsonify({'error': 'URL is required'}), 400
+
+    try:
+        params = _scrape_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        job_id = get_job_manager().submit(params)
+    except JobQueueFull as e:
+        return _busy_response(e)
+    return jsonify({
+        'job_id': job_id,
+        'status': QUEUED,
+        'status_url': f"/api/jobs/{job_id}",
+        'results_url': f"/api/jobs/{job_id}/results"
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = get_job_manager().store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    store = get_job_manager().store
+    if store.get_job(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    total = store.count_results(job_id)
+    results = store.get_results(job_id, offset=offset, limit=limit)
+    next_offset = offset + len(results)
+    return jsonify({
+        'results': results,
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'next_offset': next_offset if next_offset < total else None
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    manager = get_job_manager()
+    if not manager.cancel(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(manager.store.get_job(job_id)), 202
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_job_zip(job_id):
+    store = get_job_store()
+    if store.get_job(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return _zip_response(store.iter_results(job_id))
+
 @app.route('/api/download-zip', methods=['POST'])
 def download_zip():
-    data = request.json
+    data = request.json or {}
+
+    # Preferred: results already held server-side under a result/job id
+    result_id = data.get('result_id')
+    if result_id:
+        return download_job_zip(result_id)
+
     results = data.get('results', [])
     if not results:
         return jsonify({'error': 'No results provided'}), 400
-
-    memory_file = io.BytesIO()
-    used_filenames = set()
-    with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for i, res in enumerate(results):
-            url = res.get('url', 'unknown')
-            markdown = res.get('markdown', '')
-            title = get_title_from_result(res, url)
-            filename = f"{title}.md"
-            # Ensure unique filenames in ZIP
-            if filename in used_filenames:
-                filename = f"{title}_{i}.md"
-            zf.writestr(filename, markdown)
-            used_filenames.add(filename)
-    
-    memory_file.seek(0)
-    return send_file(
-        memory_file,
-        mimetype='application/zip',
-        as_attachment=True,
-        download_name='scraped_content.zip'
-    )
+    return _zip_response(results)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     results = []
     error = None
     urls_input = ""
+    result_id = None
     
     if request.method == 'POST':
         urls_input = request.form.get('urls', '')
@@ -100,41 +597,76 @@ def index():
         only_subpaths = 'only_subpaths' in request.form
 
         target_urls = [u.strip() for u in urls_input.split('\n') if u.strip()]
+        try:
+            for url in target_urls:
+                _check_url(url)
+            deadline = _page_deadline(request.form.get('deadline'))
+        except ValueError as e:
+            return render_template('index.html', urls_input=urls_input, results=[], result_id=None,
+                                   error=str(e)), 400
+        extra = {'deadline': deadline} if deadline else {}
         
         if not target_urls:
             error = "No URLs provided."
         else:
             try:
-                with Scraper() as scraper:
-                    # If crawling, we use the Crawler for the entire set or per URL?
-                    # CLI does per URL. Let's do that.
-                    
-                    for url in target_urls:
-                        try:
-                            if crawl:
-                                iterator = Crawler([url], max_depth=depth, max_pages=max_pages, only_subpaths=only_subpaths)
+                ticket = admission.acquire(_request_kind(crawl, dynamic), _client_id())
+            except AdmissionRejected as e:
+                return render_template('index.html', urls_input=urls_input, results=[], result_id=None,
+                                       error=str(e)), 503, {'Retry-After': str(e.retry_after)}
+            batch = not crawl and len(target_urls) > 1
+            try:
+                with ticket, (_batch_scraper(dynamic, app.config['BATCH_PARALLELISM']) if batch
+                              else _new_scraper(dynamic)) as scraper:
+                    if batch:
+                        # Unrelated pages are scraped concurrently, then shown in input order
+                        options = {'dynamic': dynamic, 'svg_action': svg_action, 'image_action': image_action, 'strip': strip_tags, **extra}
+                        done = {}
+                        for i, url, res, e in _iter_batch(scraper, target_urls, options, app.config['BATCH_PARALLELISM']):
+                            if e is not None:
+                                error = f"Error scraping {url}: {e}"
                             else:
-                                iterator = zip([url], [0])
+                                done[i] = res
+                        results.extend(done[i] for i in sorted(done))
+                    else:
+                        # If crawling, we use the Crawler for the entire set or per URL?
+                        # CLI does per URL. Let's do that.
+                    
+                        for url in target_urls:
+                            try:
+                                if crawl:
+                                    iterator = Crawler([url], max_depth=depth, max_pages=max_pages, only_subpaths=only_subpaths)
+                                else:
+                                    iterator = zip([url], [0])
                                 
-                            for current_url, current_depth in iterator:
-                                res = scraper.scrape(current_url, dynamic=dynamic, svg_action=svg_action, image_action=image_action, strip=strip_tags)
-                                results.append(res)
+                                for current_url, current_depth in iterator:
+                                    res = scraper.scrape(current_url, dynamic=dynamic, svg_action=svg_action, image_action=image_action,
+                                                         strip=strip_tags, **extra)
+                                    results.append(res)
                                 
-                                if crawl and isinstance(iterator, Crawler):
-                                     # Try to get all internal links first
-                                    links = res.get('internal_links') or []
+                                    if crawl and isinstance(iterator, Crawler):
+                                         # Try to get all internal links first
+                                        links = res.get('internal_links') or []
                                     
-                                    iterator.add_links(links, current_depth)
+                                        iterator.add_links(links, current_depth)
 
-                        except Exception as e:
-                            error = f"Error scraping {url}: {e}"
-                            # We continue with other URLs if one fails
+                            except Exception as e:
+                                error = f"Error scraping {url}: {e}"
+                                # We continue with other URLs if one fails
             except Exception as e:
                 error = f"Scraper initialization error: {e}"
+
+            # Keep results server-side so the ZIP download needn't re-upload them
+            if results:
+                try:
+                    result_id = _store_results({'urls': target_urls, 'crawl': crawl}, results)
+                except Exception as e:
+                    app.logger.warning("Could not store results: %s", e)
             
     return render_template('index.html', 
                            urls_input=urls_input, 
                            results=results, 
+                           result_id=result_id,
                            error=error)
 
 if __name__ == '__main__':
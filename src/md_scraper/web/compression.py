@@ -0,0 +1,124 @@
+import zlib
+from typing import Iterable, Iterator, Optional
+
+# zstd is optional; gzip is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Only text responses are worth compressing (ZIP downloads already are)
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/event-stream', 'text/html'}
+
+# Buffered bodies smaller than this are sent as they are
+MIN_SIZE = 512
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the response encoding from an Accept-Encoding header.
+
+    zstd is preferred when the client accepts it and ``zstandard`` is installed,
+    otherwise gzip.
+
+    Args:
+        accept_encoding (str): The request's Accept-Encoding header.
+
+    Returns:
+        str: 'zstd', 'gzip' or None if neither is acceptable.
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.partition(';')
+        _, _, q = params.partition('q=')
+        try:
+            if q and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    if 'zstd' in accepted and zstandard is not None:
+        return 'zstd'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+class _Compressor:
+    """Incremental compressor that can flush after each chunk of a stream."""
+
+    def __init__(self, encoding: str):
+        if encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor().compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._obj.compress(data)
+        if flush:
+            out += self._obj.flush(self._flush_mode)
+        return out
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses a complete body."""
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+def iter_compressed(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Compresses a streamed body chunk by chunk.
+
+    Each chunk is flushed on its own, so a client decoding the stream sees every
+    result as soon as it is sent rather than when the compressor's window fills.
+    """
+    compressor = _Compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = compressor.compress(chunk, flush=True)
+            if out:
+                yield out
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compress_response(response, accept_encoding: str):
+    """
+    Compresses a Flask response in place if the client accepts it.
+
+    Buffered responses are compressed whole; streamed ones are wrapped so they
+    keep streaming.
+
+    Args:
+        response (flask.Response): The response to compress.
+        accept_encoding (str): The request's Accept-Encoding header.
+
+    Returns:
+        flask.Response: The same response.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encoding or '')
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = iter_compressed(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
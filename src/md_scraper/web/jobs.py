@@ -0,0 +1,291 @@
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import concurrent.futures
+from typing import Callable, Iterator, Optional
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+class JobQueueFull(Exception):
+    """Raised when a job cannot be queued because too many are already waiting."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    pages_failed INTEGER NOT NULL DEFAULT 0,
+    current_url TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+class JobStore:
+    """
+    SQLite-backed store for crawl jobs and their page results.
+
+    Results live on disk rather than in process memory, under the job's id,
+    so synchronous scrapes can be stored the same way and downloaded later.
+    The store is bounded: finished jobs older than ``ttl`` seconds are
+    evicted, and once more than ``max_jobs`` jobs exist the oldest finished
+    ones go first. Expired jobs are purged when jobs are created, and at most
+    every ``purge_interval`` seconds when they are read.
+
+    The store belongs to one server process: jobs still queued or running
+    when it is opened were interrupted by a restart, and are marked failed.
+    """
+
+    def __init__(self, path: str, max_jobs: int = 100, ttl: Optional[float] = None, purge_interval: float = 60.0):
+        self.path = path
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, current_url = NULL, updated = ? WHERE status IN (?, ?)',
+                (FAILED, 'Interrupted by a server restart', time.time(), QUEUED, RUNNING)
+            )
+            self._evict(conn)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per call keeps the store safe across request threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, params: dict, status: str = QUEUED) -> str:
+        """Creates a job (queued unless another status is given) and returns its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, status, params, created, updated) VALUES (?, ?, ?, ?, ?)',
+                (job_id, status, json.dumps(params), now, now)
+            )
+            self._evict(conn)
+            self._last_purge = time.monotonic()
+        return job_id
+
+    def purge_expired(self):
+        """Evicts finished jobs past their TTL."""
+        with self._lock, self._connect() as conn:
+            self._evict(conn)
+            self._last_purge = time.monotonic()
+
+    def _purge_due(self):
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self.purge_expired()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drops expired finished jobs, then the oldest finished jobs beyond ``max_jobs``."""
+        placeholders = ','.join('?' * len(FINISHED_STATES))
+        if self.ttl is not None:
+            rows = conn.execute(
+                f'SELECT id FROM jobs WHERE status IN ({placeholders}) AND updated < ?',
+                (*FINISHED_STATES, time.time() - self.ttl)
+            ).fetchall()
+            self._delete(conn, [row['id'] for row in rows])
+
+        count = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        excess = count - self.max_jobs
+        if excess <= 0:
+            return
+        rows = conn.execute(
+            f'SELECT id FROM jobs WHERE status IN ({placeholders}) ORDER BY updated LIMIT ?',
+            (*FINISHED_STATES, excess)
+        ).fetchall()
+        self._delete(conn, [row['id'] for row in rows])
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, job_ids):
+        for job_id in job_ids:
+            conn.execute('DELETE FROM results WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Returns a job's status and progress, or None if it does not exist."""
+        self._purge_due()
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'job_id': row['id'],
+            'status': row['status'],
+            'params': json.loads(row['params']),
+            'created': row['created'],
+            'updated': row['updated'],
+            'pages_done': row['pages_done'],
+            'pages_failed': row['pages_failed'],
+            'current_url': row['current_url'],
+            'error': row['error'],
+            'cancel_requested': bool(row['cancel_requested'])
+        }
+
+    def update_job(self, job_id: str, **fields):
+        """Updates status/progress columns of a job."""
+        fields['updated'] = time.time()
+        assignments = ', '.join(f'{key} = ?' for key in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flags a job for cancellation. Returns False if the job does not exist."""
+        with self._lock, self._connect() as conn:
+            updated = conn.execute('UPDATE jobs SET cancel_requested = 1, updated = ? WHERE id = ?', (time.time(), job_id)).rowcount
+        return updated > 0
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row is None or bool(row['cancel_requested'])
+
+    def add_result(self, job_id: str, result: dict, failed: bool = False):
+        """Appends a page result and advances the job's progress counters."""
+        counter = 'pages_failed' if failed else 'pages_done'
+        with self._lock, self._connect() as conn:
+            seq = conn.execute('SELECT COUNT(*) FROM results WHERE job_id = ?', (job_id,)).fetchone()[0]
+            conn.execute(
+                'INSERT INTO results (job_id, seq, url, data) VALUES (?, ?, ?, ?)',
+                (job_id, seq, result.get('url', ''), json.dumps(result))
+            )
+            conn.execute(f'UPDATE jobs SET {counter} = {counter} + 1, updated = ? WHERE id = ?', (time.time(), job_id))
+
+    def count_results(self, job_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM results WHERE job_id = ?', (job_id,)).fetchone()[0]
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 20) -> list:
+        """Returns one page of a job's results in scrape order."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT data FROM results WHERE job_id = ? ORDER BY seq LIMIT ? OFFSET ?',
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def iter_results(self, job_id: str, batch_size: int = 50) -> Iterator[dict]:
+        """Yields all of a job's results, reading them from disk a batch at a time."""
+        offset = 0
+        while True:
+            batch = self.get_results(job_id, offset=offset, limit=batch_size)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            offset += len(batch)
+
+class JobManager:
+    """
+    Runs scrape/crawl jobs on a pool of background worker threads.
+
+    ``runner(params)`` must return an iterator of page results; a page that
+    failed is a result with an ``'error'`` key, counted in ``pages_failed``.
+    A job fails only if none of its pages could be scraped. Cancellation is
+    cooperative: it is checked between pages, and the runner is closed so it
+    can release its browser.
+
+    At most ``max_pending`` jobs wait for a worker; more are refused with
+    ``JobQueueFull``.
+    """
+
+    def __init__(self, store: JobStore, runner: Callable[[dict], Iterator[dict]], max_workers: int = 2,
+                 max_pending: int = 20, retry_after: int = 5):
+        self.store = store
+        self.runner = runner
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+
+    def submit(self, params: dict) -> str:
+        """
+        Queues a job and returns its id immediately.
+
+        Raises:
+            JobQueueFull: If ``max_pending`` jobs are already waiting for a worker.
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull("Too many jobs are queued; retry later.", self.retry_after)
+            self._pending += 1
+        try:
+            job_id = self.store.create_job(params)
+            self._executor.submit(self._run, job_id, params)
+        except BaseException:
+            with self._pending_lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        return self.store.request_cancel(job_id)
+
+    def _run(self, job_id: str, params: dict):
+        with self._pending_lock:
+            self._pending -= 1
+        if self.store.is_cancel_requested(job_id):
+            self.store.update_job(job_id, status=CANCELLED)
+            return
+
+        self.store.update_job(job_id, status=RUNNING)
+        results = None
+        done, error = 0, None
+        try:
+            results = self.runner(params)
+            for result in results:
+                failed = 'error' in result
+                if failed:
+                    error = result['error']
+                else:
+                    done += 1
+                self.store.add_result(job_id, result, failed=failed)
+                self.store.update_job(job_id, current_url=result.get('url'))
+                if self.store.is_cancel_requested(job_id):
+                    self.store.update_job(job_id, status=CANCELLED, current_url=None)
+                    return
+            if error is not None and not done:
+                self.store.update_job(job_id, status=FAILED, error=error, current_url=None)
+            else:
+                self.store.update_job(job_id, status=COMPLETED, current_url=None)
+        except Exception as e:
+            self.store.update_job(job_id, status=FAILED, error=str(e), current_url=None)
+        finally:
+            if results is not None and hasattr(results, 'close'):
+                results.close()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
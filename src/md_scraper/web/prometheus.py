@@ -0,0 +1,133 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds, from a cached static page to a slow dynamic crawl step
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_labels(self.label_names, key)} {_number(value)}' for key, value in values]
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observations per label set."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # label values -> [count per bucket..., sum]
+        self._values: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(entry)) for key, entry in self._values.items())
+        lines = []
+        for key, entry in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, key)} {_number(entry[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, key)} {cumulative}')
+        return lines
+
+class Gauge(Counter):
+    """A value that is set rather than accumulated."""
+
+    kind = 'gauge'
+
+    def set(self, labels: tuple, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class ScrapeMetrics:
+    """
+    Aggregates scrape stage timings into Prometheus metrics.
+
+    Register ``collect`` with ``md_scraper.metrics.add_collector`` and serve
+    ``render()`` from a /metrics endpoint.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.pages = Counter('md_scraper_pages_total', 'Pages scraped, by outcome.', ['outcome'])
+        self.duration = Histogram('md_scraper_scrape_seconds', 'Time to scrape one page.', buckets=buckets)
+        self.stage_seconds = Histogram('md_scraper_stage_seconds', 'Time spent per scrape stage.', ['stage'], buckets)
+        self.stage_bytes = Counter('md_scraper_stage_bytes_total', 'Bytes handled per stage (fetched HTML, '
+                                   'downloaded images, Markdown written).', ['stage'])
+        self.stage_items = Counter('md_scraper_stage_items_total', 'Items handled per stage (links found, '
+                                   'images processed).', ['stage'])
+        self._metrics = [self.pages, self.duration, self.stage_seconds, self.stage_bytes, self.stage_items]
+
+    def collect(self, url: str, timings: dict, error: Optional[BaseException] = None):
+        """Collector callback: records one scrape."""
+        self.pages.inc(('error' if error is not None else 'ok',))
+        self.duration.observe((), timings['total'])
+        for stage, entry in timings['stages'].items():
+            self.stage_seconds.observe((stage,), entry['seconds'])
+            if 'bytes' in entry:
+                self.stage_bytes.inc((stage,), entry['bytes'])
+            if 'count' in entry:
+                self.stage_items.inc((stage,), entry['count'])
+
+    def render(self, extra: Iterable = ()) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Args:
+            extra (Iterable): More metrics (Counter/Gauge/Histogram) to include.
+        """
+        lines = []
+        for metric in [*self._metrics, *extra]:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
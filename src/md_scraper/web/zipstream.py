@@ -0,0 +1,62 @@
+import io
+import zipfile
+from typing import Iterable, Iterator
+from md_scraper.sinks import FilenameAllocator
+from md_scraper.utils import get_title_from_result
+
+# Markdown is fed to the compressor in slices of this size
+CHUNK_SIZE = 64 * 1024
+
+class ZipStreamBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable buffer that ``zipfile`` writes into.
+
+    Because it cannot seek, ``zipfile`` emits data descriptors instead of
+    patching local headers, which lets the archive be sent while it is being
+    generated. ``drain()`` hands back whatever has been written since the last
+    call, so only one chunk is ever held in memory.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def iter_zip(results: Iterable[dict]) -> Iterator[bytes]:
+    """
+    Generates a ZIP archive of Markdown results chunk by chunk.
+
+    Args:
+        results (Iterable[dict]): Scrape results; consumed lazily.
+
+    Yields:
+        bytes: Consecutive pieces of the archive.
+    """
+    buffer = ZipStreamBuffer()
+    names = FilenameAllocator()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for res in results:
+            url = res.get('url', 'unknown')
+            name = names.allocate(get_title_from_result(res, url))
+            data = (res.get('markdown') or '').encode('utf-8')
+            with zf.open(name, 'w', force_zip64=len(data) > zipfile.ZIP64_LIMIT) as member:
+                for start in range(0, len(data), CHUNK_SIZE):
+                    member.write(data[start:start + CHUNK_SIZE])
+                    chunk = buffer.drain()
+                    if chunk:
+                        yield chunk
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    # Central directory
+    yield buffer.drain()
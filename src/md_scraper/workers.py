@@ -0,0 +1,185 @@
+import concurrent.futures
+import multiprocessing
+import os
+from typing import Optional
+
+from md_scraper import metrics
+from md_scraper.deadline import Deadline
+from md_scraper.manifest import CrawlManifest
+from md_scraper.metrics import StageTimings
+from md_scraper.utils import local_path
+
+# The long-lived Scraper of a worker process, created by _init_worker
+_scraper = None
+
+def _init_worker(replay=None):
+    global _scraper
+    from md_scraper.scraper import Scraper
+    _scraper = Scraper(replay=replay)
+
+def _convert(url: str, html: Optional[str], options: dict) -> dict:
+    """Runs in a worker: parse, extract and convert already fetched HTML, or read a saved page first."""
+    if 'deadline' in options:
+        # Rebuilt from its expiry, so the time the page waited for a worker counts
+        options['deadline'] = Deadline.resumed(options['deadline'])
+    if html is None:
+        return _scraper.scrape(url, **options)
+    result = _scraper.scrape(url, html=html, **options)
+    # The caller still has the HTML, no need to send it back
+    result.pop('raw_html', None)
+    return result
+
+class ConversionPool:
+    """
+    Scrapes pages with fetching on the calling threads and parsing, extraction and
+    Markdown conversion in worker processes.
+
+    BeautifulSoup and markdownify hold the GIL, so threads can't convert pages in
+    parallel; processes can. Each worker keeps one Scraper for its whole life, and
+    only the page's HTML (or a saved page's path) and the result dict cross the
+    process boundary. Call ``scrape`` from several threads (e.g. through
+    ``iter_concurrent``) so fetches overlap with conversions and every worker
+    stays busy.
+
+    Supports the options of ``Scraper.scrape``. A ``manifest`` is checked before
+    a page is sent to a worker, so unchanged pages are not converted at all. With
+    a ``dedup_index`` (which lives in this process), a worker extracts and
+    fingerprints the page, the fingerprint is checked here, and only a page that
+    isn't a near-duplicate goes back to a worker to have its main content converted.
+    """
+
+    def __init__(self, workers: Optional[int] = None, scraper=None, replay=None, limiter=None):
+        """
+        Args:
+            workers (int): Number of worker processes (default: one per CPU).
+            scraper (Scraper): Optional scraper used for fetching. One is created
+                (and closed with the pool) if not given.
+            replay (WarcArchive): Optional WARC archive that pages are fetched
+                from, and that the workers read images from, instead of the network.
+                Only its index is sent to the workers.
+            limiter (RateLimiter): Optional rate limiter for the page fetches.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.scraper = scraper
+        self.replay = replay
+        self.limiter = limiter
+        self._owns_scraper = scraper is None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        if self.scraper is None:
+            from md_scraper.scraper import Scraper
+            self.scraper = Scraper(replay=self.replay, limiter=self.limiter)
+        # Spawned, not forked: the fetch threads may already be running when a worker starts
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+            initargs=(self.replay,))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._owns_scraper and self.scraper is not None:
+            self.scraper.close()
+            self.scraper = None
+
+    def scrape(self, url: str, dynamic: bool = False, **options) -> dict:
+        """
+        Fetches a page on this thread and converts it in a worker process.
+
+        Takes the same arguments and returns the same dict as ``Scraper.scrape``.
+
+        Raises:
+            ValueError: For dynamic pages (the browser can't be shared with the
+                fetch threads).
+        """
+        if dynamic:
+            raise ValueError("ConversionPool does not render dynamic pages.")
+        dedup_index = options.pop('dedup_index', None)
+        manifest = options.pop('manifest', None)
+        include_timings = options.pop('timings', False)
+        deadline = Deadline.of(options.pop('deadline', None))
+        timed = include_timings or metrics.has_collectors()
+
+        timings = StageTimings() if timed else metrics.NULL_TIMINGS
+        try:
+            result = self._scrape(url, manifest, dedup_index, timings, timed, deadline, options)
+        except Exception as e:
+            if timed:
+                metrics.emit(url, timings.as_dict(), e)
+            raise
+        if timed:
+            recorded = timings.as_dict()
+            metrics.emit(url, recorded)
+            if include_timings:
+                result['timings'] = recorded
+        return result
+
+    def _submit(self, url: str, html: Optional[str], timings, deadline: Deadline, options: dict) -> dict:
+        if deadline.expires is not None:
+            options = {**options, 'deadline': deadline.handover()}
+        result = self._executor.submit(_convert, url, html, options).result()
+        # The worker's stages (parse ... sanitize) join this process's fetch
+        for name, stage in result.pop('timings', {}).get('stages', {}).items():
+            timings.add(name, **stage)
+        return result
+
+    def _convert_page(self, url: str, html: Optional[str], dedup_index, timings, deadline: Deadline, options: dict) -> dict:
+        if dedup_index is None:
+            return self._submit(url, html, timings, deadline, options)
+        # Checked between extraction and conversion, so near-duplicates are never converted
+        result = self._submit(url, html, timings, deadline, {**options, 'fingerprint': True, 'convert': False})
+        with timings.stage('dedup'):
+            duplicate_of = dedup_index.check_fingerprint(url, result.pop('fingerprint'))
+        main_html = result.pop('main_html', None)
+        if duplicate_of is not None:
+            result['duplicate_of'] = duplicate_of
+        elif main_html is not None:
+            converted = self._submit(url, None, timings, deadline, {**options, 'main_html': main_html})
+            result['markdown'] = converted['markdown']
+            if 'timed_out' in converted:
+                result['timed_out'] = converted['timed_out']
+        return result
+
+    def _scrape(self, url: str, manifest, dedup_index, timings, timed: bool, deadline: Deadline, options: dict) -> dict:
+        if timed:
+            options['timings'] = True
+        # Saved pages are read (and MHT files decoded) by the worker, so only the path is sent
+        if manifest is None and local_path(url) is not None:
+            return self._convert_page(url, None, dedup_index, timings, deadline, options)
+
+        with timings.stage('fetch'):
+            html = self.scraper.fetch_html(url, deadline=deadline)
+        if timed:
+            timings.add('fetch', bytes=len(html.encode('utf-8')))
+            if self.scraper.fetch_status is not None:
+                timings.set('status', self.scraper.fetch_status)
+
+        content_hash = None
+        if manifest is not None:
+            content_hash = CrawlManifest.content_hash(html)
+            entry = manifest.lookup(url, content_hash)
+            if entry is not None:
+                return {
+                    'url': url,
+                    'metadata': entry.get('metadata', {}),
+                    'markdown': None,
+                    'raw_html': html,
+                    'nav_links': [],
+                    'internal_links': entry.get('internal_links', []),
+                    'content_hash': content_hash,
+                    'unchanged': True
+                }
+
+        result = self._convert_page(url, html, dedup_index, timings, deadline, options)
+        result['raw_html'] = html
+        if content_hash is not None:
+            result['content_hash'] = content_hash
+        return result
@@ -0,0 +1,179 @@
+import threading
+import time
+import pytest
+import md_scraper.web.app
+from md_scraper.web.app import app
+from md_scraper.web.admission import AdmissionController, AdmissionRejected
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+class MockScraper:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        return {'url': url, 'markdown': '# Page', 'metadata': {}, 'internal_links': []}
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("Condition not reached")
+
+def test_limits_are_per_kind():
+    controller = AdmissionController({'static': 1, 'crawl': 1}, queue_timeout=0.01)
+    ticket = controller.acquire('static')
+    # Another kind still has room
+    controller.acquire('crawl').release()
+
+    with pytest.raises(AdmissionRejected):
+        controller.acquire('static')
+    ticket.release()
+    controller.acquire('static').release()
+
+def test_full_queue_rejects_immediately():
+    controller = AdmissionController({'static': 1}, max_queue=0, queue_timeout=10, retry_after=7)
+    controller.acquire('static')
+
+    start = time.time()
+    with pytest.raises(AdmissionRejected) as exc_info:
+        controller.acquire('static')
+    assert time.time() - start < 1
+    assert exc_info.value.retry_after == 7
+    assert controller.stats()['rejected'] == 1
+
+def test_ticket_release_is_idempotent():
+    controller = AdmissionController({'static': 1})
+    ticket = controller.acquire('static')
+    ticket.release()
+    ticket.release()
+    assert controller.stats()['kinds']['static']['in_flight'] == 0
+
+def test_fair_queue_round_robin():
+    controller = AdmissionController({'crawl': 1}, max_queue=10, queue_timeout=5)
+    holder = controller.acquire('crawl', 'a')
+    order = []
+    order_lock = threading.Lock()
+
+    def worker(client):
+        ticket = controller.acquire('crawl', client)
+        with order_lock:
+            order.append(client)
+        ticket.release()
+
+    threads = []
+    # Client 'a' queues three requests before 'b' queues one
+    for client in ['a', 'a', 'a', 'b']:
+        thread = threading.Thread(target=worker, args=(client,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: controller.stats()['queued'] == len(threads))
+
+    holder.release()
+    for thread in threads:
+        thread.join()
+
+    assert order[:2] == ['a', 'b']
+    assert order.count('a') == 3
+
+def test_api_scrape_returns_503_when_busy(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    controller = AdmissionController({'static': 0, 'dynamic': 0, 'crawl': 0}, max_queue=0, retry_after=3)
+    monkeypatch.setattr(md_scraper.web.app, 'admission', controller)
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
+    assert 'error' in response.get_json()
+
+    response = client.post('/', data={'urls': 'https://example.com'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
+
+def test_api_scrape_releases_slot(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    controller = AdmissionController({'static': 1, 'dynamic': 1, 'crawl': 1}, max_queue=0)
+    monkeypatch.setattr(md_scraper.web.app, 'admission', controller)
+
+    for _ in range(3):
+        assert client.post('/api/scrape', json={'url': 'https://example.com'}).status_code == 200
+    assert controller.stats()['kinds']['static']['in_flight'] == 0
+
+@pytest.mark.parametrize('forwarded, trusted, expected', [
+    (None, 1, '127.0.0.1'),
+    ('203.0.113.7', 1, '203.0.113.7'),
+    # A client can't pick its own queue by prepending hops
+    ('1.1.1.1, 2.2.2.2, 203.0.113.7', 1, '203.0.113.7'),
+    ('1.1.1.1, 203.0.113.7, 10.0.0.2', 2, '203.0.113.7'),
+    ('10.0.0.2', 2, '127.0.0.1'),
+    ('203.0.113.7', 0, '127.0.0.1')
+])
+def test_client_id_uses_trusted_hop(monkeypatch, forwarded, trusted, expected):
+    monkeypatch.setitem(app.config, 'TRUSTED_PROXIES', trusted)
+    headers = {'X-Forwarded-For': forwarded} if forwarded else {}
+    with app.test_request_context('/', headers=headers, environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+        assert md_scraper.web.app._client_id() == expected
+
+def test_status_endpoint(client, monkeypatch):
+    controller = AdmissionController({'static': 4, 'dynamic': 1, 'crawl': 2})
+    monkeypatch.setattr(md_scraper.web.app, 'admission', controller)
+
+    data = client.get('/api/status').get_json()
+    assert data['admission']['kinds']['static'] == {'limit': 4, 'in_flight': 0, 'queued': 0, 'waiting_clients': 0}
+    assert data['admission']['max_queue'] == 16
+
+def test_total_bounds_in_flight_and_queued():
+    controller = AdmissionController({'static': 2, 'crawl': 2}, max_queue=10, queue_timeout=10, max_total=2)
+    controller.acquire('static')
+    controller.acquire('crawl')
+
+    # Each kind is under its limit, but the threads to serve them are taken
+    start = time.time()
+    with pytest.raises(AdmissionRejected):
+        controller.acquire('static')
+    assert time.time() - start < 1
+
+def test_health_answers_while_queue_is_full(client, monkeypatch):
+    release = threading.Event()
+
+    class SlowScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            release.wait(5)
+            return super().scrape(url, **kwargs)
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', SlowScraper)
+    # Three server threads, one kept free: one scrape in flight, one waiting
+    controller = AdmissionController({'static': 1, 'dynamic': 1, 'crawl': 1}, max_queue=10, queue_timeout=5, max_total=2)
+    monkeypatch.setattr(md_scraper.web.app, 'admission', controller)
+
+    def scrape():
+        with app.test_client() as other:
+            statuses.append(other.post('/api/scrape', json={'url': 'https://example.com'}).status_code)
+
+    statuses = []
+    threads = [threading.Thread(target=scrape) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: controller.stats()['queued'] == 1)
+
+    start = time.time()
+    assert client.post('/api/scrape', json={'url': 'https://example.com'}).status_code == 503
+    assert client.get('/api/health').status_code == 200
+    assert client.get('/api/status').get_json()['admission']['max_total'] == 2
+    assert time.time() - start < 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200, 200]
+
+def test_admission_leaves_reserved_threads():
+    config = md_scraper.web.app.app.config
+    assert md_scraper.web.app.admission.max_total == config['THREADS'] - config['RESERVED_THREADS']
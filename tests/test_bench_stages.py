@@ -0,0 +1,41 @@
+import importlib.util
+import os
+import shutil
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+
+def load_bench():
+    spec = importlib.util.spec_from_file_location('bench_stages', os.path.join(BENCH_DIR, 'bench_stages.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_corpus_covers_page_kinds():
+    bench = load_bench()
+    names = {os.path.basename(p) for p in bench.corpus_files()}
+    assert {'docs.html', 'blog.html', 'big_table.html', 'svg_heavy.html', 'image_heavy.html', 'saved_docs.mht'} <= names
+
+def test_run_suite_times_every_stage(tmp_path):
+    bench = load_bench()
+    for name in ('blog.html', 'saved_docs.mht'):
+        shutil.copy(os.path.join(bench.CORPUS_DIR, name), tmp_path)
+
+    results = bench.run_suite(iterations=1, corpus_dir=str(tmp_path))
+    assert set(results) == {'blog.html', 'saved_docs.mht'}
+    for stages in results.values():
+        assert list(stages) == list(bench.STAGES)
+        assert all(r['median_ms'] >= 0 and r['peak_kb'] >= 0 for r in stages.values())
+
+def test_compare_flags_regressions():
+    bench = load_bench()
+    baseline = {'a.html': {'parse': {'median_ms': 10.0, 'min_ms': 9.0, 'peak_kb': 100.0},
+                           'load': {'median_ms': 0.1, 'min_ms': 0.1, 'peak_kb': 10.0}}}
+    results = {'a.html': {'parse': {'median_ms': 20.0, 'min_ms': 19.0, 'peak_kb': 110.0},
+                          # Sub-millisecond timings are noise, memory still counts
+                          'load': {'median_ms': 0.5, 'min_ms': 0.5, 'peak_kb': 30.0}}}
+
+    assert bench.compare(results, baseline, threshold=1.5) == [
+        ('a.html', 'parse', 'median_ms', 10.0, 20.0),
+        ('a.html', 'load', 'peak_kb', 10.0, 30.0),
+    ]
+    assert bench.compare(results, {}, threshold=1.5) == []
@@ -0,0 +1,152 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+import md_scraper.web.app
+from md_scraper.web.app import app
+from md_scraper.browser_pool import BrowserPool
+from md_scraper.scraper import Scraper
+
+class FakeScraper:
+    """Stands in for a Scraper with a browser bound to the thread that launched it."""
+    instances = []
+
+    def __init__(self):
+        self._browser = None
+        self.thread = None
+        self.closed = False
+        FakeScraper.instances.append(self)
+
+    def _ensure_browser(self):
+        self.thread = threading.get_ident()
+        self._browser = MagicMock()
+        self._browser.is_connected.return_value = True
+        return self._browser
+
+    def fetch_html_dynamic(self, url):
+        assert threading.get_ident() == self.thread
+        if url == 'crash':
+            self._browser.is_connected.return_value = False
+            raise RuntimeError("browser crashed")
+        if url == 'bad':
+            raise RuntimeError("navigation failed")
+        return f"<html>{url}</html>"
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture(autouse=True)
+def reset_instances():
+    FakeScraper.instances = []
+
+def test_pool_renders_on_worker_threads():
+    with BrowserPool(size=3, scraper_factory=FakeScraper) as pool:
+        # Browsers are launched up front, before any page is asked for
+        while pool.stats()['ready'] < 3:
+            time.sleep(0.01)
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(pool.fetch(f"url{i}"))) for i in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(results) == sorted(f"<html>url{i}</html>" for i in range(12))
+        # Once per worker
+        assert len(FakeScraper.instances) == 3
+        stats = pool.stats()
+        assert stats['pages'] == 12
+        assert stats['healthy'] is True
+        assert stats['ready'] == 3
+    assert all(s.closed for s in FakeScraper.instances)
+    assert pool.stats()['healthy'] is False
+
+def test_pool_recycles_crashed_browser():
+    with BrowserPool(size=1, scraper_factory=FakeScraper) as pool:
+        with pytest.raises(RuntimeError, match="navigation failed"):
+            pool.fetch('bad')
+        assert pool.stats()['restarts'] == 0
+
+        with pytest.raises(RuntimeError, match="browser crashed"):
+            pool.fetch('crash')
+        assert pool.fetch('ok') == "<html>ok</html>"
+
+        stats = pool.stats()
+        assert stats['failures'] == 2
+        assert stats['restarts'] == 1
+        assert len(FakeScraper.instances) == 2
+        assert FakeScraper.instances[0].closed
+
+def test_pool_recycles_after_max_pages():
+    with BrowserPool(size=1, max_pages_per_browser=2, scraper_factory=FakeScraper) as pool:
+        for i in range(5):
+            pool.fetch(f"url{i}")
+        assert pool.stats()['restarts'] == 2
+
+def test_pool_closed():
+    pool = BrowserPool(size=1, scraper_factory=FakeScraper)
+    pool.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.fetch('url')
+
+def test_pool_close_fails_waiting_pages():
+    started, release = threading.Event(), threading.Event()
+
+    class SlowScraper(FakeScraper):
+        def fetch_html_dynamic(self, url):
+            started.set()
+            release.wait(5)
+            return super().fetch_html_dynamic(url)
+
+    pool = BrowserPool(size=1, scraper_factory=SlowScraper)
+    outcomes = {}
+
+    def fetch(url):
+        try:
+            outcomes[url] = pool.fetch(url, timeout=5)
+        except Exception as e:
+            outcomes[url] = e
+
+    rendering = threading.Thread(target=fetch, args=('first',))
+    rendering.start()
+    started.wait(5)
+    waiting = threading.Thread(target=fetch, args=('second',))
+    waiting.start()
+    while pool.stats()['queued'] == 0:
+        time.sleep(0.01)
+
+    closing = threading.Thread(target=pool.close)
+    closing.start()
+    waiting.join()
+    # The page waiting for a browser fails at once; the one being rendered is finished
+    assert isinstance(outcomes['second'], RuntimeError)
+    release.set()
+    rendering.join()
+    closing.join()
+    assert outcomes['first'] == "<html>first</html>"
+
+def test_scraper_uses_pool_for_dynamic():
+    pool = MagicMock()
+    pool.fetch.return_value = "<html><body><main><p>Pooled</p></main></body></html>"
+    scraper = Scraper(browser_pool=pool)
+
+    result = scraper.scrape("https://example.com", dynamic=True)
+
+    pool.fetch.assert_called_once_with("https://example.com")
+    assert "Pooled" in result['markdown']
+
+def test_web_dynamic_requests_share_pool(monkeypatch):
+    app.config['TESTING'] = True
+    pool = MagicMock()
+    pool.fetch.return_value = "<html><body><main><p>Rendered</p></main></body></html>"
+    pool.stats.return_value = {'size': 2, 'healthy': True}
+    monkeypatch.setattr(md_scraper.web.app, '_browser_pool', pool)
+
+    with app.test_client() as client:
+        for _ in range(2):
+            response = client.post('/api/scrape', json={'url': 'https://example.com', 'dynamic': True})
+            assert "Rendered" in response.get_json()['markdown']
+        assert pool.fetch.call_count == 2
+
+        health = client.get('/api/health').get_json()
+        assert health['browser_pool'] == {'size': 2, 'healthy': True}
@@ -0,0 +1,81 @@
+import os
+from click.testing import CliRunner
+from md_scraper.bulk import expand_local_inputs, is_bulk_input, is_up_to_date, mirror_name
+from md_scraper.cli import cli
+
+def make_archive(root):
+    pages = {
+        'index.html': '<html><head><title>Home</title></head><body><h1>Home</h1></body></html>',
+        'docs/intro.htm': '<html><body><h1>Intro</h1></body></html>',
+        'docs/api/client.html': '<html><body><h1>Client</h1></body></html>',
+        'saved/page.mht': ('MIME-Version: 1.0\nContent-Type: multipart/related; boundary="b"\n\n--b\n'
+                           'Content-Type: text/html; charset="utf-8"\n\n<html><body><h1>Saved</h1></body></html>\n\n--b--'),
+        'docs/notes.txt': 'not a page'
+    }
+    for name, content in pages.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+def test_expand_directory_and_glob(tmp_path):
+    make_archive(tmp_path)
+    root = str(tmp_path)
+
+    pages = expand_local_inputs(root)
+    assert [os.path.relpath(path, root) for path, _ in pages] == [
+        os.path.join('docs', 'api', 'client.html'), os.path.join('docs', 'intro.htm'), 'index.html',
+        os.path.join('saved', 'page.mht')]
+    assert {r for _, r in pages} == {root}
+
+    pattern = os.path.join(root, 'docs', '**', '*.html')
+    assert is_bulk_input(pattern) and is_bulk_input(root)
+    pages = expand_local_inputs(pattern)
+    assert [mirror_name(path, r) for path, r in pages] == ['api/client.md']
+
+def test_is_up_to_date(tmp_path):
+    source, target = tmp_path / 'a.html', tmp_path / 'a.md'
+    source.write_text('<p>a</p>')
+    assert not is_up_to_date(str(source), str(target))
+    target.write_text('a')
+    os.utime(source, (1, 1))
+    assert is_up_to_date(str(source), str(target))
+
+def test_cli_bulk_mirrors_and_skips(tmp_path):
+    archive, out = tmp_path / 'archive', tmp_path / 'out'
+    make_archive(archive)
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['scrape', str(archive), '-o', str(out), '--workers', '2'])
+    assert result.exit_code == 0, result.output
+    written = sorted(os.path.relpath(os.path.join(d, f), out) for d, _, files in os.walk(out) for f in files)
+    assert written == [os.path.join('docs', 'api', 'client.md'), os.path.join('docs', 'intro.md'), 'index.md',
+                       os.path.join('saved', 'page.md')]
+    assert '# Saved' in (out / 'saved' / 'page.md').read_text()
+    assert 'Bulk: 4 of 4 file(s) converted, 0 up to date, 0 failed' in result.output
+
+    # Only the page changed since is converted again
+    (archive / 'index.html').write_text('<html><body><h1>Home v2</h1></body></html>')
+    os.utime(archive / 'index.html', (os.path.getmtime(out / 'index.md') + 10,) * 2)
+    result = runner.invoke(cli, ['scrape', str(archive), '-o', str(out)])
+    assert result.exit_code == 0, result.output
+    assert 'Bulk: 1 of 4 file(s) converted, 3 up to date, 0 failed' in result.output
+    assert '# Home v2' in (out / 'index.md').read_text()
+
+    result = runner.invoke(cli, ['scrape', str(archive), '-o', str(out), '--force'])
+    assert 'Bulk: 4 of 4 file(s) converted, 0 up to date' in result.output
+
+def test_cli_bulk_numbers_clashing_names(tmp_path):
+    first, second, out = tmp_path / 'a', tmp_path / 'b', tmp_path / 'out'
+    for root in (first, second):
+        root.mkdir()
+    (first / 'page.html').write_text('<html><body><h1>A html</h1></body></html>')
+    (first / 'page.htm').write_text('<html><body><h1>A htm</h1></body></html>')
+    (second / 'page.html').write_text('<html><body><h1>B html</h1></body></html>')
+
+    result = CliRunner().invoke(cli, ['scrape', str(first), str(second), '-o', str(out), '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    # Nothing is overwritten: pages sharing a name are numbered
+    assert sorted(os.listdir(out)) == ['page.md', 'page_2.md', 'page_3.md']
+    assert '# A htm' in (out / 'page.md').read_text()
+    assert '# A html' in (out / 'page_2.md').read_text()
+    assert '# B html' in (out / 'page_3.md').read_text()
@@ -101,3 +101,44 @@ def test_scrape_command_svg_action_passing():
             assets_dir=None,
             base_url=url
         )
+
+def test_scrape_command_local_jobs_crawl(tmp_path):
+    """With --jobs, local pages are scraped on threads but written and deduplicated in crawl order."""
+    import threading
+    import time
+    runner = CliRunner()
+    site = {
+        'https://example.com/': ['https://example.com/a', 'https://example.com/b', 'https://example.com/c'],
+        'https://example.com/a': ['https://example.com/d'],
+        'https://example.com/b': [],
+        'https://example.com/c': [],
+        'https://example.com/d': []
+    }
+    threads = set()
+
+    def scrape(url, **options):
+        threads.add(threading.get_ident())
+        # Later pages finish first
+        time.sleep({'a': 0.06, 'b': 0.04, 'c': 0.02}.get(url[-1], 0))
+        text = 'same words on both of these duplicated pages here' if url[-1] in 'bc' else f'page {url} unique text'
+        result = {'metadata': {'title': url.rsplit('/', 1)[1] or 'home'}, 'internal_links': site[url]}
+        # Checked before converting, as the Scraper does; c waits for b's turn
+        duplicate_of = options['dedup_index'].check(url, text)
+        if duplicate_of is not None:
+            return {**result, 'markdown': None, 'duplicate_of': duplicate_of}
+        return {**result, 'markdown': text}
+
+    with patch("md_scraper.cli.Scraper") as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = scrape
+
+        result = runner.invoke(cli, ['scrape', 'https://example.com/', '--crawl', '--jobs', '3', '--dedup',
+                                     '--format', 'jsonl', '-o', str(tmp_path / 'pages.jsonl')])
+
+    assert result.exit_code == 0, result.output
+    import json
+    written = [json.loads(line)['url'] for line in (tmp_path / 'pages.jsonl').read_text().splitlines()]
+    assert written == ['https://example.com/', 'https://example.com/a', 'https://example.com/b', 'https://example.com/d']
+    assert 'near-duplicate of https://example.com/b' in result.output
+    assert len(threads) > 1
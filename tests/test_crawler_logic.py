@@ -130,3 +130,26 @@ def test_crawler_subpath_filtering():
     assert len(crawler.queue) == 1
     url, _ = next(crawler)
     assert url == "https://example.com/docs/page1"
+
+def test_crawler_shared_between_threads():
+    """Threads taking URLs and adding overlapping links get every URL exactly once."""
+    import threading
+    crawler = Crawler(["https://example.com/"], max_depth=2, max_pages=1000)
+    links = [f"https://example.com/{i}" for i in range(200)]
+    seen = []
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        crawler.add_links(links, 0)
+        for url, _ in iter(lambda: next(crawler, None), None):
+            seen.append(url)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(seen) == sorted(["https://example.com/"] + links)
+    assert crawler.crawled_count == 201
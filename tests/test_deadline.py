@@ -0,0 +1,217 @@
+import threading
+import time
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from md_scraper.browser_pool import BrowserPool
+from md_scraper.cli import cli
+from md_scraper.deadline import Deadline, DeadlineExceeded
+from md_scraper.scraper import Scraper
+from md_scraper.web.app import app as flask_app
+
+PAGE = ('<html><body><main><h1>Gallery</h1><img src="https://img.example.com/a.png" alt="a">'
+        '<p>Caption</p></main></body></html>')
+
+class CountdownDeadline(Deadline):
+    """Expires after a number of checks instead of seconds, for deterministic tests."""
+
+    def __init__(self, checks: int):
+        super().__init__(60)
+        self.checks = checks
+
+    @property
+    def expired(self):
+        self.checks -= 1
+        return self.checks < 0
+
+class SpentOnImages(Deadline):
+    """A page deadline whose image downloads have run out of time, while conversion still has plenty."""
+
+    def __init__(self):
+        super().__init__(60)
+
+    def leaving(self, share):
+        early = super().leaving(share)
+        early.expires = 0.0
+        return early
+
+def slow_get(url, timeout=None, **kwargs):
+    """requests.get serving PAGE at once and stalling on images until the timeout."""
+    if url.endswith('/robots.txt'):
+        return MagicMock(status_code=404)
+    if url.startswith('https://img.example.com/'):
+        time.sleep(timeout)
+        raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={timeout})")
+    return MagicMock(status_code=200, text=PAGE)
+
+def test_deadline():
+    unlimited = Deadline()
+    assert unlimited.remaining() is None and not unlimited.expired
+    assert unlimited.timeout(10) == 10
+
+    deadline = Deadline(0.05)
+    assert deadline.timeout(10) <= 0.05
+    assert deadline.timeout(0.01) == 0.01
+    time.sleep(0.06)
+    assert deadline.expired and deadline.remaining() == 0
+    with pytest.raises(DeadlineExceeded, match='0.05s exceeded during render'):
+        deadline.timeout(10, 'render')
+    deadline.cut_short('images')
+    deadline.cut_short('images')
+    assert deadline.timed_out == ['images']
+    assert Deadline.of(deadline) is deadline and Deadline.of(3).seconds == 3
+
+    # An earlier stage's share, recording into the same page
+    page = Deadline(1)
+    downloads = page.leaving(0.1)
+    assert 0.85 < downloads.remaining() <= 0.9 < page.remaining()
+    downloads.cut_short('images')
+    assert page.timed_out == ['images']
+
+    # Handed over to another process, keeping the expiry rather than the time left
+    handover = Deadline(1).handover()
+    time.sleep(0.05)
+    resumed = Deadline.resumed(handover)
+    assert resumed.seconds == 1 and resumed.remaining() <= 0.95
+    assert Deadline.resumed(Deadline().handover()).remaining() is None
+
+def test_fetch_times_out():
+    def stalled(url, timeout, **kwargs):
+        time.sleep(timeout)
+        raise requests.exceptions.ReadTimeout('Read timed out.')
+
+    session = MagicMock()
+    session.get.side_effect = stalled
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded, match='during fetch'):
+        Scraper(session=session).scrape('https://example.com/', deadline=0.1)
+    assert time.monotonic() - start < 0.5
+    assert session.get.call_args.kwargs['timeout'] <= 0.1
+
+def test_trickled_body_is_cut_at_deadline():
+    # Each chunk arrives within the read timeout, but the body takes longer than the page may
+    response = MagicMock(status_code=200)
+    response.iter_content.return_value = iter([b'<p>slow</p>'] * 10)
+    session = MagicMock()
+    session.get.return_value = response
+    with pytest.raises(DeadlineExceeded, match='during fetch'):
+        Scraper(session=session).scrape('https://example.com/', deadline=CountdownDeadline(3))
+    assert session.get.call_args.kwargs['stream'] is True
+    response.close.assert_called_once()
+
+    response.iter_content.return_value = iter([b'<p>fast', b'</p>'])
+    response.text = '<p>fast</p>'
+    assert 'fast' in Scraper(session=session).scrape('https://example.com/', deadline=CountdownDeadline(3))['markdown']
+    assert response._content == b'<p>fast</p>'
+
+def test_images_keep_remote_urls_past_deadline():
+    with patch('md_scraper.scraper.requests.get', side_effect=slow_get) as get:
+        result = Scraper().scrape('https://example.com/', image_action='base64', deadline=SpentOnImages())
+    assert [call.args[0] for call in get.call_args_list] == ['https://example.com/']
+    assert '![a](https://img.example.com/a.png)' in result['markdown']
+    assert 'Caption' in result['markdown']
+    assert result['timed_out'] == ['images']
+
+def test_conversion_keeps_what_was_converted():
+    html = '<main><h1>Title</h1>' + ''.join(f'<p>Paragraph {i}</p>' for i in range(50)) + '</main>'
+    result = Scraper().scrape('https://example.com/', html=html, deadline=CountdownDeadline(20))
+    assert result['markdown'].startswith('# Title')
+    assert 'Paragraph 49' not in result['markdown']
+    assert result['timed_out'] == ['convert']
+
+    # Expired before conversion started: the page still gets its first text
+    result = Scraper().scrape('https://example.com/', html=html, deadline=CountdownDeadline(0))
+    assert result['markdown'].strip() == '# Title'
+    assert result['timed_out'] == ['convert']
+
+    # Without a deadline nothing is cut
+    result = Scraper().scrape('https://example.com/', html=html)
+    assert 'Paragraph 49' in result['markdown'] and 'timed_out' not in result
+
+def test_render_keeps_partly_loaded_page():
+    scraper = Scraper()
+    with patch('md_scraper.scraper.sync_playwright') as sync_playwright, \
+            patch('md_scraper.scraper._playwright_timeout_error', return_value=TimeoutError):
+        page = sync_playwright.return_value.start.return_value.chromium.launch.return_value.new_page.return_value
+        page.goto.side_effect = TimeoutError('networkidle not reached')
+        page.content.return_value = '<html><body>Loaded so far</body></html>'
+
+        page.url = 'https://example.com/slow'
+        deadline = Deadline(5)
+        assert scraper.fetch_html_dynamic('https://example.com/slow', deadline=deadline) == page.content.return_value
+        assert deadline.timed_out == ['render']
+        assert 0 < page.goto.call_args.kwargs['timeout'] <= 5000
+
+        # Nothing loaded at all: the page fails
+        page.url = 'about:blank'
+        with pytest.raises(DeadlineExceeded, match='during render'):
+            scraper.fetch_html_dynamic('https://example.com/slow', deadline=Deadline(5))
+
+def test_pool_drops_pages_past_their_deadline():
+    rendered = []
+
+    class SlowScraper:
+        _browser = None
+
+        def _ensure_browser(self):
+            pass
+
+        def fetch_html_dynamic(self, url, deadline=None):
+            rendered.append(url)
+            time.sleep(0.3)
+            return f"<html>{url}</html>"
+
+        def close(self):
+            pass
+
+    with patch('md_scraper.browser_pool.CAPTURE_GRACE', 0.0), BrowserPool(size=1, scraper_factory=SlowScraper) as pool:
+        busy = threading.Thread(target=pool.fetch, args=('first',))
+        busy.start()
+        time.sleep(0.05)
+        with pytest.raises(DeadlineExceeded):
+            pool.fetch('second', deadline=Deadline(0.05))
+        busy.join()
+    assert rendered == ['first']
+
+def test_cli_deadline():
+    # Half of the budget is left to conversion, far more than the page needs
+    with patch('md_scraper.scraper.requests.get', side_effect=slow_get), patch('md_scraper.scraper.CONVERT_RESERVE', 0.5):
+        result = CliRunner().invoke(cli, ['scrape', 'https://example.com/', '--image-action', 'base64', '--deadline', '0.2'])
+    assert result.exit_code == 0, result.output
+    assert '![a](https://img.example.com/a.png)' in result.output
+    assert 'Deadline exceeded, cut short: images' in result.output
+
+@pytest.mark.parametrize('asked, expected', [(None, 60.0), (5, 5.0), (1000, 300.0), ('2.5', 2.5)])
+def test_api_deadline(asked, expected):
+    flask_app.config['TESTING'] = True
+    data = {'url': 'https://example.com'}
+    if asked is not None:
+        data['deadline'] = asked
+    with patch('md_scraper.web.app.Scraper.scrape', return_value={'url': 'https://example.com', 'markdown': ''}) as scrape, \
+            flask_app.test_client() as client:
+        response = client.post('/api/scrape', json=data)
+    assert response.status_code == 200
+    assert scrape.call_args.kwargs['deadline'] == expected
+
+@pytest.mark.parametrize('endpoint, data', [
+    ('/api/scrape', {'url': 'https://example.com'}),
+    ('/api/batch', {'urls': ['https://example.com']}),
+    ('/api/jobs', {'url': 'https://example.com'})
+])
+@pytest.mark.parametrize('asked', ['abc', 0, -5, [1], True])
+def test_api_rejects_bad_deadline(endpoint, data, asked):
+    flask_app.config['TESTING'] = True
+    with patch('md_scraper.web.app.Scraper.scrape') as scrape, flask_app.test_client() as client:
+        response = client.post(endpoint, json={**data, 'deadline': asked})
+    assert response.status_code == 400
+    assert 'Deadline must be a positive number' in response.get_json()['error']
+    scrape.assert_not_called()
+
+def test_index_rejects_bad_deadline():
+    flask_app.config['TESTING'] = True
+    with patch('md_scraper.web.app.Scraper.scrape') as scrape, flask_app.test_client() as client:
+        response = client.post('/', data={'urls': 'https://example.com', 'deadline': 'abc'})
+    assert response.status_code == 400
+    assert b'Deadline must be a positive number' in response.data
+    scrape.assert_not_called()
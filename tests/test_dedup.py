@@ -0,0 +1,160 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from md_scraper.dedup import simhash, hamming_distance, NearDuplicateIndex, OrderedChecks
+from md_scraper.scraper import Scraper
+from md_scraper.cli import check_remote_result, cli
+from md_scraper.web.app import app as flask_app
+
+ARTICLE = " ".join(
+    f"Paragraph {i} explains how the scraper turns complex documentation pages into clean markdown output."
+    for i in range(40)
+)
+
+def test_simhash_near_duplicates_are_close():
+    a = simhash(ARTICLE)
+    b = simhash(ARTICLE + " Printed on Tuesday.")
+    c = simhash("An entirely different text about gardening, tomatoes and the summer weather in the hills. " * 5)
+
+    assert hamming_distance(a, b) <= 3
+    assert hamming_distance(a, c) > 10
+
+def test_simhash_short_text():
+    assert simhash("too short") is None
+
+def test_index_find_and_clusters():
+    index = NearDuplicateIndex(threshold=3)
+
+    assert index.check("https://example.com/a", ARTICLE) is None
+    assert index.check("https://example.com/a?print=1", ARTICLE + " Print view.") == "https://example.com/a"
+    assert index.check("https://example.com/b", "Completely unrelated content about astronomy and distant galaxies far away.") is None
+
+    assert len(index) == 2
+    assert index.clusters() == {"https://example.com/a": ["https://example.com/a?print=1"]}
+
+    report = index.report()
+    assert report['pages_checked'] == 3
+    assert report['unique_pages'] == 2
+    assert report['duplicate_pages'] == 1
+
+def test_index_invalid_threshold():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=64)
+
+def test_scrape_skips_conversion_for_duplicates():
+    scraper = Scraper()
+    index = NearDuplicateIndex()
+    html = f"<html><body><main><p>{ARTICLE}</p></main></body></html>"
+
+    with patch.object(Scraper, 'fetch_html', return_value=html):
+        first = scraper.scrape("https://example.com/a", dedup_index=index)
+        with patch.object(Scraper, 'to_markdown') as mock_to_markdown:
+            second = scraper.scrape("https://example.com/b", dedup_index=index)
+            mock_to_markdown.assert_not_called()
+
+    assert 'duplicate_of' not in first
+    assert "Paragraph 0" in first['markdown']
+    assert second['duplicate_of'] == "https://example.com/a"
+    assert second['markdown'] is None
+
+def test_cli_dedup_crawl(tmp_path):
+    runner = CliRunner()
+    results = {
+        "https://example.com": {'markdown': ARTICLE, 'metadata': {'title': 'Home'}, 'internal_links': ["https://example.com/print"]},
+        "https://example.com/print": {'markdown': None, 'metadata': {'title': 'Print'}, 'internal_links': ["https://example.com/deep"],
+                                      'duplicate_of': "https://example.com"},
+    }
+
+    with patch("md_scraper.cli.Scraper") as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = lambda url, **kwargs: results[url]
+
+        out_dir = tmp_path / "out"
+        report_path = tmp_path / "dups.json"
+        result = runner.invoke(cli, ['scrape', "https://example.com", '--crawl', '--dedup', '--skip-duplicate-links',
+                                     '--dedup-report', str(report_path), '-o', str(out_dir)])
+
+        assert result.exit_code == 0
+        # The duplicate's links were not followed
+        assert mock_scraper_instance.scrape.call_count == 2
+        assert 'dedup_index' in mock_scraper_instance.scrape.call_args.kwargs
+        assert sorted(p.name for p in out_dir.iterdir()) == ["Home.md"]
+        assert "near-duplicate of https://example.com" in result.output
+        assert json.loads(report_path.read_text())['unique_pages'] == 0
+
+def test_cli_dedup_report_alone_keeps_duplicates(tmp_path):
+    runner = CliRunner()
+    pages = {
+        "https://example.com/a": f"<html><head><title>A</title></head><body><main><p>{ARTICLE}</p></main></body></html>",
+        "https://example.com/b": f"<html><head><title>B</title></head><body><main><p>{ARTICLE}</p></main></body></html>",
+    }
+
+    with patch.object(Scraper, 'fetch_html', side_effect=lambda url, **kwargs: pages[url]):
+        out_dir = tmp_path / "out"
+        report_path = tmp_path / "dups.json"
+        result = runner.invoke(cli, ['scrape', "https://example.com/a", "https://example.com/b",
+                                     '--dedup-report', str(report_path), '-o', str(out_dir)])
+
+    assert result.exit_code == 0, result.output
+    # Both pages are converted and saved; the duplicate is only reported
+    assert sorted(p.name for p in out_dir.iterdir()) == ["A.md", "B.md"]
+    assert "Skipped" not in result.output
+    report = json.loads(report_path.read_text())
+    assert report['clusters'] == [{'canonical': "https://example.com/a", 'duplicates': ["https://example.com/b"]}]
+
+def test_ordered_checks_take_turns():
+    checks = OrderedChecks(NearDuplicateIndex())
+
+    def scrape(url):
+        # The later page is ready first, but waits for its turn
+        time.sleep(0.1 if url.endswith('a') else 0)
+        return checks.check(url, ARTICLE)
+
+    pages = [("https://example.com/a", 0), ("https://example.com/b", 0)]
+    results = [result for _, _, result, _ in checks.iter_concurrent(iter(pages), scrape, 2)]
+    assert results == [None, "https://example.com/a"]
+
+def test_ordered_checks_skip_failed_pages():
+    checks = OrderedChecks(NearDuplicateIndex(), report_only=True)
+
+    def scrape(url):
+        if url.endswith('a'):
+            raise OSError("unreachable")
+        return checks.check(url, ARTICLE)
+
+    pages = [("https://example.com/a", 0), ("https://example.com/b", 0), ("https://example.com/c", 0)]
+    results = list(checks.iter_concurrent(iter(pages), scrape, 3))
+    assert isinstance(results[0][3], OSError)
+    # Only reported: the checks don't flag duplicates
+    assert [result for _, _, result, _ in results[1:]] == [None, None]
+    assert checks.index.clusters() == {"https://example.com/b": ["https://example.com/c"]}
+
+def test_cli_dedup_jobs_checks_before_converting(tmp_path):
+    html = f"<html><head><title>Page</title></head><body><main><p>{ARTICLE}</p></main></body></html>"
+    urls = [f"https://example.com/{name}" for name in 'abc']
+    with patch.object(Scraper, 'fetch_html', return_value=html), \
+            patch.object(Scraper, 'to_markdown', autospec=True, side_effect=Scraper.to_markdown) as to_markdown:
+        result = CliRunner().invoke(cli, ['scrape', *urls, '--jobs', '3', '--dedup', '-o', str(tmp_path / 'out')])
+
+    assert result.exit_code == 0, result.output
+    # The same pre-conversion text is fingerprinted as without --jobs, and duplicates aren't converted
+    assert to_markdown.call_count == 1
+    assert result.output.count("near-duplicate of https://example.com/a") == 2
+
+def test_remote_results_are_checked_by_fingerprint():
+    index = NearDuplicateIndex()
+    check_remote_result("https://example.com/a", {'markdown': '# A', 'fingerprint': simhash(ARTICLE)}, dedup_index=index)
+    result = check_remote_result("https://example.com/b", {'markdown': '# B', 'fingerprint': simhash(ARTICLE)}, dedup_index=index)
+    assert result['duplicate_of'] == "https://example.com/a"
+    assert 'fingerprint' not in result
+
+def test_api_fingerprints_main_content():
+    flask_app.config['TESTING'] = True
+    html = f"<html><body><nav>Home About</nav><main><p>{ARTICLE}</p></main></body></html>"
+    with patch.object(Scraper, 'fetch_html', return_value=html), flask_app.test_client() as client:
+        response = client.post('/api/scrape', json={'url': "https://example.com/a", 'fingerprint': True,
+                                                    'fields': ['markdown', 'fingerprint']})
+    assert response.get_json()['fingerprint'] == simhash(ARTICLE)
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# Modules that must not be loaded just by importing the entry points
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'lxml', 'markdownify', 'playwright', 'md_scraper.scraper')
+
+# Import cost of md_scraper.cli itself (excluding click), in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get('MD_SCRAPER_IMPORT_BUDGET_MS', 100))
+
+def importtime(code):
+    """Runs code under `python -X importtime` and returns {module: cumulative microseconds}."""
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, env=env, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+@pytest.mark.parametrize('module', ['md_scraper.cli', 'md_scraper.web.app'])
+def test_entry_points_defer_heavy_imports(module):
+    times = importtime(f'import {module}')
+    assert module in times
+    loaded = [name for name in HEAVY_MODULES if name in times]
+    assert loaded == [], f"{module} imports {loaded} at startup"
+
+def test_scraper_defers_playwright():
+    times = importtime('import md_scraper.scraper')
+    assert 'bs4' in times
+    assert 'playwright' not in times
+
+def test_cli_import_budget():
+    # Best of three runs, to keep scheduling noise out
+    own = min(
+        (times['md_scraper.cli'] - times.get('click', 0)) / 1000
+        for times in (importtime('import md_scraper.cli') for _ in range(3))
+    )
+    assert own < IMPORT_BUDGET_MS, f"md_scraper.cli takes {own:.1f}ms to import (budget {IMPORT_BUDGET_MS}ms)"
+
+def test_lazy_scraper_attribute():
+    import md_scraper.cli
+    from md_scraper.scraper import Scraper
+    assert md_scraper.cli.Scraper is Scraper
+    with pytest.raises(AttributeError):
+        md_scraper.cli.DoesNotExist
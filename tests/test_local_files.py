@@ -37,3 +37,48 @@ def test_scrape_local_file_not_found():
     scraper = Scraper()
     with pytest.raises(OSError): # open() raises OSError/FileNotFoundError
         scraper.scrape("non_existent_file.html")
+
+@pytest.fixture
+def local_mirror(tmp_path):
+    pages = {
+        'index.html': '<nav><a href="/docs/">Docs</a><a href="https://example.com/">Web</a></nav>'
+                      '<a href="about.html#team">About</a><a href="missing.html">Gone</a><a href="style.css">CSS</a>',
+        'about.html': '<a href="index.html">Home</a><a href="docs/guide%20one.html">Guide</a>',
+        'docs/index.html': '<a href="../about.html">About</a><a href="guide%20one.html">Guide</a>',
+        'docs/guide one.html': '<h1>Guide</h1><a href="/">Home</a>',
+        'style.css': 'body {}'
+    }
+    for name, content in pages.items():
+        path = tmp_path / 'site' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'<html><body>{content}</body></html>' if name.endswith('.html') else content)
+    return (tmp_path / 'site').resolve()
+
+def test_local_links_resolve_on_disk(local_mirror):
+    scraper = Scraper()
+    home = str(local_mirror / 'index.html')
+    html = scraper.fetch_html(home)
+
+    # Only existing saved pages, as file:// URLs; directories map to their index.html
+    assert scraper.extract_links(html, home, site_root=str(local_mirror)) == [
+        (local_mirror / 'docs' / 'index.html').as_uri(), (local_mirror / 'about.html').as_uri()]
+    assert scraper.extract_nav_links(html, home, site_root=str(local_mirror)) == [(local_mirror / 'docs' / 'index.html').as_uri()]
+    # Without a site root, "/docs/" points at the filesystem root
+    assert scraper.extract_links(html, home) == [(local_mirror / 'about.html').as_uri()]
+
+def test_fetch_file_url(local_mirror):
+    scraper = Scraper()
+    assert 'Guide' in scraper.fetch_html((local_mirror / 'docs' / 'guide one.html').as_uri())
+    # A directory URL reads its index.html
+    assert 'about.html' in scraper.fetch_html((local_mirror / 'docs').as_uri())
+
+def test_cli_crawls_local_mirror(local_mirror, tmp_path):
+    import json
+    from click.testing import CliRunner
+    from md_scraper.cli import cli
+    output = tmp_path / 'pages.jsonl'
+    result = CliRunner().invoke(cli, ['scrape', str(local_mirror / 'index.html'), '--crawl', '--format', 'jsonl', '-o', str(output)])
+    assert result.exit_code == 0, result.output
+
+    urls = [json.loads(line)['url'] for line in output.read_text().splitlines()]
+    assert urls == [(local_mirror / name).as_uri() for name in ('index.html', 'docs/index.html', 'about.html', 'docs/guide one.html')]
@@ -0,0 +1,84 @@
+import json
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from md_scraper.manifest import CrawlManifest, MANIFEST_FILENAME
+from md_scraper.scraper import Scraper
+from md_scraper.cli import cli
+
+PAGES = {
+    "https://example.com/docs": "<html><head><title>Docs</title></head><body><main><p>Index</p>"
+                                "<a href='/docs/a'>A</a></main></body></html>",
+    "https://example.com/docs/a": "<html><head><title>Page A</title></head><body><main><p>Alpha</p></main></body></html>",
+}
+
+def test_manifest_roundtrip(tmp_path):
+    (tmp_path / "page.md").write_text("# Page")
+    manifest = CrawlManifest.for_directory(str(tmp_path))
+    content_hash = CrawlManifest.content_hash("<html>v1</html>")
+
+    assert manifest.lookup("https://example.com", content_hash) is None
+    assert manifest.record("https://example.com", content_hash, "page.md", ["https://example.com/a"], {'title': 'Page'}) == 'new'
+    manifest.save()
+
+    reloaded = CrawlManifest.for_directory(str(tmp_path))
+    entry = reloaded.lookup("https://example.com", content_hash)
+    assert entry['internal_links'] == ["https://example.com/a"]
+    assert reloaded.lookup("https://example.com", CrawlManifest.content_hash("<html>v2</html>")) is None
+    assert reloaded.record("https://example.com", "other", "page.md") == 'changed'
+    assert reloaded.pages["https://example.com"]['first_seen'] == entry['first_seen']
+
+def test_manifest_lookup_missing_output(tmp_path):
+    manifest = CrawlManifest.for_directory(str(tmp_path))
+    manifest.record("https://example.com", "abc", "gone.md")
+    assert manifest.lookup("https://example.com", "abc") is None
+
+def test_scrape_unchanged_skips_parsing(tmp_path):
+    scraper = Scraper()
+    manifest = CrawlManifest.for_directory(str(tmp_path))
+    html = PAGES["https://example.com/docs/a"]
+    manifest.record("https://example.com/docs/a", CrawlManifest.content_hash(html), None, ["https://example.com/x"], {'title': 'Page A'})
+
+    with patch.object(Scraper, 'fetch_html', return_value=html):
+        with patch.object(Scraper, 'to_markdown') as mock_to_markdown:
+            result = scraper.scrape("https://example.com/docs/a", manifest=manifest)
+            mock_to_markdown.assert_not_called()
+
+    assert result['unchanged'] is True
+    assert result['internal_links'] == ["https://example.com/x"]
+
+def test_cli_incremental_recrawl(tmp_path):
+    runner = CliRunner()
+    out_dir = tmp_path / "out"
+    pages = dict(PAGES)
+    args = ['scrape', "https://example.com/docs", '--crawl', '--incremental', '-o', str(out_dir)]
+
+    with patch.object(Scraper, 'fetch_html', side_effect=lambda url, **kwargs: pages[url]):
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        assert (out_dir / "Page_A.md").exists()
+        manifest = json.loads((out_dir / MANIFEST_FILENAME).read_text())
+        assert sorted(manifest['last_run']['new']) == sorted(PAGES)
+
+        # Second run: nothing changed, nothing converted, links still followed
+        with patch.object(Scraper, 'to_markdown') as mock_to_markdown:
+            result = runner.invoke(cli, args)
+            mock_to_markdown.assert_not_called()
+        assert result.exit_code == 0
+        manifest = json.loads((out_dir / MANIFEST_FILENAME).read_text())
+        assert sorted(manifest['last_run']['unchanged']) == sorted(PAGES)
+
+        # Third run: one page changed
+        pages["https://example.com/docs/a"] = pages["https://example.com/docs/a"].replace("Alpha", "Beta")
+        result = runner.invoke(cli, args)
+        assert result.exit_code == 0
+        manifest = json.loads((out_dir / MANIFEST_FILENAME).read_text())
+        assert manifest['last_run']['changed'] == ["https://example.com/docs/a"]
+        assert manifest['last_run']['unchanged'] == ["https://example.com/docs"]
+        assert "Beta" in (out_dir / "Page_A.md").read_text()
+
+def test_cli_incremental_requires_directory():
+    runner = CliRunner()
+    result = runner.invoke(cli, ['scrape', "https://example.com", '--incremental'])
+    assert result.exit_code != 0
+    assert "--incremental requires" in result.output
@@ -0,0 +1,129 @@
+import os
+import pytest
+import requests
+import md_scraper.web.app
+from md_scraper import metrics
+from md_scraper.metrics import NULL_TIMINGS, StageTimings
+from md_scraper.scraper import Scraper
+from md_scraper.web.app import app
+from md_scraper.web.prometheus import Histogram, ScrapeMetrics
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'samples', 'blog_post.html')
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def collected():
+    events = []
+    collector = lambda url, timings, error: events.append((url, timings, error))
+    metrics.add_collector(collector)
+    yield events
+    metrics.remove_collector(collector)
+
+def test_stage_timings_accumulate():
+    timings = StageTimings()
+    with timings.stage('fetch'):
+        pass
+    timings.add('fetch', bytes=100)
+    timings.add('images', count=2, bytes=50)
+    timings.add('images', count=1)
+
+    data = timings.as_dict()
+    assert list(data['stages']) == ['fetch', 'images']
+    assert data['stages']['fetch']['bytes'] == 100
+    assert data['stages']['images'] == {'seconds': 0.0, 'bytes': 50, 'count': 3}
+    assert data['total'] >= data['stages']['fetch']['seconds']
+
+def test_null_timings_do_nothing():
+    assert not NULL_TIMINGS.enabled
+    with NULL_TIMINGS.stage('parse'):
+        NULL_TIMINGS.add('parse', bytes=10)
+
+def test_scrape_includes_timings_on_request():
+    with Scraper() as scraper:
+        assert 'timings' not in scraper.scrape(SAMPLE)
+        result = scraper.scrape(SAMPLE, timings=True)
+
+    stages = result['timings']['stages']
+    assert list(stages)[:5] == ['fetch', 'parse', 'metadata', 'links', 'extract']
+    assert {'svg', 'convert', 'sanitize'} <= set(stages)
+    assert stages['fetch']['bytes'] == len(result['raw_html'].encode('utf-8'))
+    assert stages['convert']['bytes'] == len(result['markdown'].encode('utf-8'))
+    assert stages['links']['count'] == len(result['internal_links'])
+
+def test_collectors_see_every_scrape(collected, tmp_path):
+    with Scraper() as scraper:
+        result = scraper.scrape(SAMPLE)
+        with pytest.raises(requests.exceptions.RequestException):
+            scraper.scrape(str(tmp_path / 'missing.html'))
+
+    # Collectors don't add timings to the result unless asked
+    assert 'timings' not in result
+    assert [(url, error is None) for url, _, error in collected] == [(SAMPLE, True), (str(tmp_path / 'missing.html'), False)]
+    assert 'convert' in collected[0][1]['stages']
+
+def test_failing_collector_is_ignored():
+    def broken(url, timings, error):
+        raise RuntimeError("collector bug")
+
+    metrics.add_collector(broken)
+    try:
+        with Scraper() as scraper:
+            assert scraper.scrape(SAMPLE)['markdown']
+    finally:
+        metrics.remove_collector(broken)
+
+def test_histogram_exposition():
+    histogram = Histogram('stage_seconds', 'Stage time.', ['stage'], buckets=(0.1, 1.0))
+    histogram.observe(('parse',), 0.05)
+    histogram.observe(('parse',), 0.5)
+    histogram.observe(('parse',), 5)
+
+    assert histogram.samples() == [
+        'stage_seconds_bucket{stage="parse",le="0.1"} 1',
+        'stage_seconds_bucket{stage="parse",le="1.0"} 2',
+        'stage_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'stage_seconds_sum{stage="parse"} 5.55',
+        'stage_seconds_count{stage="parse"} 3',
+    ]
+
+def test_scrape_metrics_aggregate():
+    registry = ScrapeMetrics()
+    registry.collect('a', {'total': 0.2, 'stages': {'fetch': {'seconds': 0.1, 'bytes': 1000}, 'links': {'seconds': 0.01, 'count': 7}}})
+    registry.collect('b', {'total': 0.1, 'stages': {'fetch': {'seconds': 0.1}}}, RuntimeError("boom"))
+
+    text = registry.render()
+    assert '# TYPE md_scraper_stage_seconds histogram' in text
+    assert 'md_scraper_stage_seconds_count{stage="fetch"} 2' in text
+    assert 'md_scraper_stage_bytes_total{stage="fetch"} 1000' in text
+    assert 'md_scraper_stage_items_total{stage="links"} 7' in text
+    assert 'md_scraper_pages_total{outcome="error"} 1' in text
+    assert 'md_scraper_pages_total{outcome="ok"} 1' in text
+
+def test_metrics_endpoint(client, monkeypatch):
+    registry = ScrapeMetrics()
+    monkeypatch.setattr(md_scraper.web.app, 'scrape_metrics', registry)
+    # The API only takes http(s) URLs, so the page is served from the sample file
+    scrape = Scraper.scrape
+    monkeypatch.setattr(Scraper, 'scrape', lambda self, url, **options: scrape(self, SAMPLE, **options))
+    metrics.add_collector(registry.collect)
+    try:
+        result = client.post('/api/scrape', json={'url': 'https://example.com/post', 'timings': True}).get_json()
+    finally:
+        metrics.remove_collector(registry.collect)
+    assert 'parse' in result['timings']['stages']
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'md_scraper_stage_seconds_count{stage="parse"} 1' in text
+    assert 'md_scraper_admission_in_flight{kind="static"} 0' in text
+
+def test_metrics_endpoint_disabled(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_ENABLED', False)
+    assert client.get('/metrics').status_code == 404
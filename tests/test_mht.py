@@ -0,0 +1,89 @@
+import base64
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from md_scraper.mht import MhtArchive
+from md_scraper.scraper import Scraper
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+GIF = b'GIF89a' + bytes(64)
+
+def write_archive(path, html):
+    encoded = base64.encodebytes(PNG).decode('ascii')
+    content = (
+        'From: <Saved by Blink>\r\n'
+        'MIME-Version: 1.0\r\n'
+        'Content-Type: multipart/related; type="text/html"; boundary="----=_Part"\r\n\r\n'
+        '------=_Part\r\n'
+        'Content-Type: multipart/alternative; boundary="alt"\r\n\r\n'
+        '--alt\r\n'
+        'Content-Type: text/html; charset="iso-8859-1"\r\n'
+        'Content-Transfer-Encoding: quoted-printable\r\n'
+        'Content-Location: https://example.com/docs/page.html\r\n\r\n'
+        f'{html}\r\n'
+        '--alt--\r\n'
+        '------=_Part\r\n'
+        'Content-Type: image/png\r\n'
+        'Content-Transfer-Encoding: base64\r\n'
+        'Content-Location: https://example.com/static/logo.png\r\n\r\n'
+        f'{encoded.replace(chr(10), chr(13) + chr(10))}\r\n'
+        '------=_Part\r\n'
+        'Content-Type: image/gif\r\n'
+        'Content-Transfer-Encoding: binary\r\n'
+        'Content-ID: <icon@mhtml>\r\n\r\n'
+    ).encode('ascii') + GIF + b'\r\n------=_Part--\r\n'
+    path.write_bytes(content)
+    return str(path)
+
+PAGE = ('<html><body><h1>Caf=E9</h1>'
+        '<img src=3D"../static/logo.png" alt=3D"logo">'
+        '<img src=3D"cid:icon@mhtml" alt=3D"icon">'
+        '<img src=3D"https://cdn.example.com/remote.jpg" alt=3D"remote"></body></html>')
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return write_archive(tmp_path / 'page.mht', PAGE)
+
+def test_index_and_decode(archive_path):
+    archive = MhtArchive(archive_path)
+    assert [p.content_type for p in archive.parts] == ['text/html', 'image/png', 'image/gif']
+    assert archive.location == 'https://example.com/docs/page.html'
+    html = archive.html()
+    assert '<h1>Café</h1>' in html and 'src="cid:icon@mhtml"' in html
+
+    # By absolute URL, by URL relative to the page, and by Content-ID
+    assert archive.get('https://example.com/static/logo.png') == ('image/png', PNG)
+    assert archive.get('../static/logo.png') == ('image/png', PNG)
+    assert archive.get('cid:icon@mhtml') == ('image/gif', GIF)
+    assert archive.get('https://cdn.example.com/remote.jpg') is None
+
+def test_no_html_part(tmp_path):
+    empty = tmp_path / 'empty.mht'
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError):
+        MhtArchive(str(empty)).html()
+
+def _remote_image():
+    response = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+    return patch('md_scraper.scraper.requests.get', return_value=response)
+
+def test_embedded_images_inline_without_downloading(archive_path):
+    with _remote_image() as get:
+        result = Scraper().scrape(archive_path, image_action='base64', base_url=archive_path)
+
+    # Only the image that isn't in the archive is downloaded
+    get.assert_called_once_with('https://cdn.example.com/remote.jpg', timeout=10)
+    markdown = result['markdown']
+    assert f"data:image/png;base64,{base64.b64encode(PNG).decode()}" in markdown
+    assert f"data:image/gif;base64,{base64.b64encode(GIF).decode()}" in markdown
+    assert 'data:image/jpeg;base64,' in markdown
+
+def test_embedded_images_saved_to_files(archive_path, tmp_path):
+    assets_dir = tmp_path / 'assets'
+    with _remote_image():
+        result = Scraper().scrape(archive_path, image_action='file', assets_dir=str(assets_dir))
+
+    assert sorted(os.listdir(assets_dir)) == ['image_0.png', 'image_1.gif', 'image_2.jpg']
+    assert (assets_dir / 'image_0.png').read_bytes() == PNG
+    assert (assets_dir / 'image_1.gif').read_bytes() == GIF
+    assert '![logo](assets/image_0.png)' in result['markdown']
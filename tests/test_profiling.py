@@ -0,0 +1,83 @@
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from unittest.mock import patch
+from click.testing import CliRunner
+from md_scraper.cli import cli
+from md_scraper.profiling import Profiler
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'samples', 'blog_post.html')
+
+def test_profiler_writes_cpu_profile_and_slow_log(tmp_path):
+    directory = tmp_path / 'profile'
+    profiler = Profiler(str(directory), top=5, slow_threshold=1.0)
+    profiler.start()
+    sum(i * i for i in range(10000))
+    profiler.page('https://example.com/fast', 0.2)
+    profiler.page('https://example.com/slow', 2.5, {'stages': {'fetch': {'seconds': 2.0, 'bytes': 10}}})
+    profiler.page('https://example.com/broken', 3.0, error=RuntimeError("boom"))
+    summary = profiler.stop()
+
+    assert '3 page(s)' in summary and '2 slower than 1s' in summary
+    assert pstats.Stats(str(directory / 'cpu.prof')).total_calls > 0
+    assert '=== Top 5 by cumulative ===' in (directory / 'cpu_top.txt').read_text()
+    slow = [json.loads(line) for line in (directory / 'slow_pages.jsonl').read_text().splitlines()]
+    assert slow == [
+        {'url': 'https://example.com/slow', 'seconds': 2.5, 'stages': {'fetch': 2.0}},
+        {'url': 'https://example.com/broken', 'seconds': 3.0, 'error': 'boom'},
+    ]
+
+def test_profiler_memory_snapshots(tmp_path):
+    directory = tmp_path / 'profile'
+    profiler = Profiler(str(directory), memory=True, memory_interval=2)
+    profiler.start()
+    kept = []
+    for i in range(5):
+        kept.append(bytearray(100000))
+        profiler.page(f'https://example.com/{i}', 0.0)
+    summary = profiler.stop()
+
+    # Start, after pages 2 and 4, and at the end
+    snapshots = sorted(os.listdir(directory / 'memory'))
+    assert snapshots == ['snapshot_00000.tracemalloc', 'snapshot_00002.tracemalloc',
+                         'snapshot_00004.tracemalloc', 'snapshot_00005.tracemalloc']
+    assert tracemalloc.Snapshot.load(str(directory / 'memory' / snapshots[-1])).traces
+    assert 'test_profiling.py' in (directory / 'memory_top.txt').read_text()
+    assert 'Memory: peak' in summary
+    assert not tracemalloc.is_tracing()
+
+def test_cli_profile_option(tmp_path):
+    runner = CliRunner()
+    directory = tmp_path / 'profile'
+    result = runner.invoke(cli, ['scrape', SAMPLE, '-o', str(tmp_path / 'out.md'), '--profile', str(directory),
+                                 '--slow-threshold', '0'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Profile: 1 page(s)' in result.output
+    assert {'cpu.prof', 'cpu_top.txt', 'slow_pages.jsonl'} <= set(os.listdir(directory))
+    entry = json.loads((directory / 'slow_pages.jsonl').read_text())
+    assert entry['url'] == SAMPLE
+    # Local pages are scraped with timings, so the log shows where the time went
+    assert 'convert' in entry['stages']
+    assert 'scrape' in (directory / 'cpu_top.txt').read_text()
+
+def test_cli_slow_log_times_concurrent_pages(tmp_path):
+    def scrape(url, **options):
+        time.sleep(0.2)
+        return {'url': url, 'markdown': '# Page', 'metadata': {'title': url}, 'internal_links': []}
+
+    directory = tmp_path / 'profile'
+    urls = [f'https://example.com/{i}' for i in range(3)]
+    with patch('md_scraper.cli.Scraper') as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = scrape
+        result = CliRunner().invoke(cli, ['scrape', *urls, '--jobs', '3', '-o', str(tmp_path / 'out'),
+                                          '--profile', str(directory), '--slow-threshold', '0.15'])
+
+    assert result.exit_code == 0, result.output
+    # The pages ran side by side; each took 0.2s even though they finished together
+    entries = [json.loads(line) for line in (directory / 'slow_pages.jsonl').read_text().splitlines()]
+    assert sorted(entry['url'] for entry in entries) == urls
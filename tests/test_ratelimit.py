@@ -0,0 +1,197 @@
+import os
+import sys
+import threading
+import time
+import pytest
+import requests
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from md_scraper.cli import cli
+from md_scraper.deadline import Deadline, DeadlineExceeded
+from md_scraper.ratelimit import RateLimiter, parse_retry_after, robots_delay
+from md_scraper.scraper import Scraper
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from sitegen import SiteServer, SyntheticSite  # noqa: E402
+
+def response(status, text='', headers=None):
+    r = MagicMock(status_code=status, text=text, headers=headers or {})
+    r.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status} Error") if status >= 400 else None
+    return r
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 < parse_retry_after(in_a_minute) <= 60
+    assert parse_retry_after('soon') is None and parse_retry_after(None) is None
+
+def test_robots_delay():
+    text = ('User-agent: FooBot\nCrawl-delay: 2\n\n'
+            'User-agent: *\nDisallow: /private\nCrawl-delay: 0.5  # fractional\nRequest-rate: 1/4s\n')
+    assert robots_delay(text) == 4.0
+    assert robots_delay(text, 'FooBot/1.0') == 2.0
+    assert robots_delay('User-agent: *\nDisallow: /\n') is None
+
+def test_token_bucket_paces_each_host():
+    limiter = RateLimiter(rate=20, robots=False)
+    start = time.monotonic()
+    for url in ['https://a.com/1', 'https://b.com/1', 'https://a.com/2', 'https://a.com/3', 'https://b.com/2']:
+        limiter.release(limiter.acquire(url), 0.01)
+    # Three requests to a.com need two refills at 20/s; b.com's are paced separately
+    assert 0.09 < time.monotonic() - start < 0.5
+    assert limiter.stats()['a.com']['requests'] == 3
+
+def test_concurrency_limit_adapts():
+    limiter = RateLimiter(max_concurrency=4, robots=False)
+    host = limiter.acquire('https://a.com/')
+    limiter.release(host, 0.1, failed=True)
+    assert limiter.stats()['a.com']['concurrency'] == 2
+    # A second failure within the same round trip doesn't halve it again
+    limiter.release(limiter.acquire('https://a.com/'), 0.1, failed=True)
+    assert limiter.stats()['a.com']['concurrency'] == 2
+    for _ in range(6):
+        limiter.release(limiter.acquire('https://a.com/'), 0.1)
+    assert limiter.stats()['a.com']['concurrency'] == 4
+
+def test_concurrency_limit_is_enforced():
+    limiter = RateLimiter(max_concurrency=2, robots=False)
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def fetch():
+        with limiter.slot('https://a.com/'):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+def test_request_retries_and_honors_retry_after():
+    limiter = RateLimiter(robots=False, backoff=0.01)
+    send = MagicMock(side_effect=[response(503, headers={'Retry-After': '0.1'}), response(502), response(200, 'ok')])
+    start = time.monotonic()
+    assert limiter.request('https://a.com/', send).text == 'ok'
+    assert send.call_count == 3
+    assert time.monotonic() - start >= 0.1
+    assert limiter.stats()['a.com']['retries'] == 2
+
+def test_request_gives_up():
+    limiter = RateLimiter(robots=False, retries=2, backoff=0.001)
+    send = MagicMock(return_value=response(500))
+    assert limiter.request('https://a.com/', send).status_code == 500
+    assert send.call_count == 3
+
+    # Not worth waiting for: returned at once
+    send = MagicMock(return_value=response(429, headers={'Retry-After': '3600'}))
+    assert limiter.request('https://b.com/', send).status_code == 429
+    assert send.call_count == 1
+
+    send = MagicMock(side_effect=requests.exceptions.ConnectionError('refused'))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        limiter.request('https://c.com/', send)
+    assert send.call_count == 3
+
+def test_scraper_retries_through_limiter():
+    session = MagicMock()
+    session.get.side_effect = [response(429, headers={'Retry-After': '0'}), response(200, '<p>ok</p>')]
+    scraper = Scraper(session=session, limiter=RateLimiter(robots=False))
+    assert scraper.fetch_html('https://a.com/') == '<p>ok</p>'
+    assert scraper.fetch_status == 200
+
+def test_robots_crawl_delay_is_honored():
+    site = SyntheticSite(pages=10, fanout=3, depth=2, images=0)
+    with SiteServer(site, crawl_delay=0.05) as server:
+        limiter = RateLimiter()
+        scraper = Scraper(limiter=limiter)
+        start = time.monotonic()
+        for path in ['', 'p/1', 'p/2', 'p/3', 'p/4']:
+            scraper.fetch_html(server.url + path)
+        elapsed = time.monotonic() - start
+        stats = server.stats()
+        host = limiter.host_of(server.url)
+    # robots.txt is read once, then requests are spaced by the delay
+    assert stats['requests'] == 6
+    assert elapsed >= 0.2
+    assert limiter.stats()[host]['crawl_delay'] == 0.05
+
+def test_cli_retries_throttled_pages():
+    pages = {'https://example.com/': [response(429, headers={'Retry-After': '0'}), response(200, '<h1>Home</h1>')]}
+
+    def fake_get(url, **kwargs):
+        return pages[url].pop(0) if url in pages else response(404)
+
+    with patch('md_scraper.scraper.requests.get', side_effect=fake_get):
+        result = CliRunner().invoke(cli, ['scrape', 'https://example.com/', '--retries', '1'])
+    assert result.exit_code == 0, result.output
+    assert '# Home' in result.output
+    assert 'Host example.com: 2 requests, 1 retried' in result.output
+
+    pages['https://example.com/'] = [response(429, headers={'Retry-After': '0'})]
+    with patch('md_scraper.scraper.requests.get', side_effect=fake_get):
+        result = CliRunner().invoke(cli, ['scrape', 'https://example.com/', '--retries', '0'])
+    assert result.exit_code != 0
+    assert 'Failed to scrape https://example.com/: 429 Error' in result.output
+
+def test_deadline_is_not_a_host_failure():
+    limiter = RateLimiter(max_concurrency=4, robots=False)
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    with pytest.raises(DeadlineExceeded):
+        limiter.request('https://a.com/', lambda: requests.get('https://a.com/', timeout=deadline.timeout()), deadline)
+
+    # Timed out on the little time the page had left
+    send = MagicMock(side_effect=requests.exceptions.ReadTimeout('Read timed out.'))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        limiter.request('https://a.com/', send, deadline)
+    assert send.call_count == 1
+
+    stats = limiter.stats()['a.com']
+    assert stats['concurrency'] == 4 and stats['in_flight'] == 0
+
+def test_robots_read_through_the_scrapers_session():
+    session = MagicMock()
+    session.get.side_effect = lambda url, **kwargs: (response(200, 'User-agent: *\nCrawl-delay: 1\n') if url.endswith('/robots.txt')
+                                                     else response(200, '<p>ok</p>'))
+    limiter = RateLimiter(user_agent='FooBot/1.0')
+    Scraper(session=session, limiter=limiter).fetch_html('https://a.com/page')
+
+    robots = session.get.call_args_list[0]
+    assert robots.args[0] == 'https://a.com/robots.txt'
+    assert robots.kwargs['headers'] == {'User-Agent': 'FooBot/1.0'}
+    assert limiter.stats()['a.com']['crawl_delay'] == 1.0
+
+def test_cli_paces_only_when_asked():
+    with patch('md_scraper.cli.RateLimiter', side_effect=RateLimiter) as limiter_class, \
+            patch('md_scraper.scraper.requests.get', return_value=response(200, '<h1>Home</h1>')):
+        assert CliRunner().invoke(cli, ['scrape', 'https://example.com/']).exit_code == 0
+        limiter_class.assert_not_called()
+        assert CliRunner().invoke(cli, ['scrape', 'https://example.com/', '--jobs', '2']).exit_code == 0
+        assert limiter_class.call_args.kwargs == {'rate': None, 'retries': 3, 'robots': True, 'max_concurrency': 2}
+
+def test_images_bypass_limiter():
+    page = '<main><h1>Gallery</h1>' + ''.join(f'<img src="https://cdn.example.com/{i}.png">' for i in range(10)) + '</main>'
+    limiter = RateLimiter(max_concurrency=1)
+
+    def slow_image(url, **kwargs):
+        time.sleep(0.2)
+        image = response(200, headers={'Content-Type': 'image/png'})
+        image.content = b'png'
+        return image
+
+    with patch('md_scraper.scraper.requests.get', side_effect=slow_image) as get:
+        start = time.monotonic()
+        result = Scraper(limiter=limiter).scrape('https://example.com/', html=page, image_action='base64')
+    # Downloaded in parallel, and no robots.txt read for the asset host
+    assert time.monotonic() - start < 1.0
+    assert get.call_count == 10 and result['markdown'].count('data:image/png;base64,') == 10
+    assert 'cdn.example.com' not in limiter.stats()
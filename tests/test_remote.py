@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from click.testing import CliRunner
+from md_scraper.cli import cli, check_remote_result
+from md_scraper.crawler import Crawler
+from md_scraper.manifest import CrawlManifest
+from md_scraper.remote import RemoteClient, DEFAULT_FIELDS
+from md_scraper.utils import iter_concurrent
+
+def _json_response(data):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = 200
+    response.headers = {'Content-Type': 'application/x-ndjson'}
+    response.iter_lines.return_value = iter([json.dumps(data).encode()])
+    return response
+
+def test_remote_client_requests_fields_and_compression():
+    with RemoteClient('https://server/', jobs=4) as remote:
+        assert 'gzip' in remote.session.headers['Accept-Encoding']
+        assert remote.session.get_adapter('https://server/')._pool_maxsize == 4
+
+        with patch.object(remote.session, 'post', return_value=_json_response({'url': 'https://example.com'})) as mock_post:
+            assert remote.scrape({'url': 'https://example.com'}) == {'url': 'https://example.com'}
+            assert mock_post.call_args.args[0] == 'https://server/api/scrape'
+            assert mock_post.call_args.kwargs['json']['fields'] == list(DEFAULT_FIELDS)
+
+def test_remote_client_all_fields():
+    with RemoteClient('https://server', fields=None) as remote:
+        with patch.object(remote.session, 'post', return_value=_json_response({'url': 'https://example.com'})) as mock_post:
+            remote.scrape({'url': 'https://example.com'})
+            assert 'fields' not in mock_post.call_args.kwargs['json']
+
+def test_iter_concurrent_keeps_submission_order():
+    def fetch(url):
+        # Earlier URLs finish last
+        time.sleep(0.01 * (5 - int(url)))
+        if url == '3':
+            raise ValueError("bad page")
+        return url.upper()
+
+    items = iter([(str(n), 0) for n in range(5)])
+    results = list(iter_concurrent(items, fetch, jobs=5))
+    assert [r[0] for r in results] == ['0', '1', '2', '3', '4']
+    assert isinstance(results[3][3], ValueError)
+    assert results[0][2] == '0'
+
+def test_iter_concurrent_feeds_crawler():
+    crawler = Crawler(['https://example.com/0'], max_depth=5, max_pages=6)
+    seen = []
+    for url, depth, result, error in iter_concurrent(crawler, lambda url: url, jobs=3):
+        seen.append(url)
+        n = int(url.rsplit('/', 1)[-1])
+        crawler.add_links([f'https://example.com/{n * 2 + 1}', f'https://example.com/{n * 2 + 2}'], depth)
+    assert len(seen) == 6
+    assert seen[0] == 'https://example.com/0'
+
+def test_cli_server_mode_is_concurrent():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def post(url, json=None, **kwargs):
+        with lock:
+            active.append(json['url'])
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(json['url'])
+        return _json_response({'url': json['url'], 'markdown': f"# {json['url']}", 'metadata': {}})
+
+    urls = [f'https://example.com/{n}' for n in range(4)]
+    runner = CliRunner()
+    with patch('requests.Session.post', side_effect=post):
+        result = runner.invoke(cli, ['scrape', *urls, '--server', 'https://server', '--jobs', '4'])
+
+    assert result.exit_code == 0
+    assert max(peak) == 4
+    # Output stays in input order
+    positions = [result.output.index(f'# {url}') for url in urls]
+    assert positions == sorted(positions)
+
+def test_check_remote_result_uses_server_hash(tmp_path):
+    manifest = CrawlManifest.for_directory(str(tmp_path))
+    (tmp_path / 'page.md').write_text('# Page')
+    manifest.record('https://example.com', 'abc', 'page.md', [], {})
+
+    result = check_remote_result('https://example.com', {'content_hash': 'abc'}, manifest=manifest)
+    assert result['unchanged'] is True
+    result = check_remote_result('https://example.com', {'content_hash': 'def'}, manifest=manifest)
+    assert 'unchanged' not in result
@@ -0,0 +1,174 @@
+import io
+import json
+import pytest
+import requests
+from urllib.parse import urlparse
+from click.testing import CliRunner
+from flask import Flask, Response, jsonify, request
+from md_scraper.cli import cli
+from md_scraper.remote import RemoteClient, RemoteError, ServerUnavailable
+import md_scraper.cli
+
+class FlaskAdapter(requests.adapters.BaseAdapter):
+    """Routes requests for each host to a Flask app's test client instead of the network."""
+
+    def __init__(self, apps):
+        super().__init__()
+        self.clients = {host: app.test_client() for host, app in apps.items()}
+
+    def send(self, prepared, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parsed = urlparse(prepared.url)
+        client = self.clients.get(parsed.netloc)
+        if client is None:
+            raise requests.exceptions.ConnectionError(f"Cannot connect to {parsed.netloc}")
+        resp = client.open(parsed.path, method=prepared.method, data=prepared.body,
+                           headers={k: v for k, v in prepared.headers.items() if k.lower() != 'accept-encoding'})
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(resp.headers)
+        response.raw = io.BytesIO(resp.get_data())
+        response.url = prepared.url
+        response.request = prepared
+        return response
+
+    def close(self):
+        pass
+
+def make_server(name, fail_with=None, healthy=True):
+    """A stand-in scraper server whose pages link to the next two pages."""
+    app = Flask(name)
+    app.config['hits'] = []
+
+    @app.route('/api/health')
+    def health():
+        return (jsonify({'status': 'ok'}), 200) if healthy else (jsonify({'status': 'down'}), 503)
+
+    @app.route('/api/scrape', methods=['POST'])
+    def scrape():
+        data = request.json
+        app.config['hits'].append(data['url'])
+        if fail_with:
+            return jsonify({'error': 'overloaded'}), fail_with, {'Retry-After': '60'}
+        n = int(data['url'].rsplit('/', 1)[-1])
+        if n == 404:
+            return Response(json.dumps({'error': 'page not found'}) + '\n', mimetype='application/x-ndjson')
+        result = {'url': data['url'], 'markdown': f'# Page {n} from {name}', 'metadata': {'title': f'Page {n}'},
+                  'internal_links': [f'https://example.com/{n * 2 + 1}', f'https://example.com/{n * 2 + 2}'],
+                  'raw_html': '<html></html>'}
+        result = {k: v for k, v in result.items() if k in data.get('fields', result)}
+        return Response(json.dumps(result) + '\n', mimetype='application/x-ndjson')
+
+    return app
+
+def make_client(apps, **kwargs):
+    remote = RemoteClient([f'http://{host}' for host in apps], **kwargs)
+    adapter = FlaskAdapter({host: app for host, app in apps.items() if app is not None})
+    remote.session.mount('http://', adapter)
+    return remote
+
+def page(n):
+    return {'url': f'https://example.com/{n}'}
+
+def test_round_robin_spreads_requests():
+    apps = {'a': make_server('a'), 'b': make_server('b'), 'c': make_server('c')}
+    with make_client(apps) as remote:
+        for n in range(6):
+            remote.scrape(page(n))
+    assert [len(app.config['hits']) for app in apps.values()] == [2, 2, 2]
+
+def test_fields_are_forwarded():
+    apps = {'a': make_server('a')}
+    with make_client(apps) as remote:
+        result = remote.scrape(page(1))
+    assert 'raw_html' not in result
+
+def test_failover_on_server_error():
+    apps = {'a': make_server('a', fail_with=503), 'b': make_server('b')}
+    with make_client(apps) as remote:
+        results = [remote.scrape(page(n)) for n in range(4)]
+        stats = {s['url']: s for s in remote.stats()}
+
+    assert all('from b' in r['markdown'] for r in results)
+    # Taken out of rotation after the first failure (Retry-After: 60)
+    assert len(apps['a'].config['hits']) == 1
+    assert stats['http://a']['healthy'] is False
+    assert stats['http://a']['failures'] == 1
+
+def test_failover_on_connection_error():
+    apps = {'gone': None, 'b': make_server('b')}
+    with make_client(apps) as remote:
+        assert 'from b' in remote.scrape(page(1))['markdown']
+        assert 'from b' in remote.scrape(page(2))['markdown']
+
+def test_all_servers_down():
+    apps = {'a': make_server('a', fail_with=502), 'b': make_server('b', fail_with=500)}
+    with make_client(apps) as remote:
+        with pytest.raises(ServerUnavailable):
+            remote.scrape(page(1))
+        with pytest.raises(ServerUnavailable, match="All servers"):
+            remote.scrape(page(2))
+
+def test_page_error_does_not_fail_over():
+    apps = {'a': make_server('a'), 'b': make_server('b')}
+    with make_client(apps) as remote:
+        with pytest.raises(RemoteError, match="page not found"):
+            remote.scrape(page(404))
+        assert all(s['healthy'] for s in remote.stats())
+    assert len(apps['a'].config['hits']) + len(apps['b'].config['hits']) == 1
+
+def test_health_check_and_recovery():
+    apps = {'a': make_server('a', healthy=False), 'b': make_server('b')}
+    with make_client(apps, cooldown=0) as remote:
+        healthy = remote.check_health()
+        assert [e.url for e in healthy] == ['http://b']
+
+        # Cooldown over, but the health check still fails: skipped
+        remote.scrape(page(1))
+        assert apps['a'].config['hits'] == []
+
+        apps['a'].view_functions['health'] = lambda: jsonify({'status': 'ok'})
+        remote.scrape(page(2))
+        remote.scrape(page(3))
+        assert len(apps['a'].config['hits']) == 1
+
+def test_least_outstanding_prefers_idle_server():
+    apps = {'a': make_server('a'), 'b': make_server('b')}
+    with make_client(apps, policy='least-outstanding') as remote:
+        remote.endpoints[0].outstanding = 3
+        remote.scrape(page(1))
+        assert apps['b'].config['hits'] == ['https://example.com/1']
+
+def test_latency_policy_favours_fast_server():
+    apps = {'a': make_server('a'), 'b': make_server('b')}
+    with make_client(apps, policy='latency') as remote:
+        remote._random.seed(1)
+        remote.endpoints[0].latency = 2.0
+        remote.endpoints[1].latency = 0.02
+        for n in range(50):
+            remote.scrape({'url': f'https://example.com/{n}'})
+    assert len(apps['b'].config['hits']) > 40
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        RemoteClient('http://a', policy='random')
+
+def test_cli_crawl_across_servers_keeps_frontier_local(monkeypatch):
+    apps = {'a': make_server('a'), 'b': make_server('b')}
+    adapter = FlaskAdapter(apps)
+
+    class StandInClient(RemoteClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.session.mount('http://', adapter)
+
+    monkeypatch.setattr(md_scraper.cli, 'RemoteClient', StandInClient)
+    runner = CliRunner()
+    result = runner.invoke(cli, ['scrape', 'https://example.com/0', '--crawl', '--max-pages', '7', '--depth', '5',
+                                 '--server', 'http://a,http://b', '--jobs', '3'])
+
+    assert result.exit_code == 0, result.output
+    hits = apps['a'].config['hits'] + apps['b'].config['hits']
+    # Every page fetched exactly once, from one of the servers
+    assert sorted(hits) == sorted(f'https://example.com/{n}' for n in range(7))
+    assert apps['a'].config['hits'] and apps['b'].config['hits']
+    assert 'Server http://a:' in result.output
@@ -0,0 +1,104 @@
+import json
+import time
+from unittest.mock import patch
+from click.testing import CliRunner
+from requests.exceptions import HTTPError
+from md_scraper.cli import cli
+from md_scraper.remote import RemoteError
+from md_scraper.report import CrawlReport, percentile
+
+def _result(fetch_seconds, fetch_bytes=1000, status=200):
+    return {
+        'markdown': '# Page',
+        'timings': {'total': fetch_seconds + 0.1, 'status': status, 'stages': {
+            'fetch': {'seconds': fetch_seconds, 'bytes': fetch_bytes},
+            'convert': {'seconds': 0.1, 'bytes': 6}
+        }}
+    }
+
+def test_percentile_nearest_rank():
+    values = [0.1 * i for i in range(1, 11)]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 90) == 0.9
+    assert percentile(values, 99) == 1.0
+    assert percentile([], 50) is None
+
+def test_report_aggregates_pages():
+    report = CrawlReport(slowest=2)
+    report.record('https://a.com/1', 0.3, _result(0.2), written_bytes=6)
+    report.record('https://a.com/2', 1.2, _result(1.0, 3000), written_bytes=6)
+    report.record('https://b.com/', 0.5, error=HTTPError("404 Client Error: Not Found for url: https://b.com/"))
+    report.record('https://b.com/x', 0.4, error=RemoteError("Server error: 503 Server Error: Unavailable"))
+    report.record('https://b.com/y', 0.1, error=ConnectionError("refused"))
+    report.finish()
+    data = report.as_dict()
+
+    assert (data['pages'], data['succeeded'], data['failed']) == (5, 2, 3)
+    assert data['bytes'] == {'fetched': 4000, 'written': 12}
+    assert data['status_codes'] == {'200': 2, '404': 1, '503': 1}
+    assert data['errors'] == {'HTTPError': 1, 'RemoteError': 1, 'ConnectionError': 1}
+    assert list(data['stages']) == ['fetch', 'convert']
+    assert data['stages']['fetch']['seconds'] == 1.2
+
+    a = data['hosts']['a.com']
+    # Latency is the fetch stage, not the whole page
+    assert a['latency']['p50'] == 0.2 and a['latency']['max'] == 1.0
+    assert a['histogram']['0.25'] == 1 and a['histogram']['1'] == 2 and a['histogram']['+Inf'] == 2
+    assert data['hosts']['b.com']['failed'] == 3
+    assert [page['url'] for page in data['slowest']] == ['https://a.com/2', 'https://b.com/']
+    assert data['slowest'][1]['status'] == 404
+
+    summary = report.summary()
+    assert 'Crawl report: 5 page(s)' in summary
+    assert 'a.com: 2 page(s), 0 failed, latency p50 0.200s' in summary
+
+def test_cli_report_option(tmp_path):
+    runner = CliRunner()
+    pages = {
+        'https://example.com/': _result(0.05),
+        'https://example.com/a': _result(0.5)
+    }
+
+    def scrape(url, **options):
+        assert options['timings'] is True
+        if url not in pages:
+            raise HTTPError(f"404 Client Error: Not Found for url: {url}")
+        return {**pages[url], 'url': url, 'metadata': {'title': url}, 'internal_links': list(pages) + ['https://example.com/missing']}
+
+    with patch('md_scraper.cli.Scraper') as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = scrape
+
+        report_path = tmp_path / 'report.json'
+        result = runner.invoke(cli, ['scrape', 'https://example.com/', '--crawl', '-o', str(tmp_path / 'out'),
+                                     '--report', str(report_path)])
+
+    assert result.exit_code == 0, result.output
+    assert 'Crawl report: 3 page(s)' in result.output
+    data = json.loads(report_path.read_text())
+    assert data['status_codes'] == {'200': 2, '404': 1}
+    assert data['bytes']['written'] == 2 * len('# Page')
+    assert data['hosts']['example.com']['pages'] == 3
+
+def test_cli_report_ranks_concurrent_pages(tmp_path):
+    delays = {'https://example.com/0': 0.3, 'https://example.com/1': 0.4, 'https://example.com/2': 0.05}
+
+    def scrape(url, **options):
+        time.sleep(delays[url])
+        return {**_result(delays[url]), 'url': url, 'metadata': {'title': url}, 'internal_links': []}
+
+    with patch('md_scraper.cli.Scraper') as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = scrape
+
+        report_path = tmp_path / 'report.json'
+        result = CliRunner().invoke(cli, ['scrape', *delays, '--jobs', '3', '-o', str(tmp_path / 'out'),
+                                          '--report', str(report_path)])
+
+    assert result.exit_code == 0, result.output
+    # /1 finishes just after /0, but it's the slowest page, not the time between the two
+    slowest = json.loads(report_path.read_text())['slowest']
+    assert [page['url'] for page in slowest] == ['https://example.com/1', 'https://example.com/0', 'https://example.com/2']
+    assert slowest[0]['seconds'] >= 0.4
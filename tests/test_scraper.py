@@ -15,9 +15,19 @@ def test_fetch_html_success():
         
         result = scraper.fetch_html(url)
         
-        mock_get.assert_called_once_with(url)
+        mock_get.assert_called_once_with(url, timeout=30)
         assert result == html_content
 
+def test_fetch_html_uses_session():
+    session = MagicMock()
+    session.get.return_value.text = "<html></html>"
+    scraper = Scraper(session=session)
+
+    with patch('requests.get') as mock_get:
+        assert scraper.fetch_html("https://example.com") == "<html></html>"
+        mock_get.assert_not_called()
+    session.get.assert_called_once_with("https://example.com", timeout=30)
+
 def test_fetch_html_failure():
     scraper = Scraper()
     url = "https://example.com/404"
@@ -318,3 +328,26 @@ def test_scrape_integration_sample():
         # Boilerplate should be gone
         assert "Home" not in result['markdown']
         assert "&copy;" not in result['markdown']
+
+def test_scraper_shared_between_threads():
+    import concurrent.futures
+    pages = {f"https://example.com/{i}": f"<html><head><title>Page {i}</title></head><body><main><h1>Page {i}</h1>"
+             f"<p>Text {i}</p><a href='/next{i}'>next</a></main></body></html>" for i in range(40)}
+
+    def fake_get(url, **kwargs):
+        response = MagicMock()
+        response.status_code = 200 if url.endswith(('0', '2', '4', '6', '8')) else 203
+        response.text = pages[url]
+        return response
+
+    scraper = Scraper()
+    with patch('requests.get', side_effect=fake_get):
+        expected = {url: scraper.scrape(url, timings=True) for url in pages}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            results = dict(zip(pages, executor.map(lambda url: scraper.scrape(url, timings=True), pages)))
+
+    for url, result in results.items():
+        assert result['markdown'] == expected[url]['markdown']
+        assert result['internal_links'] == expected[url]['internal_links'] == ['https://example.com/next' + url.rsplit('/', 1)[1]]
+        # Each thread sees the status of its own fetch
+        assert result['timings']['status'] == expected[url]['timings']['status']
@@ -0,0 +1,128 @@
+import json
+import tarfile
+import zipfile
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from md_scraper.sinks import FilenameAllocator, OutputSink, MarkdownDirectorySink, JsonlSink, TarSink, ZipSink, BundleSink, open_sink
+from md_scraper.cli import cli
+
+RESULTS = [
+    ("https://example.com/1", {'markdown': 'Content 1', 'metadata': {'title': 'Same Title'}}),
+    ("https://example.com/2", {'markdown': 'Content 2', 'metadata': {'title': 'Same Title'}}),
+    ("https://example.com/3", {'markdown': 'Content 3', 'metadata': {'title': 'Other'}}),
+]
+
+def test_filename_allocator_collisions():
+    names = FilenameAllocator(reserved=["Taken.md"])
+    assert names.allocate("Page") == "Page.md"
+    assert names.allocate("Page") == "Page_2.md"
+    assert names.allocate("Page") == "Page_3.md"
+    assert names.allocate("Taken") == "Taken_2.md"
+
+def test_markdown_directory_sink_batches(tmp_path):
+    sink = MarkdownDirectorySink(str(tmp_path), batch_size=2)
+    sink.write(*RESULTS[0])
+    assert not (tmp_path / "Same_Title.md").exists()  # still buffered
+    assert sink.pending == 1
+    sink.write(*RESULTS[1])
+    assert sink.pending == 0
+    assert (tmp_path / "Same_Title.md").read_text() == "Content 1"
+    assert (tmp_path / "Same_Title_2.md").read_text() == "Content 2"
+    sink.write(*RESULTS[2])
+    sink.close()
+    assert (tmp_path / "Other.md").read_text() == "Content 3"
+    assert sink.written_count == 3
+
+def test_output_sink_is_abstract():
+    with pytest.raises(TypeError):
+        OutputSink(None)
+
+def test_jsonl_sink(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with JsonlSink(str(path)) as sink:
+        for url, result in RESULTS:
+            sink.write(url, result)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r['url'] for r in records] == [url for url, _ in RESULTS]
+    assert records[0] == {'url': "https://example.com/1", 'metadata': {'title': 'Same Title'}, 'markdown': 'Content 1'}
+
+@pytest.mark.parametrize("filename", ["out.tar.gz", "out.tar"])
+def test_tar_sink(tmp_path, filename):
+    path = tmp_path / filename
+    with TarSink(str(path), batch_size=1) as sink:
+        for url, result in RESULTS:
+            sink.write(url, result)
+    with tarfile.open(path) as tf:
+        assert tf.getnames() == ["Same_Title.md", "Same_Title_2.md", "Other.md"]
+        assert tf.extractfile("Same_Title_2.md").read() == b"Content 2"
+
+def test_zip_sink(tmp_path):
+    path = tmp_path / "out.zip"
+    with ZipSink(str(path)) as sink:
+        for url, result in RESULTS:
+            sink.write(url, result)
+    with zipfile.ZipFile(path) as zf:
+        assert zf.namelist() == ["Same_Title.md", "Same_Title_2.md", "Other.md"]
+
+def test_bundle_sink(tmp_path):
+    path = tmp_path / "bundle.md"
+    with BundleSink(str(path), batch_size=2) as sink:
+        for url, result in RESULTS:
+            sink.write(url, result)
+    text = path.read_text()
+    assert text.startswith("<!-- source: https://example.com/1 -->")
+    assert text.count("\n---\n") == 2
+    assert "Content 3" in text
+
+def test_open_sink_directory_target(tmp_path):
+    sink = open_sink('zip', str(tmp_path))
+    sink.close()
+    assert sink.path == str(tmp_path / "scraped.zip")
+    with pytest.raises(ValueError):
+        open_sink('tar', None)
+
+def test_cli_format_jsonl(tmp_path):
+    runner = CliRunner()
+    results = dict(RESULTS)
+
+    with patch("md_scraper.cli.Scraper") as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = lambda url, **kwargs: results[url]
+
+        out = tmp_path / "out.jsonl"
+        result = runner.invoke(cli, ['scrape', *results, '--format', 'jsonl', '-o', str(out)])
+        assert result.exit_code == 0
+        assert len(out.read_text().splitlines()) == 3
+
+def test_cli_directory_output_no_overwrite(tmp_path):
+    runner = CliRunner()
+    results = dict(RESULTS)
+
+    with patch("md_scraper.cli.Scraper") as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = lambda url, **kwargs: results[url]
+
+        out_dir = tmp_path / "out"
+        result = runner.invoke(cli, ['scrape', *results, '-o', str(out_dir)])
+        assert result.exit_code == 0
+        assert sorted(p.name for p in out_dir.iterdir()) == ["Other.md", "Same_Title.md", "Same_Title_2.md"]
+
+def test_cli_reports_pages_saved_only_once_written(tmp_path):
+    runner = CliRunner()
+    results = dict(RESULTS)
+
+    with patch("md_scraper.cli.Scraper") as mock_scraper_class:
+        mock_scraper_instance = mock_scraper_class.return_value
+        mock_scraper_instance.__enter__.return_value = mock_scraper_instance
+        mock_scraper_instance.scrape.side_effect = lambda url, **kwargs: results[url]
+
+        out_dir = tmp_path / "out"
+        result = runner.invoke(cli, ['scrape', *results, '-o', str(out_dir), '--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert f"Queued: {out_dir / 'Same_Title.md'}" in result.output
+    assert f"Saved: {out_dir / 'Same_Title_2.md'}" in result.output
+    assert f"Queued: {out_dir / 'Other.md'}" in result.output
+    assert f"Saved 3 page(s): {out_dir}" in result.output
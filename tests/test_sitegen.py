@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from sitegen import SiteServer, SyntheticSite  # noqa: E402
+
+def test_site_shape():
+    site = SyntheticSite(pages=20, fanout=3, depth=2)
+    # 1 + 3 + 9 pages fit within depth 2
+    assert len(site.paths) == 13
+    assert max(site.depth_of.values()) == 2
+    assert site.children['/'] == ['/p/1', '/p/2', '/p/3']
+    assert site.reachable(1) >= {'/', '/p/1', '/p/2', '/p/3'}
+
+def test_page_size_and_images():
+    site = SyntheticSite(pages=5, page_size=10000, images=3, nav='none')
+    html = site.render('/p/1')
+    assert 9000 < len(html) < 11000
+    assert html.count('<img') == 3
+    assert '<nav' not in html
+    # Rendering is deterministic
+    assert site.render('/p/1') == html
+
+def test_aliases_resolve_to_canonical_pages():
+    site = SyntheticSite(pages=50, fanout=5, duplicate_rate=1.0, seed=1)
+    aliases = [alias for links in site.aliases.values() for alias in links]
+    assert len(aliases) == 49
+    assert all(site.resolve(alias) in site.depth_of for alias in aliases)
+    assert site.resolve('/print/p/7') == site.resolve('/p/7/index.html') == site.resolve('/p/7/?ref=x') == '/p/7'
+    assert site.resolve('/p/999') is None
+
+@pytest.mark.parametrize('nav, expected', [
+    ('breadcrumb', ['/', '/p/1']),
+    ('sidebar', ['/', '/p/1', '/p/2']),
+    ('none', []),
+])
+def test_nav_structures(nav, expected):
+    site = SyntheticSite(pages=10, fanout=2, nav=nav)
+    assert site.nav_links('/p/3') == expected
+
+def test_server_serves_pages_and_counts_duplicates():
+    site = SyntheticSite(pages=10, fanout=3)
+    with SiteServer(site) as server:
+        assert requests.get(server.url + 'p/2').text == site.render('/p/2')
+        assert requests.get(server.url + 'print/p/2').status_code == 200
+        assert requests.get(server.url + 'img/1-0.png').headers['Content-Type'] == 'image/png'
+        assert requests.get(server.url + 'missing').status_code == 404
+        stats = server.stats()
+
+    assert stats['requests'] == 4
+    assert stats['pages_served'] == 1
+    assert stats['duplicate_fetches'] == 1
+
+def test_server_injects_latency_and_errors():
+    site = SyntheticSite(pages=3)
+    with SiteServer(site, latency=0.05, error_rate=1.0, error_status=503) as server:
+        start = time.monotonic()
+        response = requests.get(server.url)
+        assert time.monotonic() - start >= 0.05
+    assert response.status_code == 503
+
+def test_server_rate_limit():
+    site = SyntheticSite(pages=3)
+    with SiteServer(site, rate_limit=2) as server:
+        statuses = [requests.get(server.url).status_code for _ in range(5)]
+        assert server.stats()['throttled'] == statuses.count(429)
+    assert statuses[:2] == [200, 200]
+    assert 429 in statuses
+
+def test_crawl_benchmark_finds_every_page():
+    import bench_crawl
+    site = SyntheticSite(pages=25, fanout=3, depth=3, duplicate_rate=0.3, page_size=2000)
+    result = bench_crawl.run_crawl(site)
+
+    assert result['expected_pages'] == 25
+    assert result['missing_pages'] == 0
+    assert result['unexpected_pages'] == 0
+    # Alias URLs are fetched again: the crawler has no way to know they are the same page
+    assert result['server_duplicate_fetches'] == result['pages_written'] - 25
+
+def test_offline_crawl_finds_every_page():
+    import bench_crawl
+    site = SyntheticSite(pages=25, fanout=3, depth=3, duplicate_rate=0.3, page_size=2000)
+    result = bench_crawl.run_offline_crawl(site)
+
+    assert result['expected_pages'] == 25
+    assert result['missing_pages'] == 0
+    assert result['unexpected_pages'] == 0
+    # On disk, /p/n/ and /p/n/index.html are the same file as /p/n; only print views are extra pages
+    print_views = sum(1 for aliases in site.aliases.values() for alias in aliases if alias.startswith('/print/'))
+    assert result['pages_written'] == 25 + print_views
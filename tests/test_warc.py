@@ -0,0 +1,137 @@
+import gzip
+import os
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from md_scraper.cli import cli
+from md_scraper.scraper import Scraper
+from md_scraper.warc import NotArchivedError, WarcArchive, WarcWriter
+from md_scraper.workers import ConversionPool
+
+PNG = b'\x89PNG\r\n\x1a\n' + bytes(range(256))
+SITE = {
+    'https://example.com/': ('text/html; charset=utf-8',
+                             '<html><head><title>Home</title></head><body><h1>Home</h1>'
+                             '<img src="/logo.png" alt="logo"><a href="/docs">Docs</a></body></html>'),
+    'https://example.com/docs/': ('text/html; charset=utf-8',
+                                  '<html><head><title>Docs</title></head><body><h1>Docs ✓</h1></body></html>'),
+    'https://example.com/logo.png': ('image/png', PNG)
+}
+
+def make_response(url, status=200, content_type='text/html', body=b'', headers=None):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.reason = requests.status_codes._codes[status][0].replace('_', ' ').upper()
+    response.headers.update({'Content-Type': content_type, **(headers or {})})
+    response._content = body
+    return response
+
+def fake_get(url, **kwargs):
+    """requests.get for SITE, with /docs redirecting to /docs/."""
+    if url == 'https://example.com/docs':
+        redirect = make_response(url, 301, headers={'Location': '/docs/'})
+        response = fake_get('https://example.com/docs/')
+        response.history = [redirect]
+        return response
+    if url not in SITE:
+        return make_response(url, 404, body=b'Not found')
+    content_type, body = SITE[url]
+    return make_response(url, 200, content_type, body.encode('utf-8') if isinstance(body, str) else body)
+
+@pytest.fixture(params=['crawl.warc', 'crawl.warc.gz'])
+def warc_path(request, tmp_path):
+    path = str(tmp_path / request.param)
+    with WarcWriter(path) as writer:
+        for url in ('https://example.com/', 'https://example.com/docs', 'https://example.com/logo.png',
+                    'https://example.com/missing'):
+            writer.record(fake_get(url))
+    return path
+
+def test_write_and_index(warc_path):
+    if warc_path.endswith('.gz'):
+        # One gzip member per record, readable by any gzip tool
+        with gzip.open(warc_path, 'rb') as f:
+            assert f.read().count(b'WARC/1.1\r\n') == 6
+    archive = WarcArchive(warc_path)
+    assert archive.pages == ['https://example.com/', 'https://example.com/docs/']
+    assert len(archive) == 5 and 'https://example.com/logo.png#top' in archive
+
+    status, html = archive.fetch('https://example.com/docs')
+    assert status == 200 and '<h1>Docs ✓</h1>' in html
+    assert archive.fetch('https://example.com/missing') == (404, 'Not found')
+    assert archive.get('https://example.com/logo.png') == ('image/png', PNG)
+    assert archive.get('https://example.com/missing') is None
+    with pytest.raises(NotArchivedError):
+        archive.fetch('https://example.com/elsewhere')
+    assert [url for url, _ in archive.iter_pages()] == archive.pages
+
+def test_last_capture_wins(tmp_path):
+    path = str(tmp_path / 'recrawl.warc.gz')
+    with WarcWriter(path) as writer:
+        writer.write_response('https://example.com/', 200, 'OK', [('Content-Type', 'text/html')], b'<p>old</p>')
+        writer.write_response('https://example.com/', 200, 'OK', [('Content-Type', 'text/html')], b'<p>new</p>')
+    archive = WarcArchive(path)
+    assert archive.pages == ['https://example.com/']
+    assert archive.fetch('https://example.com/') == (200, '<p>new</p>')
+
+def test_reads_encoded_responses(tmp_path):
+    # As other crawlers store them: the body still chunked and gzipped
+    compressed = gzip.compress('<p>Grüße</p>'.encode('latin-1'))
+    body = f'{len(compressed):x}\r\n'.encode() + compressed + b'\r\n0\r\n\r\n'
+    block = (b'HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=ISO-8859-1\r\nContent-Encoding: gzip\r\n'
+             b'Transfer-Encoding: chunked\r\n\r\n' + body)
+    record = (b'WARC/1.0\r\nWARC-Type: response\r\nWARC-Target-URI: <https://example.com/>\r\n'
+              b'Content-Type: application/http; msgtype=response\r\nContent-Length: '
+              + str(len(block)).encode() + b'\r\n\r\n' + block + b'\r\n\r\n')
+    path = tmp_path / 'foreign.warc'
+    path.write_bytes(record)
+    assert WarcArchive(str(path)).fetch('https://example.com/') == (200, '<p>Grüße</p>')
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / 'crawl.warc.gz')
+    session = MagicMock()
+    session.get.side_effect = fake_get
+    with WarcWriter(path) as writer, patch('md_scraper.scraper.requests.get', side_effect=fake_get) as image_get:
+        live = Scraper(session=session, recorder=writer).scrape(
+            'https://example.com/', image_action='base64', base_url='https://example.com/')
+    image_get.assert_called_once_with('https://example.com/logo.png', timeout=10)
+    assert writer.responses == 2
+
+    # Nothing is fetched again, and the result is the same
+    with patch('md_scraper.scraper.requests.get', side_effect=AssertionError('network')):
+        replayed = Scraper(replay=WarcArchive(path)).scrape(
+            'https://example.com/', image_action='base64', base_url='https://example.com/')
+    assert replayed['markdown'] == live['markdown']
+    assert 'data:image/png;base64,' in replayed['markdown']
+
+def test_replay_in_workers(warc_path):
+    with patch('md_scraper.scraper.requests.get', side_effect=AssertionError('network')):
+        expected = Scraper(replay=WarcArchive(warc_path)).scrape(
+            'https://example.com/', image_action='base64', base_url='https://example.com/')
+    with ConversionPool(workers=1, replay=WarcArchive(warc_path)) as pool:
+        result = pool.scrape('https://example.com/', image_action='base64', base_url='https://example.com/')
+    assert result['markdown'] == expected['markdown']
+
+def test_cli_records_and_converts_warc(tmp_path):
+    runner = CliRunner()
+    path = str(tmp_path / 'crawl.warc.gz')
+    with patch('md_scraper.scraper.requests.get', side_effect=fake_get):
+        result = runner.invoke(cli, ['scrape', 'https://example.com/', '--crawl', '--depth', '1', '-o', str(tmp_path / 'live'),
+                                     '--image-action', 'base64', '--warc', path])
+    assert result.exit_code == 0, result.output
+    assert '-> Saved WARC' in result.output
+
+    out = tmp_path / 'replayed'
+    with patch('md_scraper.scraper.requests.get', side_effect=AssertionError('network')):
+        result = runner.invoke(cli, ['scrape', path, '-o', str(out), '--image-action', 'file'])
+    assert result.exit_code == 0, result.output
+    assert 'Replaying 2 page(s)' in result.output
+    assert sorted(os.listdir(out)) == ['Docs.md', 'Home.md', 'assets']
+    assert (out / 'assets' / 'image_0.png').read_bytes() == PNG
+
+def test_cli_warc_option_conflicts(tmp_path):
+    result = CliRunner().invoke(cli, ['scrape', 'https://example.com/', '--server', 'http://s', '--warc', str(tmp_path / 'x.warc')])
+    assert result.exit_code != 0
+    assert "--warc records local static fetches" in result.output
@@ -1,12 +1,18 @@
 import pytest
 from unittest.mock import patch
+import md_scraper.web.app
 from md_scraper.web.app import app as flask_app
 
 @pytest.fixture
-def client():
+def client(tmp_path, monkeypatch):
     flask_app.config['TESTING'] = True
+    # Scraped results are stored for the ZIP download; keep them out of the shared default database
+    monkeypatch.setitem(flask_app.config, 'JOB_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(md_scraper.web.app, '_job_manager', None)
     with flask_app.test_client() as client:
         yield client
+    if md_scraper.web.app._job_manager is not None:
+        md_scraper.web.app._job_manager.shutdown()
 
 def test_index_route(client):
     response = client.get('/')
@@ -26,7 +32,8 @@ def test_scrape_success(client):
         assert response.status_code == 200
         assert b"# Success" in response.data
         assert b"Test Title" in response.data
-        mock_scrape.assert_called_once_with('https://example.com', dynamic=False, svg_action='preserve', image_action='remote', strip=[])
+        mock_scrape.assert_called_once_with('https://example.com', dynamic=False, svg_action='preserve', image_action='remote', strip=[],
+                                            deadline=60.0)
 
 def test_scrape_with_strip(client):
     with patch("md_scraper.web.app.Scraper.scrape") as mock_scrape:
@@ -48,7 +55,8 @@ def test_scrape_with_strip(client):
             dynamic=False, 
             svg_action='image', 
             image_action='remote',
-            strip=['script', 'iframe']
+            strip=['script', 'iframe'],
+            deadline=60.0
         )
 
 def test_scrape_failure(client):
@@ -61,3 +69,25 @@ def test_scrape_failure(client):
         assert response.status_code == 200
         assert b"Error scraping" in response.data
         assert b"Network error" in response.data
+
+@pytest.mark.parametrize('endpoint, data', [
+    ('/api/scrape', {'url': 'file:///etc/passwd'}),
+    ('/api/scrape', {'url': 'file:///etc/', 'crawl': True}),
+    ('/api/scrape', {'url': '/etc/passwd'}),
+    ('/api/scrape', {'url': 123}),
+    ('/api/batch', {'urls': ['https://example.com', 'file:///etc/passwd']}),
+    ('/api/jobs', {'url': 'ftp://example.com/', 'crawl': True})
+])
+def test_api_rejects_non_http_urls(client, endpoint, data):
+    with patch("md_scraper.web.app.Scraper.scrape") as mock_scrape:
+        response = client.post(endpoint, json=data)
+    assert response.status_code == 400
+    assert 'Only http and https URLs' in response.get_json()['error']
+    mock_scrape.assert_not_called()
+
+def test_index_rejects_non_http_urls(client):
+    with patch("md_scraper.web.app.Scraper.scrape") as mock_scrape:
+        response = client.post('/', data={'urls': 'https://example.com\nfile:///etc/passwd'})
+    assert response.status_code == 400
+    assert b'Only http and https URLs' in response.data
+    mock_scrape.assert_not_called()
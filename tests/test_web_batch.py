@@ -2,14 +2,22 @@ import pytest
 import io
 import zipfile
 import json
+import threading
+import time
 from unittest.mock import patch, MagicMock
+import md_scraper.web.app
 from md_scraper.web.app import app
 
 @pytest.fixture
-def client():
+def client(tmp_path, monkeypatch):
     app.config['TESTING'] = True
+    # Scraped results are stored for the ZIP download; keep them out of the shared default database
+    monkeypatch.setitem(app.config, 'JOB_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(md_scraper.web.app, '_job_manager', None)
     with app.test_client() as client:
         yield client
+    if md_scraper.web.app._job_manager is not None:
+        md_scraper.web.app._job_manager.shutdown()
 
 def test_index_batch_scrape(client):
     urls = "https://example.com/1\nhttps://example.com/2"
@@ -47,3 +55,89 @@ def test_download_zip(client):
         assert "Page_1.md" in files
         assert "Page_2.md" in files
         assert zf.read("Page_1.md").decode('utf-8') == "Content 1"
+
+class MockScraper:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        n = int(url.rsplit('/', 1)[-1])
+        if n == 13:
+            raise RuntimeError("unlucky")
+        # Earlier URLs take longer, so completion order is the reverse of input order
+        time.sleep(0.02 * (3 - n) if n < 3 else 0)
+        return {'url': url, 'markdown': f'# Page {n}', 'metadata': {'title': f'Page {n}'}}
+
+def read_lines(response):
+    with response:
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_batch_streams_in_completion_order(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    urls = [f'https://example.com/{n}' for n in range(3)]
+
+    response = client.post('/api/batch', json={'urls': urls, 'parallelism': 3})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = read_lines(response)
+
+    assert [line['index'] for line in lines] == [2, 1, 0]
+    assert all(line['failed'] is False for line in lines)
+    assert lines[-1]['markdown'] == '# Page 0'
+
+def test_batch_flags_failures(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    urls = ['https://example.com/5', 'https://example.com/13']
+
+    lines = read_lines(client.post('/api/batch', json={'urls': urls}))
+    failed = [line for line in lines if line['failed']]
+    assert failed == [{'index': 1, 'url': 'https://example.com/13', 'failed': True, 'error': 'unlucky'}]
+    assert len(lines) == 2
+
+def test_batch_sse_summary(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    urls = ['https://example.com/5', 'https://example.com/13']
+
+    with client.post('/api/batch', json={'urls': urls, 'stream': 'sse'}) as response:
+        events = response.get_data(as_text=True).strip().split('\n\n')
+    assert events[-1] == 'event: done\ndata: {"count": 2, "failed": ["https://example.com/13"]}'
+
+def test_batch_runs_concurrently(client, monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    class ConcurrentScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            with lock:
+                active.append(url)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(url)
+            return {'url': url, 'markdown': '', 'metadata': {}}
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', ConcurrentScraper)
+    urls = [f'https://example.com/{n}' for n in range(8)]
+
+    assert len(read_lines(client.post('/api/batch', json={'urls': urls, 'parallelism': 4}))) == 8
+    assert max(peak) == 4
+
+def test_batch_validation(client, monkeypatch):
+    assert client.post('/api/batch', json={}).status_code == 400
+    assert client.post('/api/batch', json={'urls': 'https://example.com'}).status_code == 400
+    monkeypatch.setitem(app.config, 'BATCH_MAX_URLS', 2)
+    response = client.post('/api/batch', json={'urls': ['a', 'b', 'c']})
+    assert response.status_code == 400
+
+def test_index_batch_keeps_input_order(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    monkeypatch.setitem(app.config, 'JOB_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(md_scraper.web.app, '_job_manager', None)
+
+    response = client.post('/', data={'urls': 'https://example.com/0\nhttps://example.com/1\nhttps://example.com/2'})
+    html = response.data.decode('utf-8')
+    assert html.index('Page 0') < html.index('Page 1') < html.index('Page 2')
+    md_scraper.web.app._job_manager.shutdown()
@@ -0,0 +1,96 @@
+import gzip
+import json
+import zlib
+import pytest
+import md_scraper.web.app
+from md_scraper.web.app import app
+import md_scraper.web.compression
+from md_scraper.web.compression import choose_encoding
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+class MockScraper:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        n = int(url.rsplit('/', 1)[-1])
+        return {
+            'url': url,
+            'markdown': f'# Page {n}\n\n' + 'Lorem ipsum dolor sit amet. ' * 50,
+            'raw_html': '<html>' + 'x' * 2000 + '</html>',
+            'metadata': {'title': f'Page {n}'},
+            'internal_links': [f'https://example.com/{n + 1}']
+        }
+
+def test_choose_encoding():
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('') is None
+    assert choose_encoding('br, gzip;q=0.5') == 'gzip'
+
+def test_zstd_falls_back_to_gzip_without_zstandard(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.compression, 'zstandard', None)
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+    assert choose_encoding('zstd') is None
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0'}, headers={'Accept-Encoding': 'zstd, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))['url'] == 'https://example.com/0'
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0'}, headers={'Accept-Encoding': 'zstd'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['url'] == 'https://example.com/0'
+
+def test_json_response_gzipped(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0'}, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    data = json.loads(gzip.decompress(response.data))
+    assert data['url'] == 'https://example.com/0'
+
+def test_no_compression_unless_accepted(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0'}, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['url'] == 'https://example.com/0'
+
+def test_small_response_not_compressed(client):
+    response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+def test_stream_compressed_per_line(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 3, 'stream': 'ndjson'},
+                     headers={'Accept-Encoding': 'gzip'}, buffered=False) as response:
+        assert response.headers['Content-Encoding'] == 'gzip'
+        decoder = zlib.decompressobj(31)
+        chunks = response.response
+        # The first chunk decodes to a complete line on its own
+        first = decoder.decompress(next(iter(chunks)))
+        assert json.loads(first)['url'] == 'https://example.com/0'
+        rest = b''.join(decoder.decompress(chunk) for chunk in chunks)
+    lines = (first + rest).decode().splitlines()
+    assert len(lines) == 3
+
+def test_fields_selection(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    data = client.post('/api/scrape', json={'url': 'https://example.com/0', 'fields': ['url', 'markdown']}).get_json()
+    assert set(data) == {'url', 'markdown'}
+
+    data = client.post('/api/scrape', json={'url': 'https://example.com/0', 'fields': 'url,content_hash'}).get_json()
+    assert set(data) == {'url', 'content_hash'}
+    assert len(data['content_hash']) == 64
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/0', 'fields': ['url'], 'stream': 'ndjson'}) as response:
+        assert json.loads(response.get_data(as_text=True)) == {'url': 'https://example.com/0'}
@@ -0,0 +1,163 @@
+import threading
+import time
+import pytest
+import md_scraper.web.app
+from md_scraper.web.app import app
+from md_scraper.web.jobs import JobStore, JobManager, COMPLETED, CANCELLED, FAILED, RUNNING
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    app.config['TESTING'] = True
+    monkeypatch.setitem(app.config, 'JOB_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(md_scraper.web.app, '_job_manager', None)
+    with app.test_client() as client:
+        yield client
+    if md_scraper.web.app._job_manager is not None:
+        md_scraper.web.app._job_manager.shutdown()
+
+class MockScraper:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        n = int(url.rsplit('/', 1)[-1])
+        return {
+            'url': url,
+            'markdown': f'# Page {n}',
+            'metadata': {'title': f'Page {n}'},
+            'internal_links': [f'https://example.com/{n + 1}', f'https://example.com/{n + 2}']
+        }
+
+def wait_for(client, job_id, states, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] in states:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job did not reach {states}: {job}")
+
+def test_job_lifecycle(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/api/jobs', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 5})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    job = wait_for(client, job_id, (COMPLETED,))
+    assert job['pages_done'] == 5
+    assert job['pages_failed'] == 0
+
+    page = client.get(f'/api/jobs/{job_id}/results?limit=2').get_json()
+    assert page['total'] == 5
+    assert [r['url'] for r in page['results']] == ['https://example.com/0', 'https://example.com/1']
+    assert page['next_offset'] == 2
+
+    last = client.get(f'/api/jobs/{job_id}/results?offset=4&limit=2').get_json()
+    assert len(last['results']) == 1
+    assert last['next_offset'] is None
+
+def test_job_cancellation(client, monkeypatch):
+    release = threading.Event()
+
+    class SlowScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            release.wait(5)
+            return super().scrape(url, **kwargs)
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', SlowScraper)
+
+    job_id = client.post('/api/jobs', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 50}).get_json()['job_id']
+    response = client.delete(f'/api/jobs/{job_id}')
+    assert response.status_code == 202
+    release.set()
+
+    job = wait_for(client, job_id, (CANCELLED,))
+    assert job['pages_done'] <= 1
+
+def test_job_failure(client, monkeypatch):
+    class BrokenScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', BrokenScraper)
+
+    job_id = client.post('/api/jobs', json={'url': 'https://example.com/0'}).get_json()['job_id']
+    job = wait_for(client, job_id, (FAILED,))
+    assert job['error'] == "boom"
+
+def test_crawl_job_continues_past_failed_pages(client, monkeypatch):
+    class FlakyScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            if url.endswith('/1'):
+                raise TimeoutError("Page deadline of 60s exceeded during fetch")
+            return super().scrape(url, **kwargs)
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', FlakyScraper)
+
+    job_id = client.post('/api/jobs', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 4}).get_json()['job_id']
+    job = wait_for(client, job_id, (COMPLETED, FAILED))
+    assert job['status'] == COMPLETED
+    assert job['pages_failed'] == 1 and job['pages_done'] == 3
+
+    results = client.get(f'/api/jobs/{job_id}/results').get_json()['results']
+    assert {'url': 'https://example.com/1', 'error': 'Page deadline of 60s exceeded during fetch'} in results
+
+def test_job_queue_is_bounded(client, monkeypatch):
+    release = threading.Event()
+
+    class SlowScraper(MockScraper):
+        def scrape(self, url, **kwargs):
+            release.wait(5)
+            return super().scrape(url, **kwargs)
+
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', SlowScraper)
+    monkeypatch.setitem(app.config, 'JOB_WORKERS', 1)
+    monkeypatch.setitem(app.config, 'JOB_MAX_PENDING', 1)
+
+    # One job running, one waiting: the next is refused
+    running = client.post('/api/jobs', json={'url': 'https://example.com/0'}).get_json()['job_id']
+    wait_for(client, running, (RUNNING,))
+    assert client.post('/api/jobs', json={'url': 'https://example.com/1'}).status_code == 202
+    response = client.post('/api/jobs', json={'url': 'https://example.com/2'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app.config['RETRY_AFTER'])
+    release.set()
+
+def test_job_not_found(client):
+    assert client.get('/api/jobs/missing').status_code == 404
+    assert client.get('/api/jobs/missing/results').status_code == 404
+    assert client.delete('/api/jobs/missing').status_code == 404
+    assert client.post('/api/jobs', json={}).status_code == 400
+
+def test_job_store_evicts_oldest_finished(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_jobs=2)
+    first = store.create_job({'url': 'a'})
+    store.add_result(first, {'url': 'a'})
+    store.update_job(first, status=COMPLETED)
+    second = store.create_job({'url': 'b'})
+    third = store.create_job({'url': 'c'})
+
+    assert store.get_job(first) is None
+    assert store.count_results(first) == 0
+    assert store.get_job(second) is not None
+    assert store.get_job(third) is not None
+
+def test_job_store_reaps_interrupted_and_expired_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path, ttl=60)
+    running = store.create_job({'url': 'a'}, status=RUNNING)
+    queued = store.create_job({'url': 'b'})
+    finished = store.create_job({'url': 'c'})
+    store.update_job(finished, status=COMPLETED)
+
+    # Reopened after a restart: nothing will ever finish the unfinished jobs
+    store = JobStore(path, ttl=60, purge_interval=0)
+    for job_id in (running, queued):
+        job = store.get_job(job_id)
+        assert job['status'] == FAILED and job['error'] == 'Interrupted by a server restart'
+
+    # Expired jobs are purged when jobs are read, without a new one being created
+    store.ttl = 0
+    assert store.get_job(finished) is None
@@ -0,0 +1,99 @@
+import io
+import time
+import zipfile
+import pytest
+import md_scraper.web.app
+from md_scraper.web.app import app
+from md_scraper.web.jobs import JobStore, COMPLETED
+from md_scraper.web.zipstream import iter_zip, CHUNK_SIZE
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    app.config['TESTING'] = True
+    monkeypatch.setitem(app.config, 'JOB_DB_PATH', str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(md_scraper.web.app, '_job_manager', None)
+    with app.test_client() as client:
+        yield client
+
+class MockScraper:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        n = int(url.rsplit('/', 1)[-1])
+        return {
+            'url': url,
+            'markdown': f'# Page {n}',
+            'metadata': {'title': 'Same Title'},
+            'internal_links': [f'https://example.com/{n + 1}']
+        }
+
+def test_iter_zip_streams_chunks():
+    big = 'x' * (CHUNK_SIZE * 3)
+    results = [
+        {'url': 'https://example.com/1', 'markdown': big, 'metadata': {'title': 'Big'}},
+        {'url': 'https://example.com/2', 'markdown': 'small', 'metadata': {'title': 'Big'}},
+    ]
+    chunks = list(iter_zip(iter(results)))
+    assert len(chunks) > 2
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zf:
+        assert zf.namelist() == ['Big.md', 'Big_2.md']
+        assert zf.read('Big.md').decode() == big
+        assert zf.testzip() is None
+
+def test_scrape_store_and_download(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 3, 'store': True})
+    data = response.get_json()
+    assert len(data['results']) == 3
+    result_id = data['result_id']
+
+    response = client.get(f'/api/jobs/{result_id}/download')
+    assert response.status_code == 200
+    assert response.is_streamed
+    with zipfile.ZipFile(io.BytesIO(response.data)) as zf:
+        assert zf.namelist() == ['Same_Title.md', 'Same_Title_2.md', 'Same_Title_3.md']
+        assert zf.read('Same_Title_3.md') == b'# Page 2'
+
+    # The legacy endpoint accepts the id instead of the uploaded results
+    response = client.post('/api/download-zip', json={'result_id': result_id})
+    assert response.status_code == 200
+    assert len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == 3
+
+def test_streamed_scrape_store(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 2,
+                                          'store': True, 'stream': 'ndjson'}) as response:
+        result_id = response.headers['X-Result-Id']
+        response.get_data()
+
+    job = client.get(f'/api/jobs/{result_id}').get_json()
+    assert job['status'] == COMPLETED
+    assert job['pages_done'] == 2
+
+def test_index_stores_results(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/', data={'urls': 'https://example.com/5'})
+    html = response.data.decode('utf-8')
+    assert '/api/jobs/' in html
+    assert 'resultsData' not in html
+
+def test_download_unknown_result(client):
+    assert client.get('/api/jobs/unknown/download').status_code == 404
+
+def test_store_ttl_eviction(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=60)
+    old = store.create_job({}, status=COMPLETED)
+    store.add_result(old, {'url': 'https://example.com'})
+    with store._connect() as conn:
+        conn.execute('UPDATE jobs SET updated = ? WHERE id = ?', (time.time() - 120, old))
+    fresh = store.create_job({}, status=COMPLETED)
+
+    assert store.get_job(old) is None
+    assert store.count_results(old) == 0
+    assert store.get_job(fresh) is not None
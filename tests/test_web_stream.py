@@ -0,0 +1,115 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from click.testing import CliRunner
+import md_scraper.web.app
+from md_scraper.web.app import app
+from md_scraper.cli import cli
+from md_scraper.remote import iter_remote_results
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+class MockScraper:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        pass
+    def scrape(self, url, **kwargs):
+        n = int(url.rsplit('/', 1)[-1])
+        if n == 99:
+            raise RuntimeError("page exploded")
+        return {
+            'url': url,
+            'markdown': f'# Page {n}',
+            'metadata': {'title': f'Page {n}'},
+            'internal_links': [f'https://example.com/{n + 1}']
+        }
+
+def test_api_scrape_ndjson_stream(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/0', 'crawl': True, 'max_pages': 3},
+                     headers={'Accept': 'application/x-ndjson'}) as response:
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [r['url'] for r in lines] == ['https://example.com/0', 'https://example.com/1', 'https://example.com/2']
+
+def test_api_scrape_sse_stream(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/0', 'stream': 'sse'}) as response:
+        assert response.mimetype == 'text/event-stream'
+        events = response.get_data(as_text=True).strip().split('\n\n')
+
+    assert events[0].startswith('event: result\ndata: ')
+    assert json.loads(events[0].split('data: ', 1)[1])['url'] == 'https://example.com/0'
+    assert events[-1] == 'event: done\ndata: {"count": 1}'
+
+def test_api_scrape_stream_error_in_band(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/98', 'crawl': True, 'stream': 'ndjson'}) as response:
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[0]['url'] == 'https://example.com/98'
+    # A crawled page's failure is reported with its URL; a single page's ends the stream
+    assert lines[1] == {'url': 'https://example.com/99', 'error': 'page exploded'}
+
+    with client.post('/api/scrape', json={'url': 'https://example.com/99', 'stream': 'ndjson'}) as response:
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines == [{'error': 'page exploded'}]
+
+def test_api_scrape_default_is_json(client, monkeypatch):
+    monkeypatch.setattr(md_scraper.web.app, 'Scraper', MockScraper)
+
+    response = client.post('/api/scrape', json={'url': 'https://example.com/0'})
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['url'] == 'https://example.com/0'
+
+def _mock_stream_response(lines, content_type='application/x-ndjson'):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = 200
+    response.headers = {'Content-Type': content_type}
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+def test_iter_remote_results_incremental():
+    lines = [json.dumps({'url': 'https://example.com/1'}).encode(), b'', json.dumps({'url': 'https://example.com/2'}).encode()]
+
+    with patch('requests.post', return_value=_mock_stream_response(lines)) as mock_post:
+        results = iter_remote_results('https://server', {'url': 'https://example.com/1'})
+        assert next(results)['url'] == 'https://example.com/1'
+        assert next(results)['url'] == 'https://example.com/2'
+        assert mock_post.call_args.kwargs['stream'] is True
+        assert mock_post.call_args.kwargs['headers']['Accept'] == 'application/x-ndjson'
+
+def test_iter_remote_results_error_line():
+    lines = [json.dumps({'error': 'boom'}).encode()]
+
+    with patch('requests.post', return_value=_mock_stream_response(lines)):
+        with pytest.raises(Exception, match="boom"):
+            list(iter_remote_results('https://server', {'url': 'https://example.com'}))
+
+def test_iter_remote_results_legacy_json():
+    response = _mock_stream_response([], content_type='application/json')
+    response.json.return_value = {'url': 'https://example.com', 'markdown': '# Legacy'}
+
+    with patch('requests.post', return_value=response):
+        assert list(iter_remote_results('https://server', {'url': 'https://example.com'})) == [
+            {'url': 'https://example.com', 'markdown': '# Legacy'}
+        ]
+
+def test_cli_server_mode_streams():
+    runner = CliRunner()
+    lines = [json.dumps({'url': 'https://example.com', 'markdown': '# Remote', 'metadata': {}}).encode()]
+
+    with patch('requests.Session.post', return_value=_mock_stream_response(lines)):
+        result = runner.invoke(cli, ['scrape', 'https://example.com', '--server', 'https://server'])
+        assert result.exit_code == 0
+        assert '# Remote' in result.output
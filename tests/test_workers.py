@@ -0,0 +1,101 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from md_scraper.cli import cli
+from md_scraper.deadline import Deadline
+from md_scraper.dedup import NearDuplicateIndex
+from md_scraper.manifest import CrawlManifest
+from md_scraper.scraper import Scraper
+from md_scraper.utils import iter_concurrent
+from md_scraper.workers import ConversionPool
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'samples', 'blog_post.html')
+
+@pytest.fixture(scope='module')
+def pool():
+    with ConversionPool(workers=2) as pool:
+        yield pool
+
+def test_pool_matches_scraper(pool):
+    expected = Scraper().scrape(SAMPLE, base_url=SAMPLE)
+    result = pool.scrape(SAMPLE, base_url=SAMPLE)
+    assert result == expected
+
+def test_pool_merges_fetch_and_worker_timings(pool):
+    result = pool.scrape(SAMPLE, timings=True)
+    stages = result['timings']['stages']
+    assert list(stages)[0] == 'fetch' and stages['fetch']['bytes'] > 0
+    assert {'parse', 'extract', 'convert'} <= set(stages)
+
+def test_pool_skips_unchanged_pages(pool, tmp_path):
+    manifest = CrawlManifest.for_directory(str(tmp_path))
+    with open(SAMPLE) as f:
+        manifest.record(SAMPLE, CrawlManifest.content_hash(f.read()), None, ['https://example.com/a'], {'title': 'Blog'})
+    result = pool.scrape(SAMPLE, manifest=manifest)
+    assert result['unchanged'] is True and result['markdown'] is None
+    assert result['internal_links'] == ['https://example.com/a']
+
+def test_pool_checks_duplicates_before_converting(pool, tmp_path):
+    index = NearDuplicateIndex()
+    copy = tmp_path / 'copy.html'
+    copy.write_text(open(SAMPLE).read())
+
+    # Converted in a second round trip, from the main content the worker extracted
+    result = pool.scrape(SAMPLE, base_url=SAMPLE, dedup_index=index)
+    assert result['markdown'] == Scraper().scrape(SAMPLE, base_url=SAMPLE)['markdown']
+    with patch.object(pool._executor, 'submit', wraps=pool._executor.submit) as submit:
+        duplicate = pool.scrape(str(copy), dedup_index=index)
+    assert duplicate['duplicate_of'] == SAMPLE and duplicate['markdown'] is None
+    assert submit.call_count == 1
+
+def test_pool_from_threads(pool, tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f'page{i}.html'
+        path.write_text(f'<html><body><main><h1>Page {i}</h1><p>Text of page {i}.</p></main></body></html>')
+        paths.append((str(path), 0))
+    results = list(iter_concurrent(iter(paths), pool.scrape, 4))
+    assert [error for _, _, _, error in results] == [None] * 6
+    assert [result['markdown'].splitlines()[0] for _, _, result, _ in results] == [f'# Page {i}' for i in range(6)]
+
+def test_pool_errors(pool):
+    with pytest.raises(ValueError):
+        pool.scrape(SAMPLE, dynamic=True)
+    with pytest.raises(OSError):
+        pool.scrape('missing_page.html')
+
+def test_pool_charges_time_waiting_for_a_worker(pool):
+    submit = pool._executor.submit
+
+    def queued(*args):
+        # The page waits for a free worker after its deadline was handed over
+        time.sleep(0.3)
+        return submit(*args)
+
+    with patch.object(pool._executor, 'submit', queued):
+        result = pool.scrape(SAMPLE, deadline=0.1)
+    assert result['timed_out'] == ['convert']
+    assert result['markdown']
+
+    # Without the wait, the page converts in full within the same deadline
+    assert 'timed_out' not in pool.scrape(SAMPLE, deadline=Deadline(5))
+
+def test_cli_workers(tmp_path):
+    runner = CliRunner()
+    pages = []
+    for i in range(3):
+        path = tmp_path / f'page{i}.html'
+        path.write_text(f'<html><head><title>Page {i}</title></head><body><h1>Page {i}</h1></body></html>')
+        pages.append(str(path))
+
+    result = runner.invoke(cli, ['scrape', *pages, '-o', str(tmp_path / 'out'), '--workers', '2'])
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(tmp_path / 'out')) == ['Page_0.md', 'Page_1.md', 'Page_2.md']
+
+def test_cli_workers_rejects_server():
+    runner = CliRunner()
+    result = runner.invoke(cli, ['scrape', 'https://example.com', '--server', 'http://localhost:8080', '--workers', '2'])
+    assert result.exit_code != 0
+    assert '--workers only applies' in result.output